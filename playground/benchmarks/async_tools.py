@@ -0,0 +1,149 @@
+"""
+Compares the throughput of sync and async tool calls against a local stub server.
+
+The stub answers every Tavily search after a fixed delay, like a slow remote API.
+Sync calls run on a thread pool, as LangGraph does for sync tools, so at most
+`--workers` calls are in flight. Async calls all run concurrently on one event loop.
+
+Usage:
+    python -m playground.benchmarks.async_tools --calls 200 --delay 0.1 --workers 16
+"""
+import argparse
+import asyncio
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from playground.http_client import AsyncHttpClient, HttpClient
+from playground.tools import tavily_tools
+from playground.tools.tavily_tools import TavilyClient
+
+
+class StubServer:
+    """
+    Minimal keep-alive HTTP server answering every request with an empty Tavily
+    search response after `delay` seconds.
+
+    It runs on its own event loop in a background thread, so that the server is not
+    the bottleneck of the benchmark.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self.server = None
+        self._connections = {}  # Handler task: its stream writer
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024))
+        self.port = self.server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def _handle(self, reader, writer):
+        payload = json.dumps({"results": [], "response_time": self.delay}).encode()
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                await asyncio.sleep(self.delay)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(payload), payload))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _shutdown(self):
+        # Kept-alive connections are still open: closing them ends their handlers, so
+        # that no task is pending when the loop stops
+        self.server.close()
+        handlers = list(self._connections)
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def report(name, elapsed, latencies):
+    print(f"{name:>24}: {len(latencies) / elapsed:8.1f} calls/s, wall {elapsed:6.2f}s, "
+          f"latency p50 {_percentile(latencies, 50):.3f}s p99 {_percentile(latencies, 99):.3f}s")
+
+
+def run_sync(calls, workers):
+    def call(index):
+        started = time.monotonic()
+        tavily_tools.tavily_search.invoke({"query": f"sync query {index}"})
+        return time.monotonic() - started
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(executor.map(call, range(calls)))
+    return time.monotonic() - started, latencies
+
+
+async def run_async(calls, http):
+    async def call(index):
+        started = time.monotonic()
+        await tavily_tools.tavily_search.ainvoke({"query": f"async query {index}"})
+        return time.monotonic() - started
+
+    tavily_tools.client.async_http = http
+    started = time.monotonic()
+    latencies = await asyncio.gather(*(call(index) for index in range(calls)))
+    elapsed = time.monotonic() - started
+    await http.aclose()
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync and async tool calls against a stub server.")
+    parser.add_argument("--calls", type=int, default=200, help="Number of concurrent tool calls.")
+    parser.add_argument("--delay", type=float, default=0.1, help="Response delay of the stub server, in seconds.")
+    parser.add_argument("--workers", type=int, default=16, help="Threads running the sync tool calls.")
+    args = parser.parse_args()
+
+    server = StubServer(args.delay)
+    base_url = f"http://127.0.0.1:{server.port}"
+
+    # Unique queries and no cache: every call reaches the stub
+    tavily_tools.cache = None
+    tavily_tools._get_cache = lambda: None
+    tavily_tools.client = TavilyClient("stub", http=HttpClient(pool_maxsize=args.workers), base_url=base_url)
+
+    print(f"{args.calls} tavily_search calls, stub delay {args.delay * 1000:.0f} ms")
+    report(f"sync ({args.workers} threads)", *run_sync(args.calls, args.workers))
+    report("async (1 event loop)", *asyncio.run(run_async(args.calls, AsyncHttpClient(max_connections=args.calls))))
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Measures the latency and recall of the local hybrid retriever on a synthetic corpus.
+
+Documents draw their words from a Zipf vocabulary, plus a few words of the topic
+they belong to, and their vectors are noisy copies of the vector of their topic.
+A query is a handful of words of a random document with a noisy copy of its vector.
+
+The keyword leg, the exact and IVF vector legs and the fused retriever are timed on
+the same queries. The recall@k of the IVF leg is measured against the exact search
+and the one of the retriever with IVF against the retriever with exact search.
+Query embeddings are precomputed, so the timings leave the embedding model out.
+
+Usage:
+    python -m playground.benchmarks.hybrid_retrieval --documents 100000 --queries 200 --nprobe 8
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from playground.langchain.hybrid_retriever import LocalHybridRetriever
+
+
+class LookupEmbeddings(Embeddings):
+    """Returns the precomputed vectors of the benchmark queries."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        raise NotImplementedError("Document vectors are precomputed")
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+
+def make_corpus(documents, dimension, topics, seed):
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"w{index}" for index in range(20_000)])
+    topic_words = rng.choice(len(vocabulary), size=(topics, 20))
+    centers = rng.normal(size=(topics, dimension)).astype(np.float32)
+
+    document_topics = rng.integers(topics, size=documents)
+    texts = []
+    for topic in document_topics:
+        words = (rng.zipf(1.3, size=60) - 1) % len(vocabulary)
+        words = np.concatenate([words, rng.choice(topic_words[topic], size=5)])
+        texts.append(" ".join(vocabulary[words]))
+    vectors = centers[document_topics] + rng.normal(scale=0.6, size=(documents, dimension)).astype(np.float32)
+    return texts, vectors
+
+
+def make_queries(texts, vectors, count, seed):
+    rng = np.random.default_rng(seed + 1)
+    queries = {}
+    while len(queries) < count:
+        doc_id = rng.integers(len(texts))
+        words = rng.choice(texts[doc_id].split(), size=4, replace=False)
+        noise = rng.normal(scale=0.3, size=vectors.shape[1]).astype(np.float32)
+        queries[" ".join(words)] = vectors[doc_id] + noise
+    return queries
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def timed(search, queries):
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - started)
+    return results, latencies
+
+
+def recall(results, expected):
+    hits = sum(len(set(found) & set(truth)) for found, truth in zip(results, expected))
+    return hits / max(1, sum(len(truth) for truth in expected))
+
+
+def report(name, latencies, recall_at_k=None):
+    line = (f"{name:>16}: latency p50 {_percentile(latencies, 50) * 1000:7.2f} ms "
+            f"p99 {_percentile(latencies, 99) * 1000:7.2f} ms")
+    if recall_at_k is not None:
+        line += f", recall {recall_at_k:.3f}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local hybrid retriever on a synthetic corpus.")
+    parser.add_argument("--documents", type=int, default=100_000, help="Number of documents in the corpus.")
+    parser.add_argument("--dimension", type=int, default=256, help="Dimension of the vectors.")
+    parser.add_argument("--topics", type=int, default=500, help="Number of topics the documents belong to.")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries.")
+    parser.add_argument("--k", type=int, default=10, help="Number of results per query.")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default: square root of the count).")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists scanned per query.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts, vectors = make_corpus(args.documents, args.dimension, args.topics, args.seed)
+    queries = make_queries(texts, vectors, args.queries, args.seed)
+
+    started = time.perf_counter()
+    retriever = LocalHybridRetriever.from_documents(
+        [Document(page_content=text) for text in texts], LookupEmbeddings(queries), vectors=vectors,
+        k=args.k, fetch_k=2 * args.k,
+    )
+    print(f"{args.documents} documents indexed in {time.perf_counter() - started:.1f}s, "
+          f"{len(queries)} queries, k={args.k}")
+
+    def ids(search):
+        return lambda query: [doc_id for doc_id, _ in search(query)]
+
+    def hybrid(query):
+        return [document.page_content for document in retriever.invoke(query)]
+
+    keyword_index, vector_index = retriever._keyword_index, retriever._vector_index
+    report("bm25", timed(ids(lambda query: keyword_index.search(query, args.k)), queries)[1])
+    exact, latencies = timed(ids(lambda query: vector_index.search(queries[query], args.k)), queries)
+    report("vector exact", latencies)
+    hybrid_exact, latencies = timed(hybrid, queries)
+    report("hybrid exact", latencies)
+
+    started = time.perf_counter()
+    retriever.build_ivf(args.nlist, args.nprobe)
+    print(f"IVF built in {time.perf_counter() - started:.1f}s "
+          f"({len(vector_index._lists)} lists, nprobe {args.nprobe})")
+    approximate, latencies = timed(ids(lambda query: vector_index.search(queries[query], args.k)), queries)
+    report("vector ivf", latencies, recall(approximate, exact))
+    hybrid_approximate, latencies = timed(hybrid, queries)
+    report("hybrid ivf", latencies, recall(hybrid_approximate, hybrid_exact))
+
+
+if __name__ == "__main__":
+    main()
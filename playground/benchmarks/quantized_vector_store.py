@@ -0,0 +1,94 @@
+"""
+Compares the int8 QuantizedVectorIndex with an exact float32 search.
+
+The vectors are noisy copies of the vectors of a few topics, as chunks of the
+same documentation are, and a query is a noisy copy of a random vector. The
+quantized index is timed for several numbers of re-ranked candidates per result,
+and its recall@k is measured against the exact float32 search (VectorIndex).
+The resident size is the one of the arrays scanned by each query.
+
+Usage:
+    python -m playground.benchmarks.quantized_vector_store --vectors 200000 --dimension 768
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from playground.langchain.hybrid_retriever import VectorIndex
+from playground.langchain.quantized_vector_store import QuantizedVectorIndex
+
+
+def make_vectors(count, dimension, topics, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(topics, size=count)]
+    return vectors + rng.normal(scale=0.8, size=(count, dimension)).astype(np.float32)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def timed(search, queries):
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append([position for position, _ in search(query)])
+        latencies.append(time.perf_counter() - started)
+    return results, latencies
+
+
+def recall(results, expected):
+    hits = sum(len(set(found) & set(truth)) for found, truth in zip(results, expected))
+    return hits / max(1, sum(len(truth) for truth in expected))
+
+
+def report(name, latencies, megabytes, recall_at_k=None):
+    line = (f"{name:>22}: latency p50 {_percentile(latencies, 50) * 1000:7.2f} ms "
+            f"p99 {_percentile(latencies, 99) * 1000:7.2f} ms, {megabytes:7.1f} MB scanned")
+    if recall_at_k is not None:
+        line += f", recall {recall_at_k:.3f}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the int8 vector index against an exact search.")
+    parser.add_argument("--vectors", type=int, default=200_000, help="Number of vectors.")
+    parser.add_argument("--dimension", type=int, default=768, help="Dimension of the vectors.")
+    parser.add_argument("--topics", type=int, default=1000, help="Number of topics the vectors are close to.")
+    parser.add_argument("--queries", type=int, default=100, help="Number of queries.")
+    parser.add_argument("--k", type=int, default=10, help="Number of results per query.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.vectors, args.dimension, args.topics, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.integers(len(vectors), size=args.queries)]
+    queries = queries + rng.normal(scale=0.4, size=queries.shape).astype(np.float32)
+
+    exact_index = VectorIndex()
+    exact_index.add(vectors)
+    exact, latencies = timed(lambda query: exact_index.search(query, args.k), queries)
+    report("float32 exact", latencies, vectors.nbytes / 2 ** 20)
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        index = QuantizedVectorIndex(directory)
+        for start in range(0, len(vectors), 10_000):
+            index.add(vectors[start:start + 10_000])
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in ("codes.int8", "scales.float32"))
+        print(f"{len(vectors)} vectors of dimension {args.dimension} appended in "
+              f"{time.perf_counter() - started:.1f}s, k={args.k}")
+        for factor in (1, 2, 4, 8):
+            results, latencies = timed(lambda query: index.search(query, args.k, candidates=factor * args.k),
+                                       queries)
+            report(f"int8, {factor * args.k} candidates", latencies, size / 2 ** 20, recall(results, exact))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Times the record manager bookkeeping of re-indexing an unchanged corpus.
+
+The corpus is `--sources` files of `--chunks-per-source` chunks, identified by ids
+derived like the IngestionPipeline's chunk ids. The benchmark replays the record
+manager calls of the pipeline, without loading, splitting or embedding anything:
+a first run records every chunk, then a re-index of the unchanged corpus looks up
+each batch, refreshes the chunks found and runs the incremental cleanup, which
+finds nothing to delete.
+
+The SQLiteRecordManager of the playground is compared with LangChain's
+InMemoryRecordManager and, when `langchain_classic` and its SQL dependencies are
+installed, with its SQLRecordManager over SQLite.
+
+Usage:
+    python -m playground.benchmarks.record_manager --sources 1000 --chunks-per-source 100
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from langchain_core.documents import Document
+from langchain_core.indexing import InMemoryRecordManager
+
+from playground.langchain.ingestion import chunk_id
+from playground.langchain.record_manager import SQLiteRecordManager
+
+
+def make_chunks(sources, chunks_per_source):
+    chunks = []
+    for source in range(sources):
+        for chunk in range(chunks_per_source):
+            document = Document(page_content=f"Chunk {chunk} of file {source}.",
+                                metadata={"source": f"docs/file-{source}.md"})
+            chunks.append((chunk_id(document), document.metadata["source"]))
+    return chunks
+
+
+def record_managers(directory):
+    yield "SQLiteRecordManager", SQLiteRecordManager("benchmark", path=os.path.join(directory, "records.sqlite"))
+    yield "InMemoryRecordManager", InMemoryRecordManager("benchmark")
+    try:
+        from langchain_classic.indexes import SQLRecordManager
+
+        manager = SQLRecordManager("benchmark", db_url=f"sqlite:///{os.path.join(directory, 'sql.sqlite')}")
+        manager.create_schema()
+    except Exception as e:  # Not installed, or missing one of its dependencies
+        print(f"Skipping SQLRecordManager: {e}")
+        return
+    yield "SQLRecordManager", manager
+
+
+def index(record_manager, chunks, batch_size):
+    """Replay the record manager calls of an IngestionPipeline run, returning the new and unchanged counts."""
+    index_start = record_manager.get_time()
+    new = unchanged = 0
+    for start in range(0, len(chunks), batch_size):
+        keys, group_ids = zip(*chunks[start:start + batch_size])
+        exists = record_manager.exists(keys)
+        found = [(key, group_id) for key, group_id, found in zip(keys, group_ids, exists) if found]
+        missing = [(key, group_id) for key, group_id, found in zip(keys, group_ids, exists) if not found]
+        for records in (found, missing):
+            if records:
+                record_manager.update([key for key, _ in records], group_ids=[group for _, group in records],
+                                      time_at_least=index_start)
+        new += len(missing)
+        unchanged += len(found)
+    sources = sorted({group_id for _, group_id in chunks})
+    stale = record_manager.list_keys(group_ids=sources, before=index_start, limit=1000)
+    return new, unchanged, len(stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bookkeeping of re-indexing an unchanged corpus.")
+    parser.add_argument("--sources", type=int, default=1000, help="Number of source files.")
+    parser.add_argument("--chunks-per-source", type=int, default=100, help="Number of chunks per file.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per batch, as embed_batch_size.")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.sources, args.chunks_per_source)
+    print(f"{len(chunks)} chunks in {args.sources} sources, batches of {args.batch_size}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, record_manager in record_managers(directory):
+            started = time.monotonic()
+            index(record_manager, chunks, args.batch_size)
+            first = time.monotonic() - started
+            started = time.monotonic()
+            new, unchanged, stale = index(record_manager, chunks, args.batch_size)
+            elapsed = time.monotonic() - started
+            print(f"{name:>22}: first run {first:6.2f}s, re-index {elapsed:6.2f}s "
+                  f"({unchanged} unchanged, {new} new, {stale} stale)")
+
+
+if __name__ == "__main__":
+    main()
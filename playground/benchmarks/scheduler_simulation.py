@@ -0,0 +1,172 @@
+"""
+Replays a synthetic stream of issues through the boss scheduling strategies.
+
+Issues arrive in several repositories following a Poisson process, with random
+priorities, and each Jules session runs for an exponentially distributed time.
+The simulation compares the original strategy (sort the ready issues by priority
+at every cycle, no aging) with the IssueScheduler, and reports the waiting time
+per priority, the utilization of the sessions and the CPU time spent scheduling.
+
+Usage:
+    python -m playground.benchmarks.scheduler_simulation --issues 5000 --sessions 3
+"""
+import argparse
+import heapq
+import math
+import random
+import time
+
+from playground.boss import PRIORITY_ORDER
+from playground.scheduler import IssueScheduler
+
+PRIORITY_NAMES = {priority: label.split(": ")[1] for label, priority in PRIORITY_ORDER.items()}
+
+
+def generate_issues(count, repos, arrival_rate, seed):
+    """
+    Returns `count` (arrival time, repo, number, priority) tuples sorted by arrival.
+
+    Low priority issues are the most common, as in a real backlog.
+    """
+    rng = random.Random(seed)
+    now = 0.0
+    issues = []
+    for number in range(count):
+        now += rng.expovariate(arrival_rate)
+        priority = rng.choices([1, 2, 3, 4], weights=[5, 3, 2, 1])[0]
+        issues.append((now, f"owner/repo{rng.randrange(repos)}", number, priority))
+    return issues
+
+
+class SortedQueue:
+    """
+    The original boss strategy: all ready issues are sorted by priority at every cycle.
+    """
+
+    def __init__(self, max_sessions):
+        self.max_sessions = max_sessions
+        self.ready = []
+        self.in_flight = set()
+
+    def push(self, repo, number, issue, priority):
+        self.ready.append((repo, number, priority, issue))
+
+    def pop_ready(self):
+        free = self.max_sessions - len(self.in_flight)
+        self.ready.sort(key=lambda item: item[2], reverse=True)
+        taken, self.ready = self.ready[:free], self.ready[free:]
+        for repo, number, _, _ in taken:
+            self.in_flight.add((repo, number))
+        return [(repo, number, issue) for repo, number, _, issue in taken]
+
+    def release(self, repo, number):
+        self.in_flight.discard((repo, number))
+
+
+class HeapQueue:
+    """
+    Adapter of IssueScheduler to the interface of SortedQueue.
+    """
+
+    def __init__(self, max_sessions, aging_rate, max_per_repo, clock):
+        self.scheduler = IssueScheduler(max_sessions, aging_rate=aging_rate, max_per_repo=max_per_repo, clock=clock)
+
+    def push(self, repo, number, issue, priority):
+        self.scheduler.push(repo, number, issue, priority)
+
+    def pop_ready(self):
+        return [(entry.repo, entry.number, entry.issue) for entry in self.scheduler.pop_ready()]
+
+    def release(self, repo, number):
+        self.scheduler.release(repo, number)
+
+
+def simulate(queue, clock, issues, mean_duration, seed):
+    """
+    Runs the discrete event simulation and returns the waiting times per priority,
+    the busy session time, the end of the simulation and the scheduling CPU time.
+    """
+    rng = random.Random(seed)
+    events = []  # (time, order, kind, payload)
+    for order, (arrival, repo, number, priority) in enumerate(issues):
+        events.append((arrival, order, "arrival", (repo, number, priority)))
+    heapq.heapify(events)
+    order = len(events)
+
+    waits = {priority: [] for priority in PRIORITY_NAMES}
+    busy = 0.0
+    scheduling = 0.0
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        clock.now = now
+        started = time.perf_counter()
+        if kind == "arrival":
+            repo, number, priority = payload
+            queue.push(repo, number, (priority, now), priority)
+        else:
+            queue.release(*payload)
+        dispatched = queue.pop_ready()
+        scheduling += time.perf_counter() - started
+
+        for repo, number, (priority, arrived_at) in dispatched:
+            waits[priority].append(now - arrived_at)
+            duration = rng.expovariate(1 / mean_duration)
+            busy += duration
+            order += 1
+            heapq.heappush(events, (now + duration, order, "done", (repo, number)))
+    return waits, busy, clock.now, scheduling
+
+
+class SimulationClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def report(name, waits, busy, end, scheduling, sessions, issues):
+    print(f"{name}: utilization {busy / (end * sessions):.0%}, "
+          f"scheduling {scheduling * 1000:.1f} ms ({scheduling / issues * 1e6:.1f} us/issue)")
+    for priority in sorted(waits, reverse=True):
+        values = [wait / 3600 for wait in waits[priority]]
+        print(f"  {PRIORITY_NAMES[priority]:>8}: {len(values):>6} issues, wait p50 {_percentile(values, 50):7.2f}h "
+              f"p90 {_percentile(values, 90):7.2f}h max {max(values, default=0.0):7.2f}h")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the boss issue scheduling strategies.")
+    parser.add_argument("--issues", type=int, default=5000, help="Number of synthetic issues.")
+    parser.add_argument("--repos", type=int, default=4, help="Number of repositories.")
+    parser.add_argument("--sessions", type=int, default=3, help="Maximum number of concurrent sessions.")
+    parser.add_argument("--arrivals-per-hour", type=float, default=2.8, help="Issue arrival rate.")
+    parser.add_argument("--session-hours", type=float, default=1.0, help="Mean duration of a session.")
+    parser.add_argument("--aging", type=float, default=0.2, help="Priority points gained per hour of waiting.")
+    parser.add_argument("--max-per-repo", type=int, default=None, help="Maximum sessions per repository.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    issues = generate_issues(args.issues, args.repos, args.arrivals_per_hour / 3600, args.seed)
+    mean_duration = args.session_hours * 3600
+    print(f"{args.issues} issues in {args.repos} repositories, {args.sessions} sessions, "
+          f"load {args.arrivals_per_hour * args.session_hours / args.sessions:.0%}")
+
+    clock = SimulationClock()
+    results = simulate(SortedQueue(args.sessions), clock, issues, mean_duration, args.seed)
+    report("sort by priority", *results, args.sessions, args.issues)
+
+    clock = SimulationClock()
+    queue = HeapQueue(args.sessions, args.aging, args.max_per_repo, clock)
+    results = simulate(queue, clock, issues, mean_duration, args.seed)
+    report(f"IssueScheduler (aging {args.aging}/h)", *results, args.sessions, args.issues)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,33 @@
 import argparse
+import json
+import math
 import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from string import Template
 
+from fastcore.xtras import dict2obj, obj2dict
 from ghapi.all import GhApi
 
+from playground.http_client import get_client
+from playground.scheduler import IssueScheduler
+
+JULES_SESSIONS_URL = "https://jules.googleapis.com/v1alpha/sessions"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "boss")
+ACTIVE_STATES = {"QUEUED", "PLANNING", "IN_PROGRESS", "AWAITING_PLAN_APPROVAL", "AWAITING_USER_FEEDBACK"}
+# State reported for a session that does not exist (anymore), e.g. deleted or expired
+NOT_FOUND_STATE = "NOT_FOUND"
+PRIORITY_ORDER = {
+    "priority: critical": 4,
+    "priority: high": 3,
+    "priority: medium": 2,
+    "priority: low": 1,
+}
+
 ISSUE_TEMPLATE = Template("""
 - Read the project specification (`docs/SPECS.md`) to understand what you're building
 - Check the recent history log: `git log --oneline -5`
@@ -15,31 +38,186 @@ Your task today: $title
 $body
 """)
 
-def add_comment_to_issue(repo_owner, repo_name, issue_number, comment_body):
+class ListingCache:
+    """
+    On-disk cache of paginated API listings.
+
+    Each listing is stored as a JSON file holding its pages along with their ETag.
+    A listing younger than `ttl` seconds is served without any request; older
+    listings are revalidated page by page with conditional requests, which cost
+    nothing against the GitHub rate limit when the page did not change.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=60):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl
+
+    def set(self, key, pages):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": time.time(), "pages": pages}, f)
+        os.replace(tmp_path, self._path(key))
+
+def iter_pages(fetch_page, cache=None, cache_key=None):
+    """
+    Yields the items of a paginated listing as its pages arrive.
+
+    Args:
+        fetch_page: A function taking the previous page (None for the first one) and the
+            cached ETag of the requested page, and returning the page as a dict with
+            "items", "etag" and "next" (what to request next, None on the last page),
+            or None if the server answered 304 Not Modified.
+        cache: An optional ListingCache.
+        cache_key: The key of the listing in the cache.
+    """
+    cached = cache.get(cache_key) if cache else None
+    if cache and cache.is_fresh(cached):
+        for page in cached["pages"]:
+            yield from page["items"]
+        return
+
+    cached_pages = cached["pages"] if cached else []
+    pages = []
+    while True:
+        cached_page = cached_pages[len(pages)] if len(pages) < len(cached_pages) else None
+        page = fetch_page(pages[-1] if pages else None, cached_page["etag"] if cached_page else None)
+        if page is None:
+            page = cached_page
+        pages.append(page)
+        yield from page["items"]
+        if page["next"] is None:
+            break
+
+    if cache:
+        cache.set(cache_key, pages)
+
+def iter_open_issues(api, per_page=100, cache=None, cache_key="issues"):
+    """
+    Yields all open issues with the "status: ready" label, following pagination.
+
+    Args:
+        api: The GhApi client of the repository.
+        per_page: The number of issues requested per page.
+        cache: An optional ListingCache.
+        cache_key: The key of the listing in the cache.
+    """
+    yield from iter_issues(api, dict(state='open', labels='status: ready'), per_page, cache, cache_key)
+
+def iter_issues(api, query, per_page=100, cache=None, cache_key="issues"):
+    """
+    Yields all issues matching the `list_for_repo` query, following pagination.
+
+    Args:
+        api: The GhApi client of the repository.
+        query: The `list_for_repo` parameters (state, labels, since...).
+        per_page: The number of issues requested per page.
+        cache: An optional ListingCache.
+        cache_key: The key of the listing in the cache.
+    """
+    def fetch_page(previous, etag):
+        page_number = previous["next"] if previous else 1
+        headers = {"If-None-Match": etag} if etag else None
+        try:
+            issues = api.issues.list_for_repo(**query, per_page=per_page, page=page_number, headers=headers)
+        except Exception as e:
+            if getattr(e, "code", None) == 304:
+                return None
+            raise
+        items = [obj2dict(issue) for issue in issues] if cache else list(issues)
+        return {
+            "items": items,
+            "etag": api.recv_hdrs.get("ETag") if cache else None,
+            "next": page_number + 1 if len(items) == per_page else None,
+        }
+
+    for issue in iter_pages(fetch_page, cache, cache_key):
+        yield dict2obj(issue) if cache else issue
+
+def iter_jules_sessions(headers, page_size=100, cache=None, session=None):
+    """
+    Yields all Jules sessions, following pagination.
+
+    Args:
+        headers: The headers authenticating the Jules API requests.
+        page_size: The number of sessions requested per page.
+        cache: An optional ListingCache.
+        session: An optional HttpClient, the shared one by default.
+    """
+    http = session or get_client()
+
+    def fetch_page(previous, etag):
+        params = {"pageSize": page_size}
+        if previous:
+            params["pageToken"] = previous["next"]
+        page_headers = {**headers, "If-None-Match": etag} if etag else headers
+        response = http.get(JULES_SESSIONS_URL, headers=page_headers, params=params, endpoint="jules.sessions.list")
+        if etag and response.status_code == 304:
+            return None
+        response.raise_for_status()
+        body = response.json()
+        return {
+            "items": body.get("sessions", []),
+            "etag": response.headers.get("ETag") if cache else None,
+            "next": body.get("nextPageToken") or None,
+        }
+
+    yield from iter_pages(fetch_page, cache, "jules-sessions")
+
+def add_comment_to_issue(repo_owner, repo_name, issue_number, comment_body, api=None):
     """
     Adds a comment to a GitHub issue.
+
+    An existing GhApi client can be passed to avoid creating one per comment.
     """
     try:
-        api = GhApi(owner=repo_owner, repo=repo_name, token=os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"))
+        if api is None:
+            api = GhApi(owner=repo_owner, repo=repo_name, token=os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"))
         api.issues.create_comment(owner=repo_owner, repo=repo_name, issue_number=issue_number, body=comment_body)
         print(f"Comment added to issue #{issue_number}.")
     except Exception as e:
         print(f"Error adding comment to GitHub issue: {e}")
 
-def get_open_issues(repo_owner, repo_name):
+def get_priority(issue):
+    """
+    Returns the priority of an issue from its "priority: *" label, 0 if it has none.
+    """
+    labels = {l.name for l in issue.labels}
+    for label, priority in PRIORITY_ORDER.items():
+        if label in labels:
+            return priority
+    return 0  # Lowest priority
+
+def get_open_issues(repo_owner, repo_name, api=None, cache=None):
     """
     Retrieves open issues with the "status: ready" label from a GitHub repository, sorted by priority.
 
     Args:
         repo_owner: The owner of the repository.
         repo_name: The name of the repository.
+        api: An optional GhApi client to reuse.
+        cache: An optional ListingCache.
 
     Returns:
         A list of open issue objects, or None if no open issues are found.
     """
     try:
-        api = GhApi(owner=repo_owner, repo=repo_name, token=os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"))
-        issues = api.issues.list_for_repo(state='open', labels='status: ready')
+        if api is None:
+            api = GhApi(owner=repo_owner, repo=repo_name, token=os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"))
+        issues = list(iter_open_issues(api, cache=cache, cache_key=f"issues-{repo_owner}-{repo_name}"))
         if issues:
             filtered_issues = [
                 issue
@@ -47,20 +225,6 @@ def get_open_issues(repo_owner, repo_name):
                 if "pull_request" not in issue
             ]
 
-            priority_order = {
-                "priority: critical": 4,
-                "priority: high": 3,
-                "priority: medium": 2,
-                "priority: low": 1,
-            }
-
-            def get_priority(issue):
-                labels = {l.name for l in issue.labels}
-                for label, priority in priority_order.items():
-                    if label in labels:
-                        return priority
-                return 0  # Lowest priority
-
             sorted_issues = sorted(filtered_issues, key=get_priority, reverse=True)
             return sorted_issues
         else:
@@ -69,40 +233,71 @@ def get_open_issues(repo_owner, repo_name):
         print(f"Error retrieving issues from GitHub: {e}")
         return None
 
-def get_active_jules_sessions():
-    """
-    Retrieves all active Jules sessions.
-
-    Returns:
-        A list of active Jules sessions, or None if an error occurs.
-    """
+def _jules_headers():
     jules_api_key = os.getenv("JULES_API_KEY")
     if not jules_api_key:
         print("Error: JULES_API_KEY environment variable not set.")
         return None
 
-    headers = {
+    return {
         "x-goog-api-key": jules_api_key,
         "Content-Type": "application/json",
     }
 
+def get_active_jules_sessions(cache=None, session=None):
+    """
+    Retrieves all active Jules sessions.
+
+    Args:
+        cache: An optional ListingCache.
+        session: An optional HttpClient, the shared one by default.
+
+    Returns:
+        A list of active Jules sessions, or None if an error occurs.
+    """
+    headers = _jules_headers()
+    if headers is None:
+        return None
+
     try:
-        response = requests.get(
-            "https://jules.googleapis.com/v1alpha/sessions",
-            headers=headers,
-        )
-        response.raise_for_status()
-        sessions = response.json().get("sessions", [])
-        active_states = {"QUEUED", "PLANNING", "IN_PROGRESS", "AWAITING_PLAN_APPROVAL", "AWAITING_USER_FEEDBACK"}
         active_sessions = [
-            session for session in sessions if session.get("state") in active_states
+            jules_session for jules_session in iter_jules_sessions(headers, cache=cache, session=session)
+            if jules_session.get("state") in ACTIVE_STATES
         ]
         return active_sessions
     except requests.exceptions.RequestException as e:
         print(f"Error retrieving Jules sessions: {e}")
         return None
 
-def create_jules_session(title, prompt, repo_full_name, starting_branch, require_plan_approval, automation_mode):
+def get_jules_session(session_id, session=None):
+    """
+    Retrieves a Jules session.
+
+    Args:
+        session_id: The id of the session.
+        session: An optional HttpClient, the shared one by default.
+
+    Returns:
+        The session, a session in the NOT_FOUND_STATE state if it does not exist
+        (404), or None if an error occurs.
+    """
+    headers = _jules_headers()
+    if headers is None:
+        return None
+
+    try:
+        response = (session or get_client()).get(f"{JULES_SESSIONS_URL}/{session_id}", headers=headers,
+                                                  endpoint="jules.sessions.get")
+        if response.status_code == 404:
+            return {"id": session_id, "state": NOT_FOUND_STATE}
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"Error retrieving Jules session {session_id}: {e}")
+        return None
+
+def create_jules_session(title, prompt, repo_full_name, starting_branch, require_plan_approval, automation_mode,
+                         session=None):
     """
     Creates a new Jules session.
 
@@ -112,20 +307,15 @@ def create_jules_session(title, prompt, repo_full_name, starting_branch, require
         starting_branch: The starting branch for the session.
         require_plan_approval: If the plan should be approved by a human.
         automation_mode: The automation mode.
+        session: An optional HttpClient, the shared one by default.
 
     Returns:
         The JSON response from the Jules API, or None if an error occurs.
     """
-    jules_api_key = os.getenv("JULES_API_KEY")
-    if not jules_api_key:
-        print("Error: JULES_API_KEY environment variable not set.")
+    headers = _jules_headers()
+    if headers is None:
         return None
 
-    headers = {
-        "x-goog-api-key": jules_api_key,
-        "Content-Type": "application/json",
-    }
-
     source_name = f"sources/github/{repo_full_name}"
 
     data = {
@@ -144,10 +334,11 @@ def create_jules_session(title, prompt, repo_full_name, starting_branch, require
         data["automationMode"] = automation_mode
 
     try:
-        response = requests.post(
-            "https://jules.googleapis.com/v1alpha/sessions",
+        response = (session or get_client()).post(
+            JULES_SESSIONS_URL,
             headers=headers,
             json=data,
+            endpoint="jules.sessions.create",
         )
         response.raise_for_status()  # Raise an exception for bad status codes
         body = response.json()
@@ -156,6 +347,271 @@ def create_jules_session(title, prompt, repo_full_name, starting_branch, require
         print(f"Error creating Jules session: {e}")
         return None
 
+def dispatch_issues(issues, count, parallelism, dispatch):
+    """
+    Dispatches issues in priority order until `count` of them succeeded.
+
+    Up to `parallelism` dispatches run at the same time. Issues are handed out in
+    the order of `issues`, and each round never starts more dispatches than the
+    number of successes still needed, so higher priority issues are always tried
+    first and no more than `count` sessions are created.
+
+    Args:
+        issues: The issues to dispatch, sorted by priority.
+        count: The number of successful dispatches to reach.
+        parallelism: The maximum number of concurrent dispatches.
+        dispatch: A function taking an issue and returning a truthy value on success.
+
+    Returns:
+        The number of successful dispatches.
+    """
+    processed = 0
+    index = 0
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as executor:
+        while processed < count and index < len(issues):
+            batch = issues[index:index + min(parallelism, count - processed)]
+            index += len(batch)
+            processed += sum(1 for result in executor.map(dispatch, batch) if result)
+    return processed
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+class DaemonMetrics:
+    """
+    Capacity and latency metrics of the boss daemon.
+    """
+
+    def __init__(self, max_sessions):
+        self.max_sessions = max_sessions
+        self.in_flight = 0
+        self.dispatched = 0
+        self.failed_dispatches = 0
+        self.finished = 0
+        self.dispatch_latencies = []  # Seconds to create a session and comment on the issue
+        self.queue_waits = []  # Seconds between an issue being seen ready and its dispatch
+        self.session_durations = []  # Seconds between a dispatch and the end of the session
+        self.poll_latencies = []  # Seconds spent polling GitHub and Jules per cycle
+
+    def summary(self):
+        utilization = self.in_flight / self.max_sessions if self.max_sessions else 0.0
+        return (
+            f"capacity {self.in_flight}/{self.max_sessions} ({utilization:.0%}), "
+            f"dispatched {self.dispatched} ({self.failed_dispatches} failed), finished {self.finished}, "
+            f"dispatch p50 {_percentile(self.dispatch_latencies, 50):.2f}s "
+            f"p90 {_percentile(self.dispatch_latencies, 90):.2f}s, "
+            f"queue wait p50 {_percentile(self.queue_waits, 50):.0f}s, "
+            f"poll p50 {_percentile(self.poll_latencies, 50):.2f}s"
+        )
+
+class BossState:
+    """
+    JSON file tracking the sessions started by the daemon and its last issue poll, so a
+    restarted daemon picks up where it left off.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.in_flight = {}  # Session title -> {"session_id", "issue", "dispatched_at"}
+        self.since = None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.in_flight = data.get("in_flight", {})
+            self.since = data.get("since")
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"in_flight": self.in_flight, "since": self.since}, f)
+        os.replace(tmp_path, self.path)
+
+def is_ready(issue):
+    """
+    Returns True if the issue is an open "status: ready" issue (and not a pull request).
+    """
+    return (
+        issue.get("state", "open") == "open"
+        and "pull_request" not in issue
+        and "status: ready" in {l.name for l in issue.labels}
+    )
+
+class BossDaemon:
+    """
+    Long-running scheduler keeping Jules busy with the ready issues of a repository.
+
+    The GitHub and Jules clients stay open between cycles. Issues are polled
+    incrementally with `since=`, while in-flight sessions are polled more often so
+    that a free slot is filled as soon as a session finishes. Ready issues wait in
+    an IssueScheduler, so long-waiting low priority issues are eventually served.
+    """
+
+    def __init__(self, repo_full_name, api, state, http=None, max_sessions=3, parallelism=1, branch="master",
+                 require_plan_approval=True, automation_mode=None, issue_interval=60, session_interval=15,
+                 aging_rate=0.2):
+        self.repo_full_name = repo_full_name
+        self.repo_owner, self.repo_name = repo_full_name.split('/')
+        self.api = api
+        self.state = state
+        self.http = http
+        self.max_sessions = max_sessions
+        self.parallelism = parallelism
+        self.branch = branch
+        self.require_plan_approval = require_plan_approval
+        self.automation_mode = automation_mode
+        self.issue_interval = issue_interval
+        self.session_interval = session_interval
+        self.scheduler = IssueScheduler(max_sessions, aging_rate=aging_rate)
+        for entry in state.in_flight.values():
+            self.scheduler.mark_in_flight(repo_full_name, entry["issue"])
+        self.metrics = DaemonMetrics(max_sessions)
+        self._synced = False
+        self._lock = threading.Lock()
+
+    def _title(self, issue):
+        return f"{self.repo_full_name}#{issue.number}"
+
+    def adopt_active_sessions(self):
+        """
+        Counts the active sessions of the repository started elsewhere (e.g. by a cron run).
+        Sessions whose title is not "<repository>#<issue number>" are ignored.
+        """
+        title_pattern = re.compile(rf"{re.escape(self.repo_full_name)}#(\d+)")
+        for jules_session in get_active_jules_sessions(session=self.http) or []:
+            title = jules_session.get("title") or ""
+            match = title_pattern.fullmatch(title)
+            if match and title not in self.state.in_flight:
+                number = int(match.group(1))
+                self.state.in_flight[title] = {
+                    "session_id": jules_session.get("id"),
+                    "issue": number,
+                    "dispatched_at": time.time(),
+                }
+                self.scheduler.mark_in_flight(self.repo_full_name, number)
+        self.state.save()
+
+    def refresh_issues(self):
+        """
+        Updates the ready issues: a full listing on the first call, then only the issues
+        updated since the previous poll.
+        """
+        poll_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if not self._synced or self.state.since is None:
+            issues = [issue for issue in iter_open_issues(self.api) if is_ready(issue)]
+            listed = {issue.number for issue in issues}
+            for number in self.scheduler.queued_numbers(self.repo_full_name) - listed:
+                self.scheduler.remove(self.repo_full_name, number)
+            self._synced = True
+        else:
+            query = dict(state='all', sort='updated', direction='asc', since=self.state.since)
+            issues = list(iter_issues(self.api, query))
+        for issue in issues:
+            if is_ready(issue):
+                self.scheduler.push(self.repo_full_name, issue.number, issue, get_priority(issue))
+            else:
+                self.scheduler.remove(self.repo_full_name, issue.number)
+        self.state.since = poll_time
+
+    def refresh_sessions(self):
+        """
+        Releases the slots of the in-flight sessions that are no longer active or no
+        longer exist. Sessions that could not be retrieved are checked again on the
+        next cycle.
+        """
+        for title, entry in list(self.state.in_flight.items()):
+            jules_session = get_jules_session(entry["session_id"], session=self.http)
+            if jules_session is None:
+                continue  # Try again on the next cycle
+            session_state = jules_session.get("state")
+            if session_state not in ACTIVE_STATES:
+                del self.state.in_flight[title]
+                self.scheduler.release(self.repo_full_name, entry["issue"])
+                self.metrics.finished += 1
+                self.metrics.session_durations.append(time.time() - entry["dispatched_at"])
+                print(f"Jules session for {title} is over ({session_state}).")
+
+    def dispatch(self, entry):
+        """
+        Creates a Jules session for an issue taken from the scheduler and comments on the issue.
+
+        An issue whose session could not be created goes back to the scheduler.
+
+        Returns:
+            The URL of the session, or None if it could not be created.
+        """
+        started = time.monotonic()
+        issue = entry.issue
+        title = self._title(issue)
+        prompt = ISSUE_TEMPLATE.substitute(**issue)
+        session_url = create_jules_session(title, prompt, self.repo_full_name, self.branch,
+                                           self.require_plan_approval, self.automation_mode, session=self.http)
+        if not session_url:
+            with self._lock:
+                self.scheduler.requeue(entry)
+                self.metrics.failed_dispatches += 1
+            return None
+
+        print(f"Jules session created for issue #{issue.number}: {session_url}")
+        add_comment_to_issue(self.repo_owner, self.repo_name, issue.number, f"Jules session created: {session_url}",
+                             api=self.api)
+        with self._lock:
+            self.state.in_flight[title] = {
+                "session_id": session_url.rsplit("/", 1)[-1],
+                "issue": issue.number,
+                "dispatched_at": time.time(),
+            }
+            self.metrics.dispatched += 1
+            self.metrics.dispatch_latencies.append(time.monotonic() - started)
+            self.metrics.queue_waits.append(self.scheduler.clock() - entry.enqueued_at)
+        return session_url
+
+    def fill_capacity(self):
+        """
+        Dispatches the most urgent ready issues into the free session slots.
+        """
+        with self._lock:
+            entries = self.scheduler.pop_ready()
+        if entries:
+            with ThreadPoolExecutor(max_workers=max(1, self.parallelism)) as executor:
+                list(executor.map(self.dispatch, entries))
+
+    def run_once(self, poll_issues=True):
+        """
+        Runs one scheduling cycle.
+        """
+        started = time.monotonic()
+        self.refresh_sessions()
+        if poll_issues:
+            self.refresh_issues()
+        self.metrics.poll_latencies.append(time.monotonic() - started)
+        self.fill_capacity()
+        self.metrics.in_flight = len(self.state.in_flight)
+        self.state.save()
+        print(self.metrics.summary())
+
+    def run(self):
+        """
+        Runs scheduling cycles until interrupted.
+        """
+        self.adopt_active_sessions()
+        next_issue_poll = 0.0
+        while True:
+            now = time.monotonic()
+            poll_issues = now >= next_issue_poll
+            if poll_issues:
+                next_issue_poll = now + self.issue_interval
+            try:
+                self.run_once(poll_issues)
+            except Exception as e:
+                print(f"Error during scheduling cycle: {e}")
+            time.sleep(self.session_interval)
+
 def main():
     """
     Main function to run the script.
@@ -164,7 +620,24 @@ def main():
     parser.add_argument("repository", help="The GitHub repository in 'owner/repo' format.")
     parser.add_argument("--branch", default="master", help="The starting branch for the Jules session.")
     parser.add_argument("--count", type=int, default=1, help="Number of issues to send to Jules for processing.")
+    parser.add_argument("--parallel", type=int, default=1,
+                        help="Maximum number of Jules sessions created concurrently.")
     parser.add_argument("--no-pr", action="store_true", help="Do not create a pull request.")
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="Cache issue and session listings for this many seconds, then revalidate them "
+                             "with conditional requests (0 always revalidates). Disabled by default.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the listing cache.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and fill free Jules capacity as soon as sessions finish.")
+    parser.add_argument("--max-sessions", type=int, default=3,
+                        help="Maximum number of concurrent Jules sessions in daemon mode.")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between issue polls in daemon mode.")
+    parser.add_argument("--session-interval", type=float, default=15,
+                        help="Seconds between session status polls in daemon mode.")
+    parser.add_argument("--aging", type=float, default=0.2,
+                        help="Priority points gained per hour by waiting issues in daemon mode.")
+    parser.add_argument("--state-file", default=None,
+                        help="State file of the daemon (default: <cache-dir>/state-<owner>-<repo>.json).")
     parser.set_defaults(require_plan_approval=True)
     parser.add_argument("--no-plan-approval", dest="require_plan_approval", action="store_false",
                         help="Do not require plan approval.")
@@ -177,30 +650,46 @@ def main():
         print("Error: Invalid repository format. Please use 'owner/repo'.")
         return
 
+    # A single GitHub client is shared by the issue listing and all dispatches.
+    api = GhApi(owner=repo_owner, repo=repo_name, token=os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"))
+    cache = ListingCache(args.cache_dir, args.cache_ttl) if args.cache_ttl is not None else None
+    automation_mode = "AUTO_CREATE_PR" if not args.no_pr else None
+
+    if args.daemon:
+        state_file = args.state_file or os.path.join(args.cache_dir, f"state-{repo_owner}-{repo_name}.json")
+        daemon = BossDaemon(repo_full_name, api, BossState(state_file), http=get_client(),
+                            max_sessions=args.max_sessions, parallelism=args.parallel, branch=args.branch,
+                            require_plan_approval=args.require_plan_approval, automation_mode=automation_mode,
+                            issue_interval=args.interval, session_interval=args.session_interval,
+                            aging_rate=args.aging)
+        print(f"Scheduling issues of {repo_full_name} on up to {args.max_sessions} Jules sessions...")
+        try:
+            daemon.run()
+        except KeyboardInterrupt:
+            print(daemon.metrics.summary())
+            print(get_client().report())
+        return
+
     print(f"Retrieving open issues from {repo_full_name}...")
-    issues = get_open_issues(repo_owner, repo_name)
+    issues = get_open_issues(repo_owner, repo_name, api=api, cache=cache)
 
     if not issues:
         print("No open issues with 'status: ready' label found.")
         return
 
     print("Checking for active Jules sessions...")
-    active_sessions = get_active_jules_sessions()
+    active_sessions = get_active_jules_sessions(cache=cache)
     active_titles = {session.get("title") for session in active_sessions} if active_sessions else set()
 
-    automation_mode = "AUTO_CREATE_PR" if not args.no_pr else None
-
-    issues_processed = 0
+    candidates = []
     for issue in issues:
-        if issues_processed >= args.count:
-            print(f"Processed {args.count} issues, stopping.")
-            break
-
-        title = f"{repo_full_name}#{issue.number}"
-        if title in active_titles:
+        if f"{repo_full_name}#{issue.number}" in active_titles:
             print(f"Jules is already working on issue #{issue.number}.")
             continue
+        candidates.append(issue)
 
+    def dispatch(issue):
+        title = f"{repo_full_name}#{issue.number}"
         print(f"Found issue to work on: #{issue.number}")
         prompt = ISSUE_TEMPLATE.substitute(**issue)
 
@@ -209,8 +698,13 @@ def main():
                                              automation_mode)
         if session_url:
             print(f"Jules session created successfully: {session_url}")
-            add_comment_to_issue(repo_owner, repo_name, issue.number, f"Jules session created: {session_url}")
-            issues_processed += 1
+            add_comment_to_issue(repo_owner, repo_name, issue.number, f"Jules session created: {session_url}", api=api)
+        return session_url
+
+    issues_processed = dispatch_issues(candidates, args.count, args.parallel, dispatch)
+    if issues_processed >= args.count:
+        print(f"Processed {args.count} issues, stopping.")
+        return
 
 
     print("All open issues are already being worked on by Jules.")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+"""
+Precomputes a searchable index of the sections of the markdown guides in data/.
+
+Each heading of a guide is a section, keyed by its heading path (e.g.
+"srs-guide > 2. Structural Composition of the SRS > 2.1 Section 1: Introduction")
+and holding its text up to its first subsection. The index is saved as the
+sections and, when built with embeddings, their vectors: loading it only
+rebuilds the BM25 index (about 30 ms for the guides of data/), without parsing
+or embedding the guides again, and keyword searches take under a millisecond.
+
+The index is rebuilt when a guide changes, reusing the vectors of the sections
+whose text did not change.
+
+Usage:
+    python -m playground.guide_index --data-dir data --output data/ephemeral/guide-index
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from tree_sitter import Language, Parser
+from tree_sitter_markdown import language as markdown_language
+
+from playground.langchain.hybrid_retriever import BM25Index, VectorIndex, reciprocal_rank_fusion
+from playground.markdown_query import Heading, build_heading_tree
+
+DEFAULT_DATA_DIR = "data"
+DEFAULT_INDEX_PATH = "data/ephemeral/guide-index"
+SECTIONS_FILENAME = "sections.json"
+VECTORS_FILENAME = "vectors.npy"
+KEY_SEPARATOR = " > "
+# Characters of a section embedded, about 2k tokens
+EMBEDDED_CHARACTERS = 8000
+MAX_TITLE_LENGTH = 120
+WORD_PATTERN = re.compile(r"\w")
+
+
+def guide_paths(data_dir: str = DEFAULT_DATA_DIR) -> List[str]:
+    """The markdown guides and roadmaps of `data_dir`."""
+    return sorted(glob.glob(os.path.join(data_dir, "*.md")))
+
+
+def clean_heading(text: str) -> str:
+    """Heading text without its emphasis markers and escapes, e.g. `**1\\. Scope**` -> `1. Scope`."""
+    return " ".join(re.sub(r"[*\\]", "", text).split())
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@dataclass
+class GuideSection:
+    """A section of a guide, with its text up to its first subsection."""
+    key: str
+    guide: str  # Name of the guide file, without the .md extension
+    headings: List[str]
+    content: str
+    subtree_end: int  # Index of the first section after its subsections
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(f"{self.key}\n{self.content}".encode("utf-8")).hexdigest()
+
+    def indexed_text(self) -> str:
+        """The text searched and embedded: the heading path, then the content."""
+        return f"{self.key}\n\n{self.content}"
+
+
+def parse_sections(path: str, parser: Optional[Parser] = None) -> List[GuideSection]:
+    """
+    Return the sections of a markdown file in document order, its text before the first heading included.
+
+    Sections with the same heading path are numbered to keep their keys unique,
+    e.g. `Usage > Example` then `Usage > Example (2)`.
+    """
+    if parser is None:
+        parser = Parser()
+        parser.language = Language(markdown_language())
+    with open(path, "rb") as f:
+        source = f.read()
+    guide = os.path.splitext(os.path.basename(path))[0]
+    headings = build_heading_tree(parser.parse(source).root_node, source)
+    sections = []
+    keys = set()
+
+    def add(start: int, end: int, path_headings: List[str]) -> int:
+        index = len(sections)
+        content = source[start:end].decode("utf-8", errors="replace").strip()
+        key = KEY_SEPARATOR.join([guide] + path_headings)
+        keys.add(key)
+        sections.append(GuideSection(key, guide, path_headings, content, index + 1))
+        return index
+
+    def title(node: Heading, own_end: int) -> str:
+        text = clean_heading(node.text)
+        if WORD_PATTERN.search(text):
+            return text
+        # A heading without words (e.g. a `## ---` rule) is named after its first line
+        lines = source[node.start_byte:own_end].decode("utf-8", errors="replace").splitlines()[1:]
+        return next((clean_heading(line) for line in lines if WORD_PATTERN.search(line)), text)[:MAX_TITLE_LENGTH]
+
+    def visit(nodes: List[Heading], parent_path: List[str]) -> None:
+        for node in nodes:
+            own_end = node.children[0].start_byte if node.children else node.end_byte
+            name = title(node, own_end)
+            path_headings = parent_path + [name]
+            number = 1
+            while KEY_SEPARATOR.join([guide] + path_headings) in keys:
+                number += 1
+                path_headings = parent_path + [f"{name} ({number})"]
+            index = add(node.start_byte, own_end, path_headings)
+            visit(node.children, path_headings)
+            sections[index].subtree_end = len(sections)
+
+    preamble = source[:headings[0].start_byte] if headings else source
+    if len(headings) == 1 and not preamble.strip():
+        # The title of the guide: its sections are keyed by the name of the guide instead
+        root = headings[0]
+        add(root.start_byte, root.children[0].start_byte if root.children else root.end_byte, [])
+        visit(root.children, [])
+        sections[0].subtree_end = len(sections)
+        return sections
+    if preamble.strip():
+        add(0, len(preamble), [])
+    visit(headings, [])
+    return sections
+
+
+class GuideIndex:
+    """
+    Keyword (BM25) and, optionally, vector index of the sections of guides.
+
+    With vectors and the embeddings they were built with, searches embed the
+    query and fuse both rankings with reciprocal rank fusion; otherwise they only
+    use the keyword index.
+    """
+
+    def __init__(self, sections: Sequence[GuideSection], sources: Dict[str, str],
+                 vectors: Optional[np.ndarray] = None, embeddings: Optional[Embeddings] = None):
+        """
+        Args:
+            sections: The sections, in document order.
+            sources: The SHA-256 of each guide file the sections come from.
+            vectors: The vectors of the sections, if any.
+            embeddings: The embeddings the vectors were built with, to embed queries.
+        """
+        self.sections = list(sections)
+        self.sources = dict(sources)
+        self.vectors = vectors
+        self.embeddings = embeddings
+        self._keys = {section.key: index for index, section in enumerate(self.sections)}
+        self._keyword_index = BM25Index()
+        self._keyword_index.add(section.indexed_text() for section in self.sections)
+        self._vector_index = None
+        if vectors is not None and len(vectors):
+            self._vector_index = VectorIndex()
+            self._vector_index.add(vectors)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    @property
+    def guides(self) -> List[str]:
+        return sorted({section.guide for section in self.sections})
+
+    @classmethod
+    def build(cls, paths: Sequence[str], embeddings: Optional[Embeddings] = None,
+              previous: Optional["GuideIndex"] = None) -> "GuideIndex":
+        """
+        Parse the sections of the guides at `paths` and, with `embeddings`, embed
+        them, except the sections whose vectors are in the `previous` index.
+        """
+        parser = Parser()
+        parser.language = Language(markdown_language())
+        sections = []
+        for path in paths:
+            offset = len(sections)
+            for section in parse_sections(path, parser):
+                section.subtree_end += offset
+                sections.append(section)
+        sources = {path: _sha256(path) for path in paths}
+        vectors = None
+        if embeddings is not None:
+            known = {}
+            if previous is not None and previous.vectors is not None:
+                known = {section.content_hash: vector for section, vector in zip(previous.sections, previous.vectors)}
+            missing = [section for section in sections if section.content_hash not in known]
+            if missing:
+                embedded = embeddings.embed_documents(
+                    [section.indexed_text()[:EMBEDDED_CHARACTERS] for section in missing])
+                known.update((section.content_hash, np.asarray(vector, dtype=np.float32))
+                             for section, vector in zip(missing, embedded))
+            vectors = np.asarray([known[section.content_hash] for section in sections], dtype=np.float32)
+        return cls(sections, sources, vectors, embeddings)
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        vectors_path = os.path.join(path, VECTORS_FILENAME)
+        if self.vectors is not None:
+            np.save(vectors_path, self.vectors)
+        elif os.path.exists(vectors_path):
+            os.remove(vectors_path)
+        temporary = os.path.join(path, f"{SECTIONS_FILENAME}.tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources, "sections": [asdict(section) for section in self.sections]}, f,
+                      ensure_ascii=False)
+        os.replace(temporary, os.path.join(path, SECTIONS_FILENAME))
+
+    @classmethod
+    def load(cls, path: str, embeddings: Optional[Embeddings] = None) -> "GuideIndex":
+        """Load a saved index, searching its vectors too if given the `embeddings` it was built with."""
+        with open(os.path.join(path, SECTIONS_FILENAME), encoding="utf-8") as f:
+            data = json.load(f)
+        vectors_path = os.path.join(path, VECTORS_FILENAME)
+        vectors = np.load(vectors_path) if os.path.exists(vectors_path) else None
+        return cls([GuideSection(**section) for section in data["sections"]], data["sources"], vectors, embeddings)
+
+    def is_stale(self, paths: Sequence[str]) -> bool:
+        """Whether the guides at `paths` are not the ones indexed."""
+        return set(paths) != set(self.sources) or any(_sha256(path) != self.sources[path] for path in paths)
+
+    def get(self, key: str) -> Optional[GuideSection]:
+        index = self._keys.get(key)
+        return self.sections[index] if index is not None else None
+
+    def subsections(self, key: str) -> List[GuideSection]:
+        """The section of `key` followed by all its subsections, in document order."""
+        index = self._keys.get(key)
+        if index is None:
+            return []
+        return self.sections[index:self.sections[index].subtree_end]
+
+    def search(self, query: str, k: int = 3, guide: Optional[str] = None,
+               fetch_k: int = 20) -> List[Tuple[GuideSection, float]]:
+        """
+        Return the `k` sections most relevant to `query`, with their BM25 score, or
+        their fused score when the vectors are searched too.
+
+        Args:
+            query: The text searched.
+            k: The number of sections.
+            guide: Only search the sections of this guide, e.g. "srs-guide".
+            fetch_k: The number of results of each index to fuse.
+        """
+        def allowed(doc_id: int) -> bool:
+            return guide is None or self.sections[doc_id].guide == guide
+
+        # A guide filter keeps a fraction of the sections: all keyword matches are ranked
+        keyword = [(doc_id, score) for doc_id, score in
+                   self._keyword_index.search(query, fetch_k if guide is None else len(self)) if allowed(doc_id)]
+        if self._vector_index is None or self.embeddings is None:
+            return [(self.sections[doc_id], score) for doc_id, score in keyword[:k]]
+        vector = self.embeddings.embed_query(query)
+        nearest = [(doc_id, score) for doc_id, score in
+                   self._vector_index.search(vector, fetch_k if guide is None else len(self)) if allowed(doc_id)]
+        fused = reciprocal_rank_fusion([[doc_id for doc_id, _ in keyword[:fetch_k]],
+                                        [doc_id for doc_id, _ in nearest[:fetch_k]]])
+        return [(self.sections[doc_id], score) for doc_id, score in fused[:k]]
+
+
+def load_or_build(data_dir: str = DEFAULT_DATA_DIR, index_path: str = DEFAULT_INDEX_PATH,
+                  embeddings: Optional[Embeddings] = None) -> GuideIndex:
+    """
+    Load the index of the guides of `data_dir` saved at `index_path`, building and
+    saving it again if missing or out of date (or missing its vectors, with
+    `embeddings`).
+    """
+    paths = guide_paths(data_dir)
+    previous = None
+    if os.path.exists(os.path.join(index_path, SECTIONS_FILENAME)):
+        previous = GuideIndex.load(index_path, embeddings)
+        if not previous.is_stale(paths) and (embeddings is None or previous.vectors is not None):
+            return previous
+    index = GuideIndex.build(paths, embeddings, previous)
+    index.save(index_path)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the section index of the markdown guides.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory of the markdown guides.")
+    parser.add_argument("--output", default=DEFAULT_INDEX_PATH, help="Directory of the index.")
+    parser.add_argument("--embedding-model", default=None,
+                        help="Google embedding model of the section vectors, e.g. models/gemini-embedding-001 "
+                             "(keyword index only by default).")
+    parser.add_argument("--query", default=None, help="Search the index for this query once built.")
+    args = parser.parse_args()
+
+    embeddings = None
+    if args.embedding_model:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+        from playground.langchain.embedding_cache import CachedEmbeddings
+
+        embeddings = CachedEmbeddings(GoogleGenerativeAIEmbeddings(model=args.embedding_model),
+                                      namespace=args.embedding_model.split("/")[-1])
+
+    started = time.perf_counter()
+    index = load_or_build(args.data_dir, args.output, embeddings)
+    vectors = "with" if index.vectors is not None else "without"
+    print(f"{len(index)} sections of {len(index.guides)} guides {vectors} vectors in {args.output} "
+          f"({time.perf_counter() - started:.2f}s)")
+    if args.query:
+        started = time.perf_counter()
+        results = index.search(args.query)
+        elapsed = time.perf_counter() - started
+        for section, score in results:
+            print(f"{score:8.3f}  {section.key}")
+        print(f"Searched in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from weakref import WeakKeyDictionary
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def _not_sent(error: requests.exceptions.RequestException) -> bool:
+    """Return True if the request failed before reaching the server."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a host after `failure_threshold` consecutive failures.
+
+    Once `reset_timeout` seconds have passed, a single trial request is let through:
+    it closes the circuit if it succeeds and opens it again if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def cancel_trial(self) -> None:
+        """Let another trial request through after one that ended without an outcome."""
+        with self._lock:
+            self._trial = False
+
+
+class EndpointMetrics:
+    """Request counts and latencies of one endpoint, keeping the last `window` latencies."""
+
+    def __init__(self, window: int = 1000):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=window)
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+class _ResilientClient:
+    """
+    Timeouts, retries, circuit breakers and endpoint metrics shared by the sync and
+    async clients.
+    """
+
+    def __init__(self, timeout, retries, backoff, max_backoff, failure_threshold, reset_timeout):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics: Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[host] = breaker
+            return breaker
+
+    def _endpoint_metrics(self, endpoint: str) -> EndpointMetrics:
+        with self._lock:
+            metrics = self._metrics.get(endpoint)
+            if metrics is None:
+                metrics = EndpointMetrics()
+                self._metrics[endpoint] = metrics
+            return metrics
+
+    def _prepare(self, method: str, url: str, endpoint: Optional[str], retry: Optional[bool]):
+        """Return the method, host, endpoint name and retry flag of a request."""
+        method = method.upper()
+        parsed = urlparse(url)
+        endpoint = endpoint or f"{method} {parsed.netloc}{parsed.path}"
+        retry = method in IDEMPOTENT_METHODS if retry is None else retry
+        return method, parsed.netloc, endpoint, retry
+
+    def _check_circuit(self, host: str, endpoint: str) -> CircuitBreaker:
+        breaker = self._breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {host}, not calling {endpoint}")
+        return breaker
+
+    def _on_error(self, breaker: CircuitBreaker, metrics: EndpointMetrics, started: float, attempt: int,
+                  retry: bool, not_sent: bool) -> bool:
+        """Record a failed attempt and return True if it can be retried."""
+        breaker.record_failure()
+        with self._lock:
+            metrics.requests += 1
+            metrics.errors += 1
+            metrics.latencies.append(time.monotonic() - started)
+        # A request that never reached the server is always safe to resend
+        return attempt < self.retries and (retry or not_sent)
+
+    def _on_response(self, breaker: CircuitBreaker, metrics: EndpointMetrics, started: float, attempt: int,
+                     retry: bool, status_code: int) -> bool:
+        """Record a response and return True if the request should be retried."""
+        if status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        with self._lock:
+            metrics.requests += 1
+            metrics.errors += status_code >= 400
+            metrics.latencies.append(time.monotonic() - started)
+        # 429 means the request was rejected before being processed
+        return (status_code in RETRY_STATUSES and attempt < self.retries
+                and (retry or status_code == 429))
+
+    def _delay(self, attempt: int, metrics: EndpointMetrics, headers=None) -> float:
+        with self._lock:
+            metrics.retries += 1
+        retry_after = headers.get("Retry-After") if headers is not None else None
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass  # An HTTP date: fall back to the backoff
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def metrics(self) -> Dict[str, dict]:
+        """Return the request count, error count, retries and latency percentiles per endpoint."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": metrics.requests,
+                    "errors": metrics.errors,
+                    "retries": metrics.retries,
+                    "p50": metrics.percentile(50),
+                    "p90": metrics.percentile(90),
+                    "p99": metrics.percentile(99),
+                }
+                for endpoint, metrics in self._metrics.items()
+            }
+
+    def report(self) -> str:
+        """Return a human readable table of the endpoint metrics."""
+        lines = []
+        for endpoint, metrics in sorted(self.metrics().items()):
+            lines.append(
+                f"{endpoint}: {metrics['requests']} requests, {metrics['errors']} errors, "
+                f"{metrics['retries']} retries, p50 {metrics['p50']:.3f}s p90 {metrics['p90']:.3f}s "
+                f"p99 {metrics['p99']:.3f}s"
+            )
+        return "\n".join(lines)
+
+
+class HttpClient(_ResilientClient):
+    """
+    Shared HTTP client of the playground tools.
+
+    All requests go through one `requests.Session`, so connections are kept alive
+    and pooled per host. Every request has a timeout. Connection errors, timeouts
+    and retryable statuses (429, 5xx) are retried with exponential backoff and full
+    jitter, honoring `Retry-After`. Non-idempotent requests (e.g. POST) are only
+    retried when the request never reached the server, unless `retry=True` is given.
+    Consecutive failures open a per-host circuit breaker. Latencies are recorded per
+    endpoint.
+    """
+
+    def __init__(
+            self,
+            timeout=(5.0, 60.0),
+            retries: int = 3,
+            backoff: float = 0.5,
+            max_backoff: float = 10.0,
+            pool_maxsize: int = 20,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30.0,
+            session: Optional[requests.Session] = None,
+    ):
+        """
+        Args:
+            timeout: The default (connect, read) timeout in seconds.
+            retries: The maximum number of retries of a request.
+            backoff: The base delay of the exponential backoff, in seconds.
+            max_backoff: The maximum delay between two attempts, in seconds.
+            pool_maxsize: The maximum number of kept-alive connections per host.
+            failure_threshold: The number of consecutive failures opening the circuit of a host.
+            reset_timeout: The number of seconds before an open circuit lets a trial request through.
+            session: An optional session to use instead of a new one.
+        """
+        super().__init__(timeout, retries, backoff, max_backoff, failure_threshold, reset_timeout)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def request(self, method: str, url: str, endpoint: Optional[str] = None, retry: Optional[bool] = None,
+                **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying it on transient failures.
+
+        Args:
+            method: The HTTP method.
+            url: The URL of the request.
+            endpoint: The name under which the latency is recorded, by default the
+                method, host and path of the URL.
+            retry: Whether failed requests can be retried, by default True for
+                idempotent methods only.
+            **kwargs: The arguments of `requests.Session.request`.
+
+        Returns:
+            The last response, which may have an error status.
+
+        Raises:
+            CircuitOpenError: If the circuit of the host is open.
+            requests.exceptions.RequestException: If the last attempt failed.
+        """
+        method, host, endpoint, retry = self._prepare(method, url, endpoint, retry)
+        kwargs.setdefault("timeout", self.timeout)
+        metrics = self._endpoint_metrics(endpoint)
+
+        attempt = 0
+        while True:
+            breaker = self._check_circuit(host, endpoint)
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if not self._on_error(breaker, metrics, started, attempt, retry, _not_sent(e)):
+                    raise
+                headers = None
+            except BaseException:
+                # Neither a response nor a network failure (e.g. invalid arguments, an interrupt)
+                breaker.cancel_trial()
+                raise
+            else:
+                if not self._on_response(breaker, metrics, started, attempt, retry, response.status_code):
+                    return response
+                headers = response.headers
+                response.close()
+
+            time.sleep(self._delay(attempt, metrics, headers))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncResponse:
+    """
+    Fully read response of the AsyncHttpClient, mirroring the `requests.Response`
+    attributes used by the tools.
+    """
+
+    def __init__(self, url: str, status_code: int, headers, content: bytes, encoding: Optional[str]):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class AsyncHttpClient(_ResilientClient):
+    """
+    Async counterpart of HttpClient, built on `aiohttp`.
+
+    Many requests can run concurrently on one event loop, sharing the kept-alive
+    connections of the client. Retries, circuit breaking and metrics behave as in
+    HttpClient, and failures raise the same `requests` exceptions.
+    """
+
+    def __init__(
+            self,
+            timeout=(5.0, 60.0),
+            retries: int = 3,
+            backoff: float = 0.5,
+            max_backoff: float = 10.0,
+            max_connections: int = 100,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            timeout: The default (connect, read) timeout in seconds.
+            retries: The maximum number of retries of a request.
+            backoff: The base delay of the exponential backoff, in seconds.
+            max_backoff: The maximum delay between two attempts, in seconds.
+            max_connections: The maximum number of open connections.
+            failure_threshold: The number of consecutive failures opening the circuit of a host.
+            reset_timeout: The number of seconds before an open circuit lets a trial request through.
+        """
+        super().__init__(timeout, retries, backoff, max_backoff, failure_threshold, reset_timeout)
+        self.max_connections = max_connections
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        # Created on first use: an aiohttp session belongs to the running event loop
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+        return self.session
+
+    async def request(self, method: str, url: str, endpoint: Optional[str] = None, retry: Optional[bool] = None,
+                      **kwargs) -> AsyncResponse:
+        """
+        Sends a request, retrying it on transient failures.
+
+        Takes the same arguments as `HttpClient.request`, with the keyword arguments
+        of `aiohttp.ClientSession.request`.
+
+        Raises:
+            CircuitOpenError: If the circuit of the host is open.
+            requests.exceptions.RequestException: If the last attempt failed.
+        """
+        method, host, endpoint, retry = self._prepare(method, url, endpoint, retry)
+        connect, read = _split_timeout(kwargs.pop("timeout", self.timeout))
+        kwargs["timeout"] = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        metrics = self._endpoint_metrics(endpoint)
+
+        attempt = 0
+        while True:
+            breaker = self._check_circuit(host, endpoint)
+            started = time.monotonic()
+            try:
+                async with self._session().request(method, url, **kwargs) as response:
+                    content = await response.read()
+                    result = AsyncResponse(url, response.status, response.headers, content,
+                                           response.get_encoding() if content else None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                not_sent = isinstance(e, (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError))
+                if not self._on_error(breaker, metrics, started, attempt, retry, not_sent):
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise requests.exceptions.Timeout(str(e) or f"Timeout calling {endpoint}") from e
+                    raise requests.exceptions.ConnectionError(str(e)) from e
+                headers = None
+            except BaseException:
+                # Neither a response nor a network failure (e.g. invalid arguments, a cancellation)
+                breaker.cancel_trial()
+                raise
+            else:
+                if not self._on_response(breaker, metrics, started, attempt, retry, result.status_code):
+                    return result
+                headers = result.headers
+
+            await asyncio.sleep(self._delay(attempt, metrics, headers))
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+
+def _split_timeout(timeout):
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the HttpClient shared by the playground tools, creating it on first use."""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHttpClient]" = WeakKeyDictionary()
+
+
+def get_async_client() -> AsyncHttpClient:
+    """Return the AsyncHttpClient shared by the playground tools on the running event loop.
+
+    aiohttp connections belong to the event loop they were opened on, so each loop
+    gets its own client.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = AsyncHttpClient()
+            _async_clients[loop] = client
+        return client
@@ -1,3 +1,42 @@
+from .crawl_checkpoint import CrawlCheckpoint
+from .crawl_stats import CrawlStats, PageMetrics
+from .dedup import BoilerplateFilter, ChunkDeduplicator, DedupStats, MinHasher, NearDuplicateIndex
+from .embedding_cache import CachedEmbeddings, VectorCache
+from .hybrid_retriever import BM25Index, LocalHybridRetriever, VectorIndex, reciprocal_rank_fusion
+from .ingestion import IngestionPipeline, IngestionResult
+from .markdown_chunker import MarkdownHeadingChunker
+from .opensearch_retriever import OpenSearchRRFRetriever
+from .quantized_vector_store import QuantizedVectorIndex, QuantizedVectorStore
+from .rate_limiter import HostRateLimiter, TokenBucket
+from .record_manager import SQLiteRecordManager
+from .sitemap import SitemapEntry, parse_sitemap
 from .unstructured_recursive_url_loader import UnstructuredRecursiveUrlLoader
 
-__all__ = ["UnstructuredRecursiveUrlLoader"]
+__all__ = [
+    "BM25Index",
+    "BoilerplateFilter",
+    "CachedEmbeddings",
+    "ChunkDeduplicator",
+    "CrawlCheckpoint",
+    "CrawlStats",
+    "DedupStats",
+    "HostRateLimiter",
+    "IngestionPipeline",
+    "IngestionResult",
+    "LocalHybridRetriever",
+    "MarkdownHeadingChunker",
+    "MinHasher",
+    "NearDuplicateIndex",
+    "OpenSearchRRFRetriever",
+    "PageMetrics",
+    "QuantizedVectorIndex",
+    "QuantizedVectorStore",
+    "SQLiteRecordManager",
+    "SitemapEntry",
+    "TokenBucket",
+    "UnstructuredRecursiveUrlLoader",
+    "VectorCache",
+    "VectorIndex",
+    "parse_sitemap",
+    "reciprocal_rank_fusion",
+]
@@ -0,0 +1,95 @@
+import sqlite3
+from typing import Iterable, List, Optional, Set, Tuple
+
+
+class CrawlCheckpoint:
+    """SQLite journal of a recursive crawl, used to resume it after an interruption.
+
+    Every page known to the crawl is recorded with the depth it was discovered at.
+    A page stays in the frontier until the documents it produced have been handed to
+    the consumer, at which point the number of emitted documents is written to the
+    ledger, along with the sitemap ``lastmod`` of the page when known. Pages are
+    therefore emitted at least once: a page whose documents were yielded right before
+    the process died is emitted again on resume.
+    """
+
+    def __init__(self, path: str, root_url: str):
+        """Open (or create) the checkpoint file.
+
+        Args:
+            path: Path of the SQLite file holding the checkpoint.
+            root_url: Root URL of the crawl. Resuming a checkpoint written for another
+                root URL raises a ``ValueError``.
+        """
+        self.path = path
+        self.root_url = root_url
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS pages (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                depth INTEGER NOT NULL,
+                emitted INTEGER,
+                lastmod TEXT
+            );
+            """
+        )
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'root_url'").fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('root_url', ?)", (root_url,))
+            self._conn.commit()
+        elif row[0] != root_url:
+            raise ValueError(
+                f"Checkpoint {path} was written for {row[0]}, not {root_url}"
+            )
+
+    def restore(self) -> Tuple[List[Tuple[str, int]], Set[str]]:
+        """Return the pending frontier, in discovery order, and the visited set."""
+        rows = self._conn.execute("SELECT url, depth, emitted FROM pages ORDER BY seq").fetchall()
+        frontier = [(url, depth) for url, depth, emitted in rows if emitted is None]
+        visited = {url for url, _, _ in rows}
+        return frontier, visited
+
+    def enqueue(self, pages: Iterable[Tuple[str, int]]) -> None:
+        """Record newly discovered ``(url, depth)`` pages."""
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO pages (url, depth) VALUES (?, ?)", pages
+        )
+        self._conn.commit()
+
+    def seed(self, pages: Iterable[Tuple[str, int, Optional[str]]]) -> None:
+        """Record ``(url, depth, lastmod)`` crawl seeds, such as sitemap entries.
+
+        A seed that was already emitted goes back to the frontier if its ``lastmod``
+        changed since it was crawled.
+        """
+        for url, depth, lastmod in pages:
+            row = self._conn.execute("SELECT lastmod FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO pages (url, depth, lastmod) VALUES (?, ?, ?)",
+                    (url, depth, lastmod),
+                )
+            elif lastmod is not None and row[0] != lastmod:
+                self._conn.execute(
+                    "UPDATE pages SET emitted = NULL, depth = ?, lastmod = ? WHERE url = ?",
+                    (depth, lastmod, url),
+                )
+        self._conn.commit()
+
+    def mark_emitted(self, url: str, count: int) -> None:
+        """Record that ``url`` is done and produced ``count`` documents."""
+        self._conn.execute("UPDATE pages SET emitted = ? WHERE url = ?", (count, url))
+        self._conn.commit()
+
+    def emitted_count(self) -> int:
+        """Return the total number of documents emitted so far."""
+        row = self._conn.execute("SELECT COALESCE(SUM(emitted), 0) FROM pages").fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,99 @@
+import math
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+
+@dataclass
+class PageMetrics:
+    """Measurements taken while crawling a single page."""
+    url: str
+    depth: int = 0
+    queue_depth: int = 0
+    status: Optional[int] = None
+    bytes: int = 0
+    fetch_seconds: float = 0.0
+    partition_seconds: Optional[float] = None
+    elements: int = 0
+    documents: int = 0
+    error: Optional[str] = None
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values`` using the nearest-rank method."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+@dataclass
+class CrawlStats:
+    """Metrics of a crawl, filled page by page."""
+    pages: List[PageMetrics] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    max_queue_depth: int = 0
+
+    def record(self, metrics: PageMetrics) -> None:
+        self.pages.append(metrics)
+        self.max_queue_depth = max(self.max_queue_depth, metrics.queue_depth)
+
+    def finish(self) -> None:
+        self.finished_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def failed(self) -> List[PageMetrics]:
+        return [page for page in self.pages if page.error is not None]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(page.bytes for page in self.pages)
+
+    def fetch_percentiles(self, pcts: Sequence[float] = (50, 90, 99)) -> List[float]:
+        values = [page.fetch_seconds for page in self.pages]
+        return [percentile(values, pct) for pct in pcts]
+
+    def partition_percentiles(self, pcts: Sequence[float] = (50, 90, 99)) -> List[float]:
+        values = [page.partition_seconds for page in self.pages if page.partition_seconds is not None]
+        return [percentile(values, pct) for pct in pcts]
+
+    def slowest(self, count: int = 5) -> List[PageMetrics]:
+        """Return the pages that took the longest to fetch and partition."""
+        return sorted(
+            self.pages,
+            key=lambda page: page.fetch_seconds + (page.partition_seconds or 0.0),
+            reverse=True,
+        )[:count]
+
+    def report(self, slowest: int = 5) -> str:
+        """Return a human readable end-of-crawl report."""
+        fetch_p50, fetch_p90, fetch_p99 = self.fetch_percentiles()
+        part_p50, part_p90, part_p99 = self.partition_percentiles()
+        lines = [
+            f"Crawled {len(self.pages)} pages ({len(self.failed)} failed) in {self.elapsed:.1f}s, "
+            f"{_format_bytes(self.total_bytes)}, max queue depth {self.max_queue_depth}",
+            f"fetch      p50 {fetch_p50:.3f}s  p90 {fetch_p90:.3f}s  p99 {fetch_p99:.3f}s",
+            f"partition  p50 {part_p50:.3f}s  p90 {part_p90:.3f}s  p99 {part_p99:.3f}s",
+        ]
+        if self.pages and slowest:
+            lines.append("Slowest pages:")
+            for page in self.slowest(slowest):
+                lines.append(
+                    f"  fetch {page.fetch_seconds:.3f}s  partition {page.partition_seconds or 0.0:.3f}s  "
+                    f"{_format_bytes(page.bytes)}  {page.elements} elements  {page.url}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,246 @@
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+WORD_PATTERN = re.compile(r"\w+")
+BLOCK_SEPARATOR = re.compile(r"\n\s*\n")
+_SHINGLE_BASE = 1_000_003
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """
+    MinHash signatures of texts, whose agreement estimates the Jaccard similarity
+    of their sets of word shingles.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Multiply-shift hash functions: the high bits of a * h + b, mod 2^64, with a odd
+        self._a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Return the distinct hashes of the word shingles of `text`."""
+        words = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in WORD_PATTERN.findall(text.lower())),
+                            dtype=np.uint64)
+        if len(words) == 0:
+            return np.zeros(1, dtype=np.uint64)
+        size = min(self.shingle_size, len(words))
+        count = len(words) - size + 1
+        # Polynomial combination of the hashes of the words of each shingle, mod 2^64
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            hashes = hashes * np.uint64(_SHINGLE_BASE) + words[offset:offset + count]
+        return np.unique(hashes)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        return ((np.outer(hashes, self._a) + self._b) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the texts of two signatures."""
+        return float(np.mean(first == second))
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hashing index of MinHash signatures.
+
+    Signatures are cut in `bands` bands: texts sharing a band are candidates, kept
+    if their estimated similarity reaches `threshold`. With 128 permutations in 16
+    bands, texts above ~0.7 similarity are almost always candidates.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, bands: int = 16, shingle_size: int = 5):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self._signatures: List[np.ndarray] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in np.split(signature, self.bands)]
+
+    def add(self, text: str) -> int:
+        """Index a text and return its id, or the id of an indexed near duplicate of it."""
+        signature = self.hasher.signature(text)
+        keys = self._band_keys(signature)
+        candidates = {doc_id for band, key in enumerate(keys) for doc_id in self._buckets[band].get(key, ())}
+        best = max(candidates, key=lambda doc_id: self.hasher.similarity(signature, self._signatures[doc_id]),
+                   default=None)
+        if best is not None and self.hasher.similarity(signature, self._signatures[best]) >= self.threshold:
+            return best
+        doc_id = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in enumerate(keys):
+            self._buckets[band][key].append(doc_id)
+        return doc_id
+
+    def clear(self) -> None:
+        self._signatures.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+
+
+class BoilerplateFilter:
+    """
+    Learns the blocks (paragraphs) repeated across sources, such as admonitions,
+    navigation fragments or version banners, and strips them.
+
+    A block is boilerplate once it was seen in `min_sources` different sources:
+    its first copies are kept, as the reference of its content, and the later ones
+    are stripped. Headings and blocks shorter than `min_length` characters are
+    never stripped, as they are legitimately repeated.
+    """
+
+    def __init__(self, min_sources: int = 3, min_length: int = 40):
+        self.min_sources = min_sources
+        self.min_length = min_length
+        # Sources of each block, numbered in the order they were seen in
+        self._sources: Dict[int, Dict[Optional[str], int]] = defaultdict(dict)
+
+    def _key(self, block: str) -> Optional[int]:
+        normalized = " ".join(block.lower().split())
+        if len(normalized) < self.min_length or normalized.startswith("#"):
+            return None
+        return _hash64(normalized)
+
+    def strip(self, text: str, source: Optional[str]) -> Tuple[str, int]:
+        """Return `text` without its boilerplate blocks and the number of blocks stripped."""
+        kept, stripped = [], 0
+        for block in BLOCK_SEPARATOR.split(text):
+            key = self._key(block)
+            if key is not None:
+                sources = self._sources[key]
+                if sources.setdefault(source, len(sources)) >= self.min_sources - 1:
+                    stripped += 1
+                    continue
+            kept.append(block)
+        return "\n\n".join(kept), stripped
+
+    def clear(self) -> None:
+        self._sources.clear()
+
+
+@dataclass
+class DedupStats:
+    """What the deduplication removed from the chunks of a run."""
+    chunks: int = 0
+    duplicates: int = 0  # Near-duplicate chunks dropped
+    boilerplate_blocks: int = 0
+    emptied: int = 0  # Chunks dropped as they were only boilerplate
+    input_characters: int = 0
+    output_characters: int = 0
+
+    @property
+    def saved_characters(self) -> int:
+        return self.input_characters - self.output_characters
+
+    @property
+    def saved_fraction(self) -> float:
+        return self.saved_characters / self.input_characters if self.input_characters else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.chunks} chunks: {self.duplicates} near duplicates, {self.emptied} boilerplate only, "
+                f"{self.boilerplate_blocks} boilerplate blocks stripped, {self.saved_characters} of "
+                f"{self.input_characters} characters not embedded ({self.saved_fraction:.1%})")
+
+
+class ChunkDeduplicator:
+    """
+    Drops what would be embedded several times from a stream of chunks: the
+    boilerplate blocks of each chunk (see BoilerplateFilter), then the chunks that
+    are near duplicates of a previous one (see NearDuplicateIndex).
+
+    A dropped duplicate is collapsed to a reference to the id of the chunk it
+    duplicates, in `references`. The state is per run: `reset` starts a new one, so that the same
+    corpus is always deduplicated the same way.
+    """
+
+    def __init__(self, threshold: Optional[float] = 0.85, min_sources: Optional[int] = 3,
+                 min_block_length: int = 40, source_id_key: str = "source"):
+        """
+        Args:
+            threshold: The estimated Jaccard similarity from which a chunk is a near
+                duplicate of a previous one, None to keep near duplicates.
+            min_sources: The number of sources from which a block is boilerplate,
+                None to keep boilerplate.
+            min_block_length: The length under which blocks are never boilerplate.
+            source_id_key: The metadata key of the source of a chunk.
+        """
+        self.near_duplicates = NearDuplicateIndex(threshold) if threshold is not None else None
+        self.boilerplate = BoilerplateFilter(min_sources, min_block_length) if min_sources is not None else None
+        self.source_id_key = source_id_key
+        self.stats = DedupStats()
+        self.references: List[dict] = []
+        self._kept: List[Optional[str]] = []  # Ids of the chunks in the near-duplicate index
+
+    def reset(self) -> None:
+        if self.near_duplicates is not None:
+            self.near_duplicates.clear()
+        if self.boilerplate is not None:
+            self.boilerplate.clear()
+        self.stats = DedupStats()
+        self.references = []
+        self._kept = []
+
+    def strip(self, chunk: Document) -> Optional[Document]:
+        """Return the chunk stripped of its boilerplate, or None if it was only boilerplate."""
+        self.stats.chunks += 1
+        self.stats.input_characters += len(chunk.page_content)
+        if self.boilerplate is not None:
+            text, stripped = self.boilerplate.strip(chunk.page_content, chunk.metadata.get(self.source_id_key))
+            if stripped:
+                self.stats.boilerplate_blocks += stripped
+                if not text.strip():
+                    self.stats.emptied += 1
+                    return None
+                chunk = Document(page_content=text, metadata=chunk.metadata, id=chunk.id)
+        self.stats.output_characters += len(chunk.page_content)
+        return chunk
+
+    def is_duplicate(self, chunk: Document) -> bool:
+        """
+        Whether the chunk is a near duplicate of a previous one, in which case it is
+        added to `references` with the id of the chunk it duplicates.
+        """
+        if self.near_duplicates is None:
+            return False
+        doc_id = self.near_duplicates.add(chunk.page_content)
+        if doc_id < len(self._kept):
+            self.stats.duplicates += 1
+            self.stats.output_characters -= len(chunk.page_content)
+            self.references.append({"id": chunk.id, "source": chunk.metadata.get(self.source_id_key),
+                                    "duplicate_of": self._kept[doc_id]})
+            return True
+        self._kept.append(chunk.id)
+        return False
+
+    def discard(self, chunk: Document) -> None:
+        """Record that a stripped chunk is not embedded, e.g. as an exact duplicate of a previous one."""
+        self.stats.output_characters -= len(chunk.page_content)
+
+    def process(self, chunk: Document) -> Optional[Document]:
+        """Return the chunk to embed, stripped of its boilerplate, or None to drop it."""
+        chunk = self.strip(chunk)
+        if chunk is None or self.is_duplicate(chunk):
+            return None
+        return chunk
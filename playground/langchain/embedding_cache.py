@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "playground", "embeddings")
+
+# HTTP statuses of a request rejected for its size (Bad Request, Content Too Large)
+_TOO_LARGE_STATUSES = {400, 413}
+_TOO_LARGE_RE = re.compile(r"too large|too long|too many (?:tokens|inputs|texts)|payload|maximum context|token limit", re.IGNORECASE)
+
+
+def is_batch_too_large(error: Exception) -> bool:
+    """
+    Return True if an embedding call failed because of the size of its batch: an
+    HTTP 400 or 413 response, or an error message about the size of the request.
+    Other errors (authentication, quota, network) do not get better with smaller
+    batches.
+    """
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status is not None:
+        return status in _TOO_LARGE_STATUSES
+    return bool(_TOO_LARGE_RE.search(str(error)))
+
+
+class VectorCache:
+    """
+    Persistent cache of float32 vectors keyed by strings.
+
+    The vectors are appended to a flat float32 file, read through a memory map, and
+    a SQLite index maps each key to its row. A cached vector costs 4 bytes per
+    dimension on disk and is only paged in when read.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, row INTEGER NOT NULL);
+            """
+        )
+        self._conn.commit()
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'dimension'").fetchone()
+        self.dimension: Optional[int] = int(row[0]) if row else None
+        self.rows = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+        if self.dimension and os.path.exists(self.vectors_path):
+            # Rows written after the last committed index update are unreachable, drop them
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(self.rows * self.dimension * 4)
+        self._map: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _matrix(self) -> np.ndarray:
+        if self._map is None or len(self._map) < self.rows:
+            self._map = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dimension))
+        return self._map
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return the cached vectors of `keys`, missing keys being left out."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                found.update(self._conn.execute(
+                    f"SELECT key, row FROM vectors WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+            if not found:
+                return {}
+            matrix = self._matrix()
+            return {key: np.array(matrix[row]) for key, row in found.items()}
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        """Store the vectors of new keys."""
+        if not items:
+            return
+        with self._lock:
+            existing = set()
+            keys = list(items)
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                existing.update(key for key, in self._conn.execute(
+                    f"SELECT key FROM vectors WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            keys = [key for key in keys if key not in existing]
+            if not keys:
+                return
+            matrix = np.asarray([items[key] for key in keys], dtype=np.float32)
+            if self.dimension is None:
+                self.dimension = matrix.shape[1]
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('dimension', ?)", (str(self.dimension),))
+            elif matrix.shape[1] != self.dimension:
+                raise ValueError(f"Expected vectors of dimension {self.dimension}, got {matrix.shape[1]}")
+            with open(self.vectors_path, "ab") as f:
+                f.write(matrix.tobytes())
+            self._conn.executemany(
+                "INSERT INTO vectors (key, row) VALUES (?, ?)",
+                [(key, self.rows + offset) for offset, key in enumerate(keys)],
+            )
+            self._conn.commit()
+            self.rows += len(keys)
+
+    def close(self) -> None:
+        self._map = None
+        self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper caching the vectors of an underlying `Embeddings` by the hash
+    of their text.
+
+    Only the cache misses are embedded, once per distinct text. They are sent in
+    batches of at most `max_batch_size` texts and `max_batch_chars` characters, with
+    up to `max_concurrency` batches in flight. The batch size adapts to the API: a
+    batch rejected for its size is split in halves and retried, and the batch size
+    is halved for the next calls; successful batches let it grow back. Other errors
+    are raised right away.
+    """
+
+    def __init__(self, embeddings: Embeddings, namespace: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_batch_size: int = 100, max_batch_chars: int = 200_000, max_concurrency: int = 4,
+                 is_too_large: Callable[[Exception], bool] = is_batch_too_large):
+        """
+        Args:
+            embeddings: The embeddings computing the cache misses.
+            namespace: The name of the cache, e.g. the embedding model. Vectors of
+                different models must not share a namespace.
+            cache_dir: The directory of the caches.
+            max_batch_size: The maximum number of texts per call of `embeddings`.
+            max_batch_chars: The maximum number of characters per call of `embeddings`.
+            max_concurrency: The maximum number of concurrent calls of `embeddings`.
+            is_too_large: Whether an error of `embeddings` means that the batch was
+                too large, in which case it is split and retried.
+        """
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.cache = VectorCache(os.path.join(cache_dir, namespace.replace("/", "_")))
+        self.max_batch_size = max_batch_size
+        self.max_batch_chars = max_batch_chars
+        self.max_concurrency = max_concurrency
+        self.is_too_large = is_too_large
+        self.batch_size = max_batch_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, kind: str, text: str) -> str:
+        # Queries and documents are embedded differently by some models (task types)
+        return hashlib.sha256(f"{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        batches, current, chars = [], [], 0
+        for text in texts:
+            if current and (len(current) >= self.batch_size or chars + len(text) > self.max_batch_chars):
+                batches.append(current)
+                current, chars = [], 0
+            current.append(text)
+            chars += len(text)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _on_success(self, size: int) -> None:
+        with self._lock:
+            if size >= self.batch_size:
+                self.batch_size = min(self.max_batch_size, self.batch_size + max(1, self.batch_size // 4))
+
+    def _on_failure(self, size: int) -> None:
+        with self._lock:
+            self.batch_size = max(1, min(self.batch_size, size // 2))
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        try:
+            vectors = self.embeddings.embed_documents(texts)
+        except Exception as e:
+            if len(texts) == 1 or not self.is_too_large(e):
+                raise
+            self._on_failure(len(texts))
+            middle = len(texts) // 2
+            return self._embed_batch(texts[:middle]) + self._embed_batch(texts[middle:])
+        self._on_success(len(texts))
+        return vectors
+
+    async def _aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        try:
+            vectors = await self.embeddings.aembed_documents(texts)
+        except Exception as e:
+            if len(texts) == 1 or not self.is_too_large(e):
+                raise
+            self._on_failure(len(texts))
+            middle = len(texts) // 2
+            return await self._aembed_batch(texts[:middle]) + await self._aembed_batch(texts[middle:])
+        self._on_success(len(texts))
+        return vectors
+
+    def _lookup(self, kind: str, texts: List[str]):
+        keys = [self._key(kind, text) for text in texts]
+        cached = self.cache.get_many(list(set(keys)))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        with self._lock:
+            self.hits += len(texts) - sum(1 for key in keys if key in missing)
+            self.misses += len(missing)
+        return keys, cached, missing
+
+    def _store(self, missing: Dict[str, str], batches: List[List[str]], results: List[List[List[float]]],
+               cached: Dict[str, np.ndarray], kind: str) -> None:
+        computed = {}
+        for batch, vectors in zip(batches, results):
+            for text, vector in zip(batch, vectors):
+                computed[self._key(kind, text)] = vector
+        self.cache.put_many(computed)
+        cached.update({key: np.asarray(vector, dtype=np.float32) for key, vector in computed.items()})
+
+    def _embed(self, kind: str, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(kind, texts)
+        if missing:
+            if kind == "query":
+                batches = [list(missing.values())]
+                results = [[self.embeddings.embed_query(batches[0][0])]]
+            else:
+                batches = self._batches(list(missing.values()))
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                    results = list(executor.map(self._embed_batch, batches))
+            self._store(missing, batches, results, cached, kind)
+        return [cached[key].tolist() for key in keys]
+
+    async def _aembed(self, kind: str, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(kind, texts)
+        if missing:
+            if kind == "query":
+                batches = [list(missing.values())]
+                results = [[await self.embeddings.aembed_query(batches[0][0])]]
+            else:
+                batches = self._batches(list(missing.values()))
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+
+                async def run(batch):
+                    async with semaphore:
+                        return await self._aembed_batch(batch)
+
+                results = await asyncio.gather(*(run(batch) for batch in batches))
+            self._store(missing, batches, results, cached, kind)
+        return [cached[key].tolist() for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._aembed("document", texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self._aembed("query", [text]))[0]
@@ -0,0 +1,269 @@
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+WORD_PATTERN = re.compile(r"\w+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it", "of", "on", "or",
+    "that", "the", "this", "to", "what", "when", "where", "which", "who", "why", "with",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a text, without stopwords."""
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-memory inverted index scored with BM25.
+
+    Each term maps to the ids of the documents holding it and its frequencies in
+    them. A query only touches the postings of its terms.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lengths: List[int] = []
+        self._length_array = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, texts: Iterable[str]) -> None:
+        updated = set()
+        for text in texts:
+            doc_id = len(self._lengths)
+            terms = Counter(tokenize(text))
+            for term, frequency in terms.items():
+                self._postings[term].append((doc_id, frequency))
+            updated.update(terms)
+            self._lengths.append(sum(terms.values()))
+        # Postings are turned into arrays once per batch, not on the first query
+        for term in updated:
+            ids, frequencies = zip(*self._postings[term])
+            self._arrays[term] = (np.asarray(ids, dtype=np.int64), np.asarray(frequencies, dtype=np.float32))
+        self._length_array = np.asarray(self._lengths, dtype=np.float32)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Return the (document id, score) of the `k` best matches of `query`."""
+        if not self._lengths:
+            return []
+        count = len(self._lengths)
+        average_length = float(self._length_array.mean()) or 1.0
+        accumulated = None
+        for term in set(tokenize(query)):
+            posting = self._arrays.get(term)
+            if posting is None:
+                continue
+            ids, frequencies = posting
+            idf = math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+            norms = self.k1 * (1 - self.b + self.b * self._length_array[ids] / average_length)
+            term_scores = idf * frequencies * (self.k1 + 1) / (frequencies + norms)
+            if accumulated is None:
+                accumulated = np.zeros(count, dtype=np.float32)
+            np.add.at(accumulated, ids, term_scores)
+        if accumulated is None:
+            return []
+        matches = np.flatnonzero(accumulated)
+        top = matches[np.argsort(-accumulated[matches], kind="stable")[:k]]
+        return [(int(doc_id), float(accumulated[doc_id])) for doc_id in top]
+
+
+class VectorIndex:
+    """
+    In-memory cosine similarity index over a float32 matrix.
+
+    Searches are exact (one matrix-vector product) until `train` builds an IVF
+    index: the vectors are clustered with k-means in `nlist` lists and a query only
+    scans the `nprobe` non-empty lists with the closest centroids.
+    """
+
+    def __init__(self, nprobe: int = 8):
+        self.nprobe = nprobe
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self._matrix)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def add(self, vectors: Sequence[Sequence[float]]) -> None:
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32))
+        start = len(self._matrix)
+        self._matrix = vectors if start == 0 else np.vstack([self._matrix, vectors])
+        if self._centroids is not None:
+            assignments = np.argmax(vectors @ self._centroids.T, axis=1)
+            for list_id in np.unique(assignments):
+                added = start + np.flatnonzero(assignments == list_id)
+                self._lists[list_id] = np.concatenate([self._lists[list_id], added])
+
+    def train(self, nlist: int, iterations: int = 10, seed: int = 0) -> None:
+        """Cluster the vectors in `nlist` lists (spherical k-means) to search them approximately."""
+        rng = np.random.default_rng(seed)
+        nlist = min(nlist, len(self._matrix))
+        centroids = self._matrix[rng.choice(len(self._matrix), nlist, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(self._matrix @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, self._matrix)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = self._normalize(sums)
+        assignments = np.argmax(self._matrix @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [np.flatnonzero(assignments == list_id) for list_id in range(nlist)]
+
+    def search(self, vector: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """Return the (document id, cosine similarity) of the `k` nearest vectors."""
+        if not len(self._matrix):
+            return []
+        query = self._normalize(np.asarray(vector, dtype=np.float32))
+        if self._centroids is None:
+            candidates = None
+            scores = self._matrix @ query
+        else:
+            # Empty lists are skipped, so at least one list of candidates is scanned
+            closest = np.argsort(-(self._centroids @ query))
+            probed = [self._lists[list_id] for list_id in closest if len(self._lists[list_id])]
+            candidates = np.concatenate(probed[:max(1, self.nprobe)])
+            scores = self._matrix[candidates] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        ids = top if candidates is None else candidates[top]
+        return [(int(doc_id), float(score)) for doc_id, score in zip(ids, scores[top])]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], rank_constant: int = 60,
+                           weights: Optional[Sequence[float]] = None) -> List[Tuple[int, float]]:
+    """
+    Fuse rankings of document ids: each document scores the sum over the rankings of
+    weight / (rank_constant + rank), its rank starting at 1.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += weight / (rank_constant + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class LocalHybridRetriever(BaseRetriever):
+    """
+    Hybrid (keyword + vector) retriever running in-process.
+
+    A BM25 inverted index and a NumPy vector index are searched side by side and
+    their rankings are fused with reciprocal rank fusion, as the OpenSearch
+    `score-ranker-processor` does, without a search cluster. Query embeddings are
+    kept in an LRU cache.
+    """
+    embeddings: Embeddings
+    k: int = 5
+    fetch_k: int = 20  # Number of results of each leg to fuse
+    rank_constant: int = 60
+    keyword_weight: float = 1.0
+    vector_weight: float = 1.0
+    query_cache_size: int = 1024
+
+    _documents: List[Document] = PrivateAttr(default_factory=list)
+    _keyword_index: BM25Index = PrivateAttr(default_factory=BM25Index)
+    _vector_index: VectorIndex = PrivateAttr(default_factory=VectorIndex)
+    _query_cache: "OrderedDict[str, List[float]]" = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_documents(cls, documents: Sequence[Document], embeddings: Embeddings,
+                       vectors: Optional[Sequence[Sequence[float]]] = None, **kwargs) -> "LocalHybridRetriever":
+        retriever = cls(embeddings=embeddings, **kwargs)
+        retriever.add_documents(documents, vectors)
+        return retriever
+
+    def add_documents(self, documents: Sequence[Document],
+                      vectors: Optional[Sequence[Sequence[float]]] = None) -> None:
+        """Index documents, embedding them unless their `vectors` are given."""
+        if not documents:
+            return
+        if vectors is None:
+            vectors = self.embeddings.embed_documents([document.page_content for document in documents])
+        with self._lock:
+            self._documents.extend(documents)
+            self._keyword_index.add(document.page_content for document in documents)
+            self._vector_index.add(vectors)
+
+    def build_ivf(self, nlist: Optional[int] = None, nprobe: int = 8) -> None:
+        """
+        Switch the vector leg to an approximate IVF search, worth it from about
+        10^5 documents. By default `nlist` is about the square root of their count.
+        """
+        with self._lock:
+            self._vector_index.nprobe = nprobe
+            self._vector_index.train(nlist or max(1, int(math.sqrt(len(self._documents)))))
+
+    def _cached_query(self, query: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._query_cache.get(query)
+            if vector is not None:
+                self._query_cache.move_to_end(query)
+            return vector
+
+    def _cache_query(self, query: str, vector: List[float]) -> None:
+        with self._lock:
+            self._query_cache[query] = vector
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+
+    def _embed_query(self, query: str) -> List[float]:
+        vector = self._cached_query(query)
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+            self._cache_query(query, vector)
+        return vector
+
+    async def _aembed_query(self, query: str) -> List[float]:
+        vector = self._cached_query(query)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(query)
+            self._cache_query(query, vector)
+        return vector
+
+    def _search(self, query: str, vector: List[float]) -> List[Document]:
+        keyword = self._keyword_index.search(query, self.fetch_k)
+        nearest = self._vector_index.search(vector, self.fetch_k)
+        fused = reciprocal_rank_fusion(
+            [[doc_id for doc_id, _ in keyword], [doc_id for doc_id, _ in nearest]],
+            rank_constant=self.rank_constant, weights=[self.keyword_weight, self.vector_weight],
+        )
+        results = []
+        for doc_id, score in fused[:self.k]:
+            document = self._documents[doc_id]
+            results.append(Document(page_content=document.page_content, id=document.id,
+                                    metadata=dict(document.metadata, rrf_score=score)))
+        return results
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self._search(query, self._embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self._search(query, await self._aembed_query(query))
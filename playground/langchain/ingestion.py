@@ -0,0 +1,383 @@
+import copy
+import hashlib
+import json
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.indexing import RecordManager
+from langchain_core.vectorstores import InMemoryVectorStore, VectorStore
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+from playground.langchain.dedup import ChunkDeduplicator, DedupStats
+
+# Namespace of the chunk ids, so that ids are UUIDs (required by some stores, e.g. Qdrant)
+NAMESPACE_CHUNK = uuid.UUID("9d3b6f5e-2f0a-4c1e-9a51-7cc1f3a0b2d4")
+
+_END = object()
+
+
+def chunk_id(document: Document) -> str:
+    """Return a stable id of a chunk, derived from its content and metadata."""
+    payload = json.dumps([document.page_content, document.metadata], sort_keys=True, default=str)
+    return str(uuid.uuid5(NAMESPACE_CHUNK, hashlib.sha256(payload.encode("utf-8")).hexdigest()))
+
+
+def supports_vectors(vector_store: VectorStore) -> bool:
+    """Whether precomputed vectors can be written to `vector_store` with `upsert_vectors`."""
+    return hasattr(vector_store, "add_embeddings") or isinstance(vector_store, InMemoryVectorStore)
+
+
+class _PrecomputedEmbeddings(Embeddings):
+    """Embeddings returning vectors computed beforehand, in the order of the texts."""
+
+    def __init__(self, vectors: Sequence[List[float]]):
+        self.vectors = [list(vector) for vector in vectors]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if len(texts) != len(self.vectors):
+            raise ValueError(f"Expected {len(self.vectors)} texts, got {len(texts)}")
+        return self.vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        raise NotImplementedError("Precomputed embeddings can not embed queries")
+
+
+def upsert_vectors(vector_store: VectorStore, documents: Sequence[Document], vectors: Sequence[List[float]],
+                   ids: Sequence[str]) -> None:
+    """Write documents with their precomputed vectors to `vector_store`."""
+    if hasattr(vector_store, "add_embeddings"):
+        vector_store.add_embeddings(
+            text_embeddings=[(document.page_content, vector) for document, vector in zip(documents, vectors)],
+            metadatas=[document.metadata for document in documents],
+            ids=list(ids),
+        )
+    elif isinstance(vector_store, InMemoryVectorStore):
+        # add_documents embeds the documents with the embeddings of the store: a copy of
+        # the store, sharing its documents, embeds them with the precomputed vectors
+        store = copy.copy(vector_store)
+        store.embedding = _PrecomputedEmbeddings(vectors)
+        store.add_documents(list(documents), ids=list(ids))
+    else:
+        raise ValueError(f"{type(vector_store).__name__} does not accept precomputed vectors")
+
+
+@dataclass
+class StageMetrics:
+    """Measurements of a pipeline stage."""
+    items: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0  # Time spent waiting for room in the next queue (backpressure)
+
+
+@dataclass
+class IngestionResult:
+    """Counts and stage metrics of an ingestion run."""
+    documents: int = 0
+    chunks: int = 0
+    skipped: int = 0
+    upserted: int = 0
+    deleted: int = 0
+    elapsed: float = 0.0
+    stages: Dict[str, StageMetrics] = field(default_factory=dict)
+    dedup: Optional[DedupStats] = None
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.documents} documents, {self.chunks} chunks: {self.upserted} upserted, "
+            f"{self.skipped} unchanged, {self.deleted} deleted in {self.elapsed:.1f}s"
+        ]
+        for name, metrics in self.stages.items():
+            lines.append(f"  {name}: {metrics.items} items, busy {metrics.busy_seconds:.1f}s, "
+                         f"blocked {metrics.blocked_seconds:.1f}s")
+        if self.dedup is not None:
+            lines.append(f"  dedup: {self.dedup.summary()}")
+        return "\n".join(lines)
+
+
+class _Aborted(Exception):
+    pass
+
+
+class IngestionPipeline:
+    """
+    Streaming load, split, embed and upsert pipeline.
+
+    Each stage runs in its own thread(s) and the stages are connected by bounded
+    queues: when a stage falls behind, the queue before it fills up and the
+    upstream stages block (backpressure), so that memory is bounded by the queue
+    sizes and not by the corpus. Chunks reach the vector store as soon as their
+    batch is embedded.
+
+    With a record manager, chunks already indexed are not embedded again, and the
+    chunks previously indexed for the loaded sources but no longer produced are
+    deleted at the end of the run (the "incremental" cleanup of LangChain's
+    `index`).
+
+    With a deduplicator, the boilerplate of the chunks is stripped and their near
+    duplicates are dropped before they are embedded.
+    """
+
+    def __init__(self, vector_store: VectorStore, embeddings: Optional[Embeddings] = None,
+                 splitter: Optional[TextSplitter] = None, record_manager: Optional[RecordManager] = None,
+                 source_id_key: str = "source", embed_batch_size: int = 64, upsert_batch_size: int = 256,
+                 queue_size: int = 4, embed_workers: int = 1, deduplicator: Optional[ChunkDeduplicator] = None):
+        """
+        Args:
+            vector_store: The store the chunks are written to.
+            embeddings: The embedder of the chunks. When None, the chunks are handed
+                to `vector_store.add_documents`, which embeds them itself.
+            splitter: The splitter of the loaded documents, by default a
+                RecursiveCharacterTextSplitter of 1000 characters.
+            record_manager: An optional record manager tracking the indexed chunks.
+            source_id_key: The metadata key identifying the source of a chunk, used
+                for the cleanup.
+            embed_batch_size: The number of chunks per embedding request.
+            upsert_batch_size: The maximum number of chunks per vector store write.
+            queue_size: The number of items (documents or batches) each queue holds
+                before blocking its producer.
+            embed_workers: The number of concurrent embedding requests.
+            deduplicator: An optional deduplicator of the chunks, reset on each run.
+        """
+        if embeddings is not None and not supports_vectors(vector_store):
+            raise ValueError(
+                f"{type(vector_store).__name__} does not accept precomputed vectors, pass embeddings=None to "
+                f"let it embed the chunks"
+            )
+        self.vector_store = vector_store
+        self.embeddings = embeddings
+        self.splitter = splitter or RecursiveCharacterTextSplitter(
+            chunk_size=1000, chunk_overlap=200, add_start_index=True
+        )
+        self.record_manager = record_manager
+        self.source_id_key = source_id_key
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.queue_size = queue_size
+        self.embed_workers = embed_workers
+        self.deduplicator = deduplicator
+
+    def _put(self, target: queue.Queue, item, metrics: StageMetrics, abort: threading.Event) -> None:
+        """Put `item` in `target`, blocking while it is full unless the run is aborted."""
+        started = time.monotonic()
+        while True:
+            if abort.is_set():
+                raise _Aborted()
+            try:
+                target.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        metrics.blocked_seconds += time.monotonic() - started
+
+    def _get(self, source: queue.Queue, abort: threading.Event):
+        while True:
+            if abort.is_set():
+                raise _Aborted()
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def run(self, source: Union[BaseLoader, Iterable[Document]]) -> IngestionResult:
+        """
+        Ingests the documents of `source`, a loader (read with `lazy_load`) or an
+        iterable of documents.
+
+        Raises:
+            The first error raised by a stage, after stopping the other stages.
+        """
+        documents = source.lazy_load() if isinstance(source, BaseLoader) else iter(source)
+        result = IngestionResult(stages={name: StageMetrics() for name in ("load", "split", "embed", "upsert")})
+        started = time.monotonic()
+        if self.deduplicator is not None:
+            self.deduplicator.reset()
+            result.dedup = self.deduplicator.stats
+        index_start = self.record_manager.get_time() if self.record_manager is not None else None
+        sources = set()
+
+        loaded = queue.Queue(self.queue_size)
+        batches = queue.Queue(self.queue_size)
+        embedded = queue.Queue(self.queue_size)
+        abort = threading.Event()
+        errors = []
+
+        def stage(name: str, target: Callable[[], None], ends: List[queue.Queue]):
+            def run():
+                try:
+                    target()
+                except _Aborted:
+                    return
+                except BaseException as e:
+                    errors.append(e)
+                    abort.set()
+                    return
+                for end in ends:
+                    self._put(end, _END, result.stages[name], abort)
+            return threading.Thread(target=run, name=f"ingestion-{name}", daemon=True)
+
+        def load():
+            metrics = result.stages["load"]
+            for document in self._timed(documents, metrics):
+                result.documents += 1
+                self._put(loaded, document, metrics, abort)
+
+        def split():
+            metrics = result.stages["split"]
+            pending: List[Document] = []
+            seen = set()
+            while True:
+                document = self._get(loaded, abort)
+                if document is _END:
+                    break
+                work_started = time.monotonic()
+                for chunk in self.splitter.split_documents([document]):
+                    if self.deduplicator is not None:
+                        chunk = self.deduplicator.strip(chunk)
+                        if chunk is None:
+                            continue
+                    chunk.id = chunk_id(chunk)
+                    if chunk.id in seen:
+                        if self.deduplicator is not None:
+                            self.deduplicator.discard(chunk)
+                        continue
+                    seen.add(chunk.id)
+                    if self.deduplicator is not None and self.deduplicator.is_duplicate(chunk):
+                        continue
+                    pending.append(chunk)
+                metrics.items += 1
+                metrics.busy_seconds += time.monotonic() - work_started
+                while len(pending) >= self.embed_batch_size:
+                    self._put(batches, self._filter(pending[:self.embed_batch_size], result, index_start, sources),
+                              metrics, abort)
+                    del pending[:self.embed_batch_size]
+            if pending:
+                self._put(batches, self._filter(pending, result, index_start, sources), metrics, abort)
+
+        def embed():
+            metrics = result.stages["embed"]
+            lock = threading.Lock()
+
+            def embed_batch(chunks: List[Document]):
+                work_started = time.monotonic()
+                vectors = self.embeddings.embed_documents([chunk.page_content for chunk in chunks])
+                with lock:
+                    metrics.items += len(chunks)
+                    metrics.busy_seconds += time.monotonic() - work_started
+                self._put(embedded, (chunks, vectors), metrics, abort)
+
+            # At most `embed_workers` batches are being embedded, the next ones wait in `batches`
+            with ThreadPoolExecutor(max_workers=self.embed_workers) as executor:
+                running = []
+                while True:
+                    chunks = self._get(batches, abort)
+                    if chunks is _END:
+                        break
+                    if not chunks:
+                        continue
+                    if self.embeddings is None:
+                        self._put(embedded, (chunks, None), metrics, abort)
+                        continue
+                    running = [future for future in running if not future.done()]
+                    while len(running) >= self.embed_workers:
+                        running[0].result()
+                        running = [future for future in running if not future.done()]
+                    running.append(executor.submit(embed_batch, chunks))
+                for future in running:
+                    future.result()
+
+        def upsert():
+            metrics = result.stages["upsert"]
+            while True:
+                item = self._get(embedded, abort)
+                if item is _END:
+                    break
+                chunks, vectors = item
+                for start in range(0, len(chunks), self.upsert_batch_size):
+                    work_started = time.monotonic()
+                    self._write(chunks[start:start + self.upsert_batch_size],
+                                vectors[start:start + self.upsert_batch_size] if vectors is not None else None,
+                                index_start)
+                    count = len(chunks[start:start + self.upsert_batch_size])
+                    metrics.items += count
+                    result.upserted += count
+                    metrics.busy_seconds += time.monotonic() - work_started
+
+        threads = [
+            stage("load", load, [loaded]),
+            stage("split", split, [batches]),
+            stage("embed", embed, [embedded]),
+            stage("upsert", upsert, []),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+        if self.record_manager is not None and sources:
+            result.deleted = self._cleanup(sorted(sources), index_start)
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def _timed(self, documents: Iterator[Document], metrics: StageMetrics) -> Iterator[Document]:
+        while True:
+            work_started = time.monotonic()
+            try:
+                document = next(documents)
+            except StopIteration:
+                return
+            metrics.items += 1
+            metrics.busy_seconds += time.monotonic() - work_started
+            yield document
+
+    def _source(self, chunk: Document) -> Optional[str]:
+        return chunk.metadata.get(self.source_id_key)
+
+    def _filter(self, chunks: List[Document], result: IngestionResult, index_start: Optional[float],
+                sources: set) -> List[Document]:
+        """Count the chunks of a batch and drop the ones already indexed."""
+        result.chunks += len(chunks)
+        if self.record_manager is None:
+            return chunks
+        sources.update(source for source in map(self._source, chunks) if source is not None)
+        ids = [chunk.id for chunk in chunks]
+        exists = self.record_manager.exists(ids)
+        unchanged = [chunk for chunk, found in zip(chunks, exists) if found]
+        if unchanged:
+            # Refreshed so that the cleanup keeps them
+            self.record_manager.update([chunk.id for chunk in unchanged],
+                                       group_ids=[self._source(chunk) for chunk in unchanged],
+                                       time_at_least=index_start)
+            result.skipped += len(unchanged)
+        return [chunk for chunk, found in zip(chunks, exists) if not found]
+
+    def _write(self, chunks: List[Document], vectors: Optional[List[List[float]]],
+               index_start: Optional[float]) -> None:
+        ids = [chunk.id for chunk in chunks]
+        if vectors is None:
+            self.vector_store.add_documents(chunks, ids=ids)
+        else:
+            upsert_vectors(self.vector_store, chunks, vectors, ids)
+        if self.record_manager is not None:
+            self.record_manager.update(ids, group_ids=[self._source(chunk) for chunk in chunks],
+                                       time_at_least=index_start)
+
+    def _cleanup(self, sources: List[str], index_start: float, batch_size: int = 1000) -> int:
+        """Delete the chunks of `sources` that were not produced by this run."""
+        deleted = 0
+        while True:
+            stale = self.record_manager.list_keys(group_ids=sources, before=index_start, limit=batch_size)
+            if not stale:
+                return deleted
+            self.vector_store.delete(stale)
+            self.record_manager.delete_keys(stale)
+            deleted += len(stale)
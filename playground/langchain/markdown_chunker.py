@@ -0,0 +1,150 @@
+import copy
+from typing import Any, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+from tree_sitter import Language, Parser
+from tree_sitter_markdown import language as markdown_language
+
+from playground.markdown_query import Heading, build_heading_tree
+
+
+class MarkdownHeadingChunker(TextSplitter):
+    """
+    Splits markdown documents along their heading tree (see
+    `markdown_query.build_heading_tree`).
+
+    A section fitting in `chunk_size` is kept whole, along with its subsections.
+    Only a section too large on its own is broken down: its text before its first
+    subsection, then its subsections, in turn. Consecutive pieces are packed in a
+    chunk as long as they fit and are siblings, or a section body followed by its
+    subsections. Text too large to fit without any heading to split on is cut with
+    a RecursiveCharacterTextSplitter, the only place where `chunk_overlap` applies.
+
+    Each chunk gets the path of the headings it is nested under as `headings`
+    metadata (a list) and `section` metadata (the same path joined with " > ").
+    """
+
+    def __init__(self, chunk_size: int = 2000, chunk_overlap: int = 0, include_headings: bool = False,
+                 **kwargs: Any):
+        """
+        Args:
+            chunk_size: The maximum size of a chunk, in characters.
+            chunk_overlap: The overlap of the pieces of text cut without headings.
+            include_headings: Whether to prepend the heading path to chunks not
+                starting with their own heading (e.g. the pieces of a long section),
+                so that they keep their context when embedded.
+            **kwargs: Other arguments of TextSplitter (e.g. add_start_index).
+        """
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self.include_headings = include_headings
+        self._fallback = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=self._length_function,
+        )
+        self._parser = Parser()
+        self._parser.language = Language(markdown_language())
+
+    def _size(self, source: bytes, start: int, end: int) -> int:
+        return self._length_function(source[start:end].decode("utf-8", errors="replace"))
+
+    def _atoms(self, source: bytes, sections: List[Heading], end: int,
+               path: List[str]) -> Iterator[Tuple[int, int, List[str]]]:
+        """
+        Yields the (start, end, heading path) spans of the sections fitting in a chunk
+        and, for the other sections, of their text before their first subsection.
+        """
+        for section in sections:
+            section_end = min(section.end_byte, end)
+            section_path = path + [section.text]
+            if self._size(source, section.start_byte, section_end) <= self._chunk_size or not section.children:
+                yield section.start_byte, section_end, section_path
+                continue
+            yield section.start_byte, section.children[0].start_byte, section_path
+            yield from self._atoms(source, section.children, section_end, section_path)
+
+    @staticmethod
+    def _common_path(first: List[str], second: List[str]) -> List[str]:
+        common = []
+        for first_heading, second_heading in zip(first, second):
+            if first_heading != second_heading:
+                break
+            common.append(first_heading)
+        return common
+
+    def _raw_chunks(self, text: str) -> List[Tuple[str, List[str]]]:
+        source = text.encode("utf-8")
+        tree = self._parser.parse(source)
+        headings = build_heading_tree(tree.root_node, source)
+        if not headings or self._size(source, 0, len(source)) <= self._chunk_size:
+            atoms = [(0, len(source), [])]
+        else:
+            # The text before the first heading is kept apart, to keep the sections it precedes
+            atoms = [(0, headings[0].start_byte, []), None]
+            atoms.extend(self._atoms(source, headings, len(source), []))
+
+        chunks = []
+        packed = None  # (start, end, path) of the chunk being filled
+
+        def flush():
+            chunk = source[packed[0]:packed[1]].decode("utf-8", errors="replace")
+            if chunk.strip():
+                chunks.append((chunk, packed[2]))
+
+        for atom in atoms:
+            if atom is None:
+                if packed:
+                    flush()
+                    packed = None
+                continue
+            start, end, path = atom
+            if start >= end:
+                continue
+            if self._size(source, start, end) > self._chunk_size:
+                # Too large without a heading to split on
+                if packed:
+                    flush()
+                    packed = None
+                text_piece = source[start:end].decode("utf-8", errors="replace")
+                chunks.extend((piece, path) for piece in self._fallback.split_text(text_piece))
+            elif packed and self._size(source, packed[0], end) <= self._chunk_size and \
+                    len(common := self._common_path(packed[2], path)) >= max(len(packed[2]), len(path)) - 1:
+                # Packed with its siblings or its parent section, under their common headings
+                packed = (packed[0], end, common)
+            else:
+                if packed:
+                    flush()
+                packed = (start, end, path)
+        if packed:
+            flush()
+
+        if self._strip_whitespace:
+            chunks = [(chunk.strip(), path) for chunk, path in chunks]
+        return chunks
+
+    def _format(self, chunk: str, path: List[str]) -> str:
+        if self.include_headings and path and not chunk.startswith("#"):
+            return f"{' > '.join(path)}\n\n{chunk}"
+        return chunk
+
+    def chunks(self, text: str) -> List[Tuple[str, List[str]]]:
+        """Return the chunks of a markdown text with the heading path of each."""
+        return [(self._format(chunk, path), path) for chunk, path in self._raw_chunks(text)]
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for chunk, _ in self.chunks(text)]
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata in zip(texts, metadatas):
+            index = 0
+            for chunk, path in self._raw_chunks(text):
+                chunk_metadata = copy.deepcopy(metadata)
+                chunk_metadata["headings"] = path
+                chunk_metadata["section"] = " > ".join(path)
+                if self._add_start_index:
+                    found = text.find(chunk, index)
+                    index = found if found != -1 else index
+                    chunk_metadata["start_index"] = index
+                documents.append(Document(page_content=self._format(chunk, path), metadata=chunk_metadata))
+        return documents
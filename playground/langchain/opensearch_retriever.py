@@ -0,0 +1,223 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from playground.http_client import AsyncHttpClient, HttpClient, get_async_client, get_client
+from playground.langchain.hybrid_retriever import reciprocal_rank_fusion
+
+
+class OpenSearchRRFRetriever(BaseRetriever):
+    """
+    Hybrid (keyword + vector) retriever over an OpenSearch index, as written by
+    `OpenSearchVectorSearch`, fusing the two rankings with reciprocal rank fusion.
+
+    By default the keyword and vector legs are two searches fused in-process: the
+    keyword search is sent while the query is being embedded, and only the vector
+    search waits for the embedding. With a `pipeline_id`, a single hybrid query is
+    sent to a search pipeline running the `score-ranker-processor` instead, saving
+    a request but waiting for the embedding before searching anything.
+
+    Requests go through the shared HttpClient, or the AsyncHttpClient of the running
+    event loop for async calls. `retrieve_many` and `aretrieve_many` search several
+    queries with one `_msearch` request per leg.
+    """
+    embeddings: Embeddings
+    opensearch_url: str
+    index_name: str
+    pipeline_id: Optional[str] = None
+    k: int = 5
+    fetch_k: int = 20  # Number of results of each leg to fuse
+    rank_constant: int = 60
+    text_field: str = "text"
+    vector_field: str = "vector_field"
+    http_auth: Optional[Tuple[str, str]] = None
+    verify_certs: bool = True
+    http: Optional[HttpClient] = None
+    async_http: Optional[AsyncHttpClient] = None
+
+    # Query bodies
+
+    def _source(self) -> dict:
+        return {"excludes": [self.vector_field]}
+
+    def _keyword_body(self, query: str) -> dict:
+        return {
+            "_source": self._source(),
+            "size": self.fetch_k,
+            "query": {"match": {self.text_field: {"query": query}}},
+        }
+
+    def _vector_body(self, vector: List[float]) -> dict:
+        return {
+            "_source": self._source(),
+            "size": self.fetch_k,
+            "query": {"knn": {self.vector_field: {"vector": vector, "k": self.fetch_k}}},
+        }
+
+    def _hybrid_body(self, query: str, vector: List[float]) -> dict:
+        return {
+            "_source": self._source(),
+            "size": self.k,
+            "query": {"hybrid": {"queries": [
+                self._keyword_body(query)["query"],
+                self._vector_body(vector)["query"],
+            ]}},
+        }
+
+    # Requests
+
+    def _url(self, endpoint: str) -> str:
+        return f"{self.opensearch_url.rstrip('/')}/{self.index_name}/{endpoint}"
+
+    def _params(self) -> dict:
+        return {"search_pipeline": self.pipeline_id} if self.pipeline_id else {}
+
+    def _msearch_data(self, bodies: Sequence[dict]) -> str:
+        lines = []
+        for body in bodies:
+            lines.extend([json.dumps({}), json.dumps(body)])
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _responses(response) -> List[dict]:
+        response.raise_for_status()
+        responses = response.json()["responses"]
+        for item in responses:
+            if "error" in item:
+                raise RuntimeError(f"OpenSearch search failed: {item['error']}")
+        return responses
+
+    def _request_kwargs(self, endpoint: str, **kwargs) -> dict:
+        kwargs.update(params=self._params(), endpoint=f"opensearch.{endpoint}",
+                      retry=True)  # Searches only read data, they can be retried safely
+        if self.http_auth:
+            kwargs["auth"] = self.http_auth
+        if not self.verify_certs:
+            kwargs["verify"] = False
+        return kwargs
+
+    def _async_request_kwargs(self, endpoint: str, **kwargs) -> dict:
+        kwargs = self._request_kwargs(endpoint, **kwargs)
+        if "auth" in kwargs:
+            kwargs["auth"] = aiohttp.BasicAuth(*kwargs["auth"])
+        if kwargs.pop("verify", True) is False:
+            kwargs["ssl"] = False
+        return kwargs
+
+    def _search(self, body: dict) -> dict:
+        response = (self.http or get_client()).post(self._url("_search"), **self._request_kwargs("search", json=body))
+        response.raise_for_status()
+        return response.json()
+
+    async def _asearch(self, body: dict) -> dict:
+        http = self.async_http or get_async_client()
+        response = await http.post(self._url("_search"), **self._async_request_kwargs("search", json=body))
+        response.raise_for_status()
+        return response.json()
+
+    def _msearch(self, bodies: Sequence[dict]) -> List[dict]:
+        response = (self.http or get_client()).post(self._url("_msearch"), **self._request_kwargs(
+            "msearch", data=self._msearch_data(bodies), headers={"Content-Type": "application/x-ndjson"},
+        ))
+        return self._responses(response)
+
+    async def _amsearch(self, bodies: Sequence[dict]) -> List[dict]:
+        http = self.async_http or get_async_client()
+        response = await http.post(self._url("_msearch"), **self._async_request_kwargs(
+            "msearch", data=self._msearch_data(bodies), headers={"Content-Type": "application/x-ndjson"},
+        ))
+        return self._responses(response)
+
+    # Results
+
+    def _document(self, hit: dict, score: float) -> Document:
+        source = hit.get("_source", {})
+        metadata = dict(source.get("metadata") or {}, rrf_score=score)
+        return Document(page_content=source.get(self.text_field, ""), id=hit.get("_id"), metadata=metadata)
+
+    def _fuse(self, keyword: dict, nearest: dict) -> List[Document]:
+        hits: Dict[str, dict] = {}
+        rankings = []
+        for response in (keyword, nearest):
+            ranking = []
+            for hit in response["hits"]["hits"]:
+                hits.setdefault(hit["_id"], hit)
+                ranking.append(hit["_id"])
+            rankings.append(ranking)
+        fused = reciprocal_rank_fusion(rankings, rank_constant=self.rank_constant)
+        return [self._document(hits[doc_id], score) for doc_id, score in fused[:self.k]]
+
+    def _ranked(self, response: dict) -> List[Document]:
+        return [self._document(hit, hit["_score"]) for hit in response["hits"]["hits"][:self.k]]
+
+    # Retrieval
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if self.pipeline_id:
+            return self._ranked(self._search(self._hybrid_body(query, self.embeddings.embed_query(query))))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            keyword = executor.submit(self._search, self._keyword_body(query))
+            nearest = self._search(self._vector_body(self.embeddings.embed_query(query)))
+            return self._fuse(keyword.result(), nearest)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if self.pipeline_id:
+            vector = await self.embeddings.aembed_query(query)
+            return self._ranked(await self._asearch(self._hybrid_body(query, vector)))
+
+        async def vector_leg():
+            return await self._asearch(self._vector_body(await self.embeddings.aembed_query(query)))
+
+        keyword, nearest = await asyncio.gather(self._asearch(self._keyword_body(query)), vector_leg())
+        return self._fuse(keyword, nearest)
+
+    def retrieve_many(self, queries: Sequence[str]) -> List[List[Document]]:
+        """
+        Return the documents of several queries, sending one `_msearch` request per
+        leg (or a single one with a pipeline). The keyword searches are sent while
+        the queries are being embedded.
+        """
+        if not queries:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(queries)) + 1) as executor:
+            keyword = None if self.pipeline_id else executor.submit(
+                self._msearch, [self._keyword_body(query) for query in queries])
+            vectors = list(executor.map(self.embeddings.embed_query, queries))
+            if self.pipeline_id:
+                responses = self._msearch([self._hybrid_body(query, vector)
+                                           for query, vector in zip(queries, vectors)])
+                return [self._ranked(response) for response in responses]
+            nearest = self._msearch([self._vector_body(vector) for vector in vectors])
+            return [self._fuse(*responses) for responses in zip(keyword.result(), nearest)]
+
+    async def aretrieve_many(self, queries: Sequence[str]) -> List[List[Document]]:
+        """Async counterpart of `retrieve_many`."""
+        if not queries:
+            return []
+
+        async def embed_all():
+            return await asyncio.gather(*(self.embeddings.aembed_query(query) for query in queries))
+
+        if self.pipeline_id:
+            vectors = await embed_all()
+            responses = await self._amsearch([self._hybrid_body(query, vector)
+                                              for query, vector in zip(queries, vectors)])
+            return [self._ranked(response) for response in responses]
+
+        async def vector_leg():
+            return await self._amsearch([self._vector_body(vector) for vector in await embed_all()])
+
+        keyword, nearest = await asyncio.gather(
+            self._amsearch([self._keyword_body(query) for query in queries]), vector_leg())
+        return [self._fuse(*responses) for responses in zip(keyword, nearest)]
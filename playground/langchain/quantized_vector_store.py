@@ -0,0 +1,378 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+CODES_FILENAME = "codes.int8"
+SCALES_FILENAME = "scales.float32"
+VECTORS_FILENAME = "vectors.float32"
+META_FILENAME = "meta.json"
+DOCUMENTS_FILENAME = "documents.sqlite"
+# Elements of the int8 matrix converted to float32 at once while scanning it, in
+# blocks of 1 MB that stay in the CPU cache
+SCAN_BLOCK_ELEMENTS = 1 << 18
+
+
+class QuantizedVectorIndex:
+    """
+    Cosine similarity index of int8 vectors over memory-mapped files.
+
+    Each normalized vector is scaled to [-127, 127] and stored as int8 codes with
+    its float32 scale, a quarter of its float32 size: searches scan the codes for
+    the `candidates` best approximate scores, then re-rank them exactly with the
+    float32 vectors, kept in their own file and only read for the candidates.
+
+    Vectors are appended to the files and identified by their position. Removed
+    positions are masked until `compact` rewrites the files without them.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None):
+        """
+        Args:
+            path: The directory of the files, created if needed.
+            dim: The dimension of the vectors, by default the one of the first vectors.
+                It is saved with the files, and must match theirs when given.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self._open()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self) -> None:
+        if os.path.exists(self._file(META_FILENAME)):
+            with open(self._file(META_FILENAME), encoding="utf-8") as f:
+                dim = json.load(f)["dim"]
+            if self.dim is not None and self.dim != dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, the index has dimension {dim}")
+            self.dim = dim
+        count = 0
+        if self.dim:
+            record_sizes = {CODES_FILENAME: self.dim, SCALES_FILENAME: 4, VECTORS_FILENAME: 4 * self.dim}
+            sizes = {name: os.path.getsize(self._file(name)) if os.path.exists(self._file(name)) else 0
+                     for name in record_sizes}
+            count = min(sizes[name] // record_size for name, record_size in record_sizes.items())
+            # The partial records of an interrupted append are dropped, so that the
+            # next append lines up in the three files
+            for name, record_size in record_sizes.items():
+                if sizes[name] > count * record_size:
+                    with open(self._file(name), "r+b") as f:
+                        f.truncate(count * record_size)
+        self._map(count)
+        self._removed = np.zeros(count, dtype=bool)
+
+    def _map(self, count: int) -> None:
+        if count == 0:  # Empty files can not be mapped
+            self._codes = np.zeros((0, self.dim or 0), dtype=np.int8)
+            self._scales = np.zeros(0, dtype=np.float32)
+            self._vectors = np.zeros((0, self.dim or 0), dtype=np.float32)
+            return
+        self._codes = np.memmap(self._file(CODES_FILENAME), dtype=np.int8, mode="r", shape=(count, self.dim))
+        self._scales = np.memmap(self._file(SCALES_FILENAME), dtype=np.float32, mode="r", shape=(count,))
+        self._vectors = np.memmap(self._file(VECTORS_FILENAME), dtype=np.float32, mode="r",
+                                  shape=(count, self.dim))
+
+    def __len__(self) -> int:
+        """The number of positions, removed ones included."""
+        return len(self._scales)
+
+    @property
+    def live(self) -> int:
+        return len(self._scales) - int(self._removed.sum())
+
+    @staticmethod
+    def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the int8 codes and scales of normalized vectors: vector ≈ codes * scale."""
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def add(self, vectors: Sequence[Sequence[float]]) -> List[int]:
+        """Append vectors, returning their positions."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.size == 0:
+            return []
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if not os.path.exists(self._file(META_FILENAME)):
+            with open(self._file(META_FILENAME), "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim}, f)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+        vectors = self._normalize(vectors).astype(np.float32)
+        codes, scales = self.quantize(vectors)
+        start = len(self)
+        for name, array in ((CODES_FILENAME, codes), (SCALES_FILENAME, scales), (VECTORS_FILENAME, vectors)):
+            with open(self._file(name), "ab") as f:
+                f.write(array.tobytes())
+        self._map(start + len(vectors))
+        self._removed = np.concatenate([self._removed, np.zeros(len(vectors), dtype=bool)])
+        return list(range(start, start + len(vectors)))
+
+    def remove(self, positions: Iterable[int]) -> None:
+        self._removed[np.fromiter(positions, dtype=np.int64)] = True
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarities of the normalized `query` to the int8 vectors, -inf where removed."""
+        scores = np.empty(len(self), dtype=np.float32)
+        block = max(1, SCAN_BLOCK_ELEMENTS // self.dim)
+        for start in range(0, len(self), block):
+            codes = self._codes[start:start + block]
+            scores[start:start + len(codes)] = (codes.astype(np.float32) @ query) * self._scales[start:start + block]
+        scores[self._removed] = -np.inf
+        return scores
+
+    def search(self, vector: Sequence[float], k: int, candidates: Optional[int] = None,
+               predicate: Optional[Callable[[int], bool]] = None) -> List[Tuple[int, float]]:
+        """
+        Return the (position, cosine similarity) of the `k` nearest vectors.
+
+        Args:
+            vector: The query vector.
+            k: The number of results.
+            candidates: The number of approximate results re-ranked exactly, by
+                default 4 * k. Raising it trades speed for recall.
+            predicate: Only keep the positions for which it is true. Candidates are
+                then fetched until `k` of them pass it.
+        """
+        if not self.live or k <= 0:
+            return []
+        query = self._normalize(np.asarray(vector, dtype=np.float32))
+        scores = self.approximate_scores(query)
+        candidates = min(max(candidates or 4 * k, k), self.live)
+        while True:
+            top = np.argpartition(-scores, candidates - 1)[:candidates]
+            if predicate is not None:
+                top = np.asarray([position for position in top.tolist() if predicate(position)], dtype=np.int64)
+            if predicate is None or len(top) >= k or candidates == self.live:
+                break
+            candidates = min(candidates * 4, self.live)
+        top = np.sort(top)  # Sequential reads of the float32 file
+        exact = self._vectors[top] @ query
+        order = np.argsort(-exact, kind="stable")[:k]
+        return [(int(top[index]), float(exact[index])) for index in order]
+
+    def vectors(self, positions: Sequence[int]) -> np.ndarray:
+        """The normalized float32 vectors at `positions`."""
+        return np.asarray(self._vectors[np.asarray(positions, dtype=np.int64)])
+
+    def compact(self) -> List[int]:
+        """
+        Rewrite the files without the removed vectors, returning the new position of
+        each previous position (-1 for the removed ones).
+        """
+        kept = np.flatnonzero(~self._removed)
+        mapping = np.full(len(self), -1, dtype=np.int64)
+        mapping[kept] = np.arange(len(kept))
+        if len(kept) < len(self):
+            arrays = ((CODES_FILENAME, self._codes), (SCALES_FILENAME, self._scales),
+                      (VECTORS_FILENAME, self._vectors))
+            for name, array in arrays:
+                with open(self._file(f"{name}.tmp"), "wb") as f:
+                    f.write(np.ascontiguousarray(array[kept]).tobytes())
+            for name, _ in arrays:
+                os.replace(self._file(f"{name}.tmp"), self._file(name))
+            self._map(len(kept))
+            self._removed = np.zeros(len(kept), dtype=bool)
+        return mapping.tolist()
+
+
+class QuantizedVectorStore(VectorStore):
+    """
+    Embedded vector store: a QuantizedVectorIndex of the vectors and a SQLite table
+    of the documents, all in one directory. It needs no server, and the vectors
+    are scanned as int8 codes from memory-mapped files (a quarter of their float32
+    size), the candidates being re-ranked with their exact vectors.
+
+    Adding documents appends their vectors; an id added again replaces its
+    document. Deleted vectors are skipped by searches until `compact` drops them.
+    Without a `path`, the store lives in a temporary directory removed on `close`.
+    """
+
+    def __init__(self, embedding: Embeddings, path: Optional[str] = None, candidates_factor: int = 4):
+        """
+        Args:
+            embedding: The embeddings of the documents and queries.
+            path: The directory of the store, created if needed.
+            candidates_factor: The number of approximate results re-ranked exactly,
+                per result. Raising it trades speed for recall.
+        """
+        self.embedding = embedding
+        self.candidates_factor = candidates_factor
+        self._temporary = tempfile.TemporaryDirectory(prefix="quantized-vector-store-") if path is None else None
+        self.path = path or self._temporary.name
+        self.index = QuantizedVectorIndex(self.path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(self.path, DOCUMENTS_FILENAME), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                position INTEGER NOT NULL UNIQUE,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        # Positions without a document were deleted, or appended without being committed
+        live = np.zeros(len(self.index), dtype=bool)
+        positions = [position for position, in self._conn.execute("SELECT position FROM documents")]
+        live[[position for position in positions if position < len(live)]] = True
+        self.index.remove(np.flatnonzero(~live).tolist())
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def __len__(self) -> int:
+        return self.index.live
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, *,
+                   ids: Optional[List[str]] = None, path: Optional[str] = None,
+                   **kwargs: Any) -> "QuantizedVectorStore":
+        store = cls(embedding, path=path, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, *,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        vectors = self.embedding.embed_documents(texts)
+        return self.add_embeddings(list(zip(texts, vectors)), metadatas, ids=ids)
+
+    def add_embeddings(self, text_embeddings: Iterable[Tuple[str, List[float]]],
+                       metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None,
+                       **kwargs: Any) -> List[str]:
+        """Add texts with their precomputed vectors, replacing the documents of existing ids."""
+        text_embeddings = list(text_embeddings)
+        if not text_embeddings:
+            return []
+        metadatas = metadatas or [{} for _ in text_embeddings]
+        ids = [document_id or str(uuid.uuid4()) for document_id in (ids or [None] * len(text_embeddings))]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate ids")
+        with self._lock, self._conn:
+            replaced = self._positions(ids)
+            positions = self.index.add([vector for _, vector in text_embeddings])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (id, position, text, metadata) VALUES (?, ?, ?, ?)",
+                [(document_id, position, text, json.dumps(metadata, default=str))
+                 for document_id, position, (text, _), metadata in zip(ids, positions, text_embeddings, metadatas)],
+            )
+            self.index.remove(replaced.values())
+        return ids
+
+    def _positions(self, ids: Sequence[str]) -> dict:
+        return dict(self._conn.execute(
+            "SELECT id, position FROM documents WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(ids),)))
+
+    def _documents(self, positions: Sequence[int]) -> dict:
+        rows = self._conn.execute(
+            "SELECT position, id, text, metadata FROM documents "
+            "WHERE position IN (SELECT value FROM json_each(?))", (json.dumps(list(positions)),))
+        return {position: Document(page_content=text, metadata=json.loads(metadata), id=document_id)
+                for position, document_id, text, metadata in rows}
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if ids is None:
+            raise ValueError("No ids provided to delete")
+        with self._lock, self._conn:
+            positions = self._positions(ids)
+            self._conn.execute("DELETE FROM documents WHERE id IN (SELECT value FROM json_each(?))",
+                               (json.dumps(list(ids)),))
+            self.index.remove(positions.values())
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        with self._lock:
+            documents = self._documents(list(self._positions(ids).values()))
+        by_id = {document.id: document for document in documents.values()}
+        return [by_id[document_id] for document_id in ids if document_id in by_id]
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[Callable[[Document], bool]] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return the `k` documents nearest to a vector, with their cosine similarity.
+
+        Args:
+            embedding: The query vector.
+            k: The number of documents.
+            filter: Only return the documents for which it is true.
+        """
+        with self._lock:
+            predicate = None
+            if filter is not None:
+                def predicate(position: int) -> bool:
+                    document = self._documents([position]).get(position)
+                    return document is not None and filter(document)
+            results = self.index.search(embedding, k, candidates=self.candidates_factor * k, predicate=predicate)
+            documents = self._documents([position for position, _ in results])
+        return [(documents[position], score) for position, score in results]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are cosine similarities
+        return lambda score: score
+
+    def max_marginal_relevance_search_by_vector(
+        self, embedding: List[float], k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, *,
+        filter: Optional[Callable[[Document], bool]] = None, **kwargs: Any
+    ) -> List[Document]:
+        with self._lock:
+            results = self.similarity_search_with_score_by_vector(embedding, fetch_k, filter=filter)
+            positions = self._positions([document.id for document, _ in results])
+            vectors = self.index.vectors([positions[document.id] for document, _ in results])
+        selected = maximal_marginal_relevance(np.asarray(embedding, dtype=np.float32), list(vectors), k=k,
+                                              lambda_mult=lambda_mult)
+        return [results[index][0] for index in selected]
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5,
+                                      **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(self.embedding.embed_query(query), k, fetch_k,
+                                                            lambda_mult, **kwargs)
+
+    def compact(self) -> None:
+        """Rewrite the vector files without the deleted and replaced vectors."""
+        with self._lock, self._conn:
+            mapping = self.index.compact()
+            # Moved in two steps, as positions are unique
+            self._conn.execute("UPDATE documents SET position = -1 - position")
+            self._conn.executemany("UPDATE documents SET position = ? WHERE position = ?",
+                                   [(new, -1 - old) for old, new in enumerate(mapping) if new >= 0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        if self._temporary is not None:
+            self._temporary.cleanup()
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    Callers reserve a token under the lock and sleep outside of it, so concurrent
+    callers are served in arrival order without holding the lock while waiting.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, tokens: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity if tokens is None else tokens
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class HostRateLimiter:
+    """One token bucket per host.
+
+    Hosts use the default rate unless a specific rate was set for them (e.g. from a
+    ``robots.txt`` crawl-delay). Without any rate, requests are not limited.
+    """
+
+    def __init__(self, requests_per_second: Optional[float] = None, burst: float = 1.0):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, host: str, requests_per_second: float, burst: float = 1.0) -> None:
+        """Limit ``host`` to ``requests_per_second``, keeping the stricter of the two
+        if a default rate is configured.
+
+        The new bucket starts empty: the rate is usually learned from a request to the
+        host (e.g. ``robots.txt``), which counts against it.
+        """
+        if self.requests_per_second is not None:
+            requests_per_second = min(requests_per_second, self.requests_per_second)
+            burst = min(burst, self.burst)
+        with self._lock:
+            self._buckets[host] = TokenBucket(requests_per_second, burst, tokens=0)
+
+    def acquire(self, url: str) -> float:
+        """Wait for the rate limit of the host of ``url``.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None and self.requests_per_second is not None:
+                bucket = TokenBucket(self.requests_per_second, self.burst)
+                self._buckets[host] = bucket
+        if bucket is None:
+            return 0.0
+        return bucket.acquire()
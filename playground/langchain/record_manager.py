@@ -0,0 +1,147 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Sequence, Set
+
+from langchain_core.indexing import RecordManager
+
+DEFAULT_RECORD_MANAGER_PATH = "record_manager.sqlite"
+
+
+class SQLiteRecordManager(RecordManager):
+    """
+    Record manager over a SQLite file, tuned for bulk incremental indexing.
+
+    The database runs in WAL mode and each call is a single statement whatever the
+    number of keys, the keys being passed as one JSON array (`json_each`) instead
+    of one round trip per key. The keys of the namespace are also kept in a set:
+    `exists` only queries the database for the keys of the set, so new keys cost
+    no SQL at all. Only the (group, time) lookups of the incremental cleanup are
+    indexed, as each index slows down the refresh of every unchanged key.
+
+    The set is loaded on open and kept up to date by this instance only: keys
+    written to the same namespace by another process while it is open are seen as
+    missing (and indexed again) until the record manager is reopened.
+    """
+
+    def __init__(self, namespace: str, path: str = DEFAULT_RECORD_MANAGER_PATH):
+        """
+        Args:
+            namespace: The namespace of the records, e.g. the name of the index.
+            path: The path of the SQLite file, shared by all namespaces.
+        """
+        super().__init__(namespace)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_schema()
+        self._keys: Set[str] = {key for key, in self._conn.execute(
+            "SELECT key FROM records WHERE namespace = ?", (namespace,))}
+
+    def create_schema(self) -> None:
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    group_id TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS records_group ON records (namespace, group_id, updated_at);
+                """
+            )
+
+    async def acreate_schema(self) -> None:
+        await asyncio.to_thread(self.create_schema)
+
+    def get_time(self) -> float:
+        return time.time()
+
+    async def aget_time(self) -> float:
+        return self.get_time()
+
+    def update(self, keys: Sequence[str], *, group_ids: Optional[Sequence[Optional[str]]] = None,
+               time_at_least: Optional[float] = None) -> None:
+        if group_ids is None:
+            group_ids = [None] * len(keys)
+        if len(keys) != len(group_ids):
+            raise ValueError("Length of keys must match length of group_ids")
+        if not keys:
+            return
+        now = self.get_time()
+        if time_at_least and time_at_least > now:
+            raise ValueError("time_at_least must be in the past")
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO records (namespace, key, group_id, updated_at)
+                SELECT ?, json_extract(value, '$[0]'), json_extract(value, '$[1]'), ? FROM json_each(?) WHERE true
+                ON CONFLICT (namespace, key) DO UPDATE SET
+                    group_id = excluded.group_id, updated_at = excluded.updated_at
+                """,
+                (self.namespace, now, json.dumps(list(zip(keys, group_ids)))),
+            )
+            self._keys.update(keys)
+
+    async def aupdate(self, keys: Sequence[str], *, group_ids: Optional[Sequence[Optional[str]]] = None,
+                      time_at_least: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.update, keys, group_ids=group_ids, time_at_least=time_at_least)
+
+    def exists(self, keys: Sequence[str]) -> List[bool]:
+        with self._lock:
+            candidates = [key for key in keys if key in self._keys]
+            if not candidates:
+                return [False] * len(keys)
+            found = {key for key, in self._conn.execute(
+                "SELECT key FROM records WHERE namespace = ? AND key IN (SELECT value FROM json_each(?))",
+                (self.namespace, json.dumps(candidates)),
+            )}
+        return [key in found for key in keys]
+
+    async def aexists(self, keys: Sequence[str]) -> List[bool]:
+        return await asyncio.to_thread(self.exists, keys)
+
+    def list_keys(self, *, before: Optional[float] = None, after: Optional[float] = None,
+                  group_ids: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> List[str]:
+        query = "SELECT key FROM records WHERE namespace = ?"
+        params: list = [self.namespace]
+        if before is not None:
+            query += " AND updated_at < ?"
+            params.append(before)
+        if after is not None:
+            query += " AND updated_at > ?"
+            params.append(after)
+        if group_ids is not None:
+            query += " AND group_id IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(group_ids)))
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [key for key, in self._conn.execute(query, params)]
+
+    async def alist_keys(self, *, before: Optional[float] = None, after: Optional[float] = None,
+                         group_ids: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> List[str]:
+        return await asyncio.to_thread(self.list_keys, before=before, after=after, group_ids=group_ids,
+                                       limit=limit)
+
+    def delete_keys(self, keys: Sequence[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM records WHERE namespace = ? AND key IN (SELECT value FROM json_each(?))",
+                (self.namespace, json.dumps(list(keys))),
+            )
+            self._keys.difference_update(keys)
+
+    async def adelete_keys(self, keys: Sequence[str]) -> None:
+        await asyncio.to_thread(self.delete_keys, keys)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,42 @@
+import gzip
+from typing import List, NamedTuple, Optional, Tuple
+from xml.etree import ElementTree
+
+
+class SitemapEntry(NamedTuple):
+    """A page listed in a sitemap."""
+    loc: str
+    lastmod: Optional[str] = None
+
+
+def _local_name(tag: str) -> str:
+    # Drop the XML namespace, e.g. "{http://www.sitemaps.org/schemas/sitemap/0.9}url"
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(content: bytes) -> Tuple[List[SitemapEntry], List[str]]:
+    """Parse a sitemap or a sitemap index.
+
+    Args:
+        content: The raw sitemap body, optionally gzip-compressed.
+
+    Returns:
+        A tuple with the pages listed by a ``<urlset>`` and the child sitemap URLs
+        listed by a ``<sitemapindex>``.
+    """
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+
+    root = ElementTree.fromstring(content)
+    entries: List[SitemapEntry] = []
+    sitemaps: List[str] = []
+    for node in root:
+        fields = {_local_name(child.tag): (child.text or "").strip() for child in node}
+        loc = fields.get("loc")
+        if not loc:
+            continue
+        if _local_name(node.tag) == "sitemap":
+            sitemaps.append(loc)
+        else:
+            entries.append(SitemapEntry(loc, fields.get("lastmod") or None))
+    return entries, sitemaps
@@ -1,19 +1,175 @@
-from typing import Any, Callable, Iterator, List, Optional, Set, Union
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+import codecs
 import logging
-from urllib.parse import urlparse
+import re
+import time
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
 
 import requests
+from requests.compat import chardet
 from langchain_community.document_loaders.url import UnstructuredURLLoader
 from langchain_core.documents import Document
 from langchain_core.utils.html import extract_sub_links
 
+from .crawl_checkpoint import CrawlCheckpoint
+from .crawl_stats import CrawlStats, PageMetrics
+from .rate_limiter import HostRateLimiter
+from .sitemap import SitemapEntry, parse_sitemap
+
 logger = logging.getLogger(__name__)
 
+ORDERING_MODES = ("discovery", "completion")
+
+# Encoding declarations must appear within the first 1024 bytes of an HTML page,
+# leave some slack for non-conforming pages.
+_SNIFF_SIZE = 4096
+_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+_META_CHARSET_RE = re.compile(r"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+_STREAM_CHUNK_SIZE = 64 * 1024
+_ROBOTS_DISALLOWED = "disallowed by robots.txt"
+
+
+def _known_encoding(match: Optional[re.Match]) -> Optional[str]:
+    if match is None:
+        return None
+    try:
+        return codecs.lookup(match.group(1)).name
+    except LookupError:
+        return None
+
+
+def _encoding_from_headers(headers: Any) -> Optional[str]:
+    """Return the charset declared in the ``Content-Type`` header, if any.
+
+    Unlike ``requests``, do not fall back to ISO-8859-1 for ``text/*`` types.
+    """
+    content_type = headers.get("Content-Type") or ""
+    if "charset" not in content_type:
+        return None
+    return _known_encoding(_CHARSET_RE.search(content_type))
+
+
+def _encoding_from_meta(head: str) -> Optional[str]:
+    """Return the charset declared by a ``<meta>`` tag in the beginning of a page."""
+    return _known_encoding(_META_CHARSET_RE.search(head))
+
+
+def _partition_page(
+    text: str, url: str, headers: dict, mode: str, unstructured_kwargs: dict
+) -> Tuple[List[Document], int, float]:
+    """Partition a fetched page into Documents.
+
+    Kept at module level so it can be shipped to a process pool worker.
+
+    Returns:
+        The documents, the number of partitioned elements and the time spent
+        partitioning, in seconds.
+    """
+    from unstructured.partition.html import partition_html
+
+    start = time.perf_counter()
+    # partition_html supports text argument
+    elements = partition_html(
+        text=text,
+        source_url=url,
+        headers=headers,
+        **unstructured_kwargs
+    )
+
+    documents = []
+    if mode == "single":
+        text = "\n\n".join([str(el) for el in elements])
+        metadata = {"source": url}
+        documents.append(Document(page_content=text, metadata=metadata))
+    elif mode == "elements":
+        for element in elements:
+            metadata = element.metadata.to_dict()
+            metadata["category"] = element.category
+            documents.append(Document(page_content=str(element), metadata=metadata))
+    return documents, len(elements), time.perf_counter() - start
+
+
+class _InlineExecutor(Executor):
+    """Executor running submitted calls synchronously in the calling thread."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _parse_crawl_delay(lines: List[str], user_agent: str) -> Optional[float]:
+    """Return the ``Crawl-delay`` of ``robots.txt`` for ``user_agent``.
+
+    ``RobotFileParser`` ignores non-integer delays, which sites commonly use.
+    """
+    delays: Dict[str, float] = {}
+    agents: List[str] = []
+    in_agent_lines = False
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = (part.strip() for part in line.split(":", 1))
+        if key.lower() == "user-agent":
+            if not in_agent_lines:
+                agents = []
+            agents.append(value.lower())
+            in_agent_lines = True
+            continue
+        in_agent_lines = False
+        if key.lower() == "crawl-delay":
+            try:
+                delay = float(value)
+            except ValueError:
+                continue
+            for agent in agents:
+                delays.setdefault(agent, delay)
+
+    product = user_agent.split("/")[0].lower()
+    for agent, delay in delays.items():
+        if agent != "*" and agent in product:
+            return delay
+    return delays.get("*")
+
+
+def _chain(source: Future, target: Future) -> None:
+    """Resolve ``target`` with the outcome of ``source`` once it completes."""
+    def _copy(future: Future) -> None:
+        if future.cancelled():
+            target.cancel()
+        elif future.exception() is not None:
+            target.set_exception(future.exception())
+        else:
+            target.set_result(future.result())
+
+    source.add_done_callback(_copy)
+
+
 class UnstructuredRecursiveUrlLoader(UnstructuredURLLoader):
     """Recursively load all child links from a root URL using Unstructured.
 
     This loader combines the recursive crawling logic of RecursiveUrlLoader with
     the content extraction capabilities of UnstructuredURLLoader.
+
+    Pages go through a pipeline: each page is fetched, its links are extracted
+    right away to feed the crawl frontier, and it is then handed to a partition
+    stage (optionally a process pool) while the crawler moves on to the next page.
+    Several pages can be fetched concurrently, subject to a per-host rate limit and,
+    optionally, to the rules and crawl-delay of the site's ``robots.txt``.
     """
 
     def __init__(
@@ -33,6 +189,17 @@ class UnstructuredRecursiveUrlLoader(UnstructuredURLLoader):
         encoding: Optional[str] = None,
         proxies: Optional[dict] = None,
         ssl: bool = True,
+        partition_workers: int = 0,
+        ordering: str = "discovery",
+        checkpoint_path: Optional[str] = None,
+        max_concurrency: int = 1,
+        requests_per_second: Optional[float] = None,
+        burst: int = 1,
+        respect_robots_txt: bool = False,
+        use_sitemap: bool = False,
+        sitemap_url: Optional[str] = None,
+        max_body_size: Optional[int] = None,
+        on_page: Optional[Callable[[PageMetrics], None]] = None,
         **unstructured_kwargs: Any,
     ):
         """Initialize with URL to crawl and unstructured settings.
@@ -51,18 +218,56 @@ class UnstructuredRecursiveUrlLoader(UnstructuredURLLoader):
                 an exception. Otherwise, raise the exception.
             headers: Default request headers to use for all requests.
             mode: Mode for unstructured partition ("single" or "elements").
-            show_progress_bar: Whether to show a progress bar (not used in lazy_load currently).
+            show_progress_bar: Whether to show a live progress bar of crawled pages and
+                queue depth. Requires ``tqdm``.
             base_url: The base url to check for outside links against.
-            autoset_encoding: Whether to automatically set the encoding of the response.
+            autoset_encoding: Whether to automatically set the encoding of the response,
+                from the ``Content-Type`` header, then from a ``<meta>`` tag, and only
+                then by running charset detection on the body.
             encoding: The encoding of the response.
             proxies: A dictionary mapping protocol names to the proxy URLs.
             ssl: Whether to verify SSL certificates during requests.
+            partition_workers: Number of worker processes used to partition pages.
+                ``0`` partitions pages inline in the crawling thread.
+            ordering: Order in which documents are yielded: ``"discovery"`` yields
+                pages in the order they were crawled, ``"completion"`` yields them as
+                soon as their partitioning finishes.
+            checkpoint_path: Path of a SQLite file where the frontier, the visited set
+                and the emitted pages are journaled. If the file already holds a
+                checkpoint for the same root URL, the crawl resumes from it instead of
+                starting over, retrying the pages that failed.
+            max_concurrency: Maximum number of pages fetched concurrently.
+            requests_per_second: Per-host rate limit. ``None`` disables rate limiting
+                unless ``robots.txt`` sets a crawl-delay.
+            burst: Number of requests a host may receive back-to-back before the rate
+                limit applies.
+            respect_robots_txt: If ``True``, skip URLs disallowed by ``robots.txt`` and
+                honor its crawl-delay.
+            use_sitemap: If ``True``, seed the crawl with the pages listed in the site's
+                sitemap. With a checkpoint, sitemap pages whose ``lastmod`` changed
+                since they were crawled are crawled again.
+            sitemap_url: URL of the sitemap. Defaults to the sitemaps declared in
+                ``robots.txt``, or ``/sitemap.xml``.
+            max_body_size: Maximum size of a page body, in bytes. When set, bodies are
+                streamed and pages exceeding the limit are treated as failures instead
+                of being read in full.
+            on_page: Callback receiving the ``PageMetrics`` of every page once its
+                documents have been yielded. Metrics of the last crawl are also
+                available in ``self.stats``.
             **unstructured_kwargs: Arbitrary kwargs to pass to the unstructured partition function.
         """
         # Ensure headers is a dict if it is None, because UnstructuredURLLoader expects it to be dictionary-like
         # when popped from kwargs, or it pops default {}.
         if headers is None:
             headers = {}
+        if ordering not in ORDERING_MODES:
+            raise ValueError(
+                f"Invalid ordering {ordering!r}, expected one of {ORDERING_MODES}"
+            )
+        if partition_workers < 0:
+            raise ValueError("partition_workers must be >= 0")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
 
         # Initialize parent with the root URL.
         # Note: UnstructuredURLLoader stores urls in self.urls
@@ -85,6 +290,18 @@ class UnstructuredRecursiveUrlLoader(UnstructuredURLLoader):
         self.encoding = encoding
         self.proxies = proxies
         self.ssl = ssl
+        self.partition_workers = partition_workers
+        self.ordering = ordering
+        self.checkpoint_path = checkpoint_path
+        self.max_concurrency = max_concurrency
+        self.respect_robots_txt = respect_robots_txt
+        self.use_sitemap = use_sitemap
+        self.sitemap_url = sitemap_url
+        self.max_body_size = max_body_size
+        self.on_page = on_page
+        self.stats = CrawlStats()
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst)
+        self._robots: Dict[str, RobotFileParser] = {}
 
     def _parse_base_url(self, url: str) -> str:
         if not url.startswith(("http://", "https://")):
@@ -94,93 +311,351 @@ class UnstructuredRecursiveUrlLoader(UnstructuredURLLoader):
 
     def lazy_load(self) -> Iterator[Document]:
         """Lazy load web pages recursively."""
+        seeds = [SitemapEntry(self.url)]
+        if self.use_sitemap:
+            seeds.extend(self._get_sitemap_entries())
+
+        checkpoint = None
+        frontier: Deque[Tuple[str, int]] = deque()
         visited: Set[str] = set()
-        yield from self._get_child_links_recursive(self.url, visited)
+        if self.checkpoint_path is not None:
+            checkpoint = CrawlCheckpoint(self.checkpoint_path, self.url)
+            checkpoint.seed([(entry.loc, 0, entry.lastmod) for entry in seeds])
+            restored_frontier, visited = checkpoint.restore()
+            frontier.extend(restored_frontier)
+        else:
+            for entry in seeds:
+                if entry.loc not in visited:
+                    visited.add(entry.loc)
+                    frontier.append((entry.loc, 0))
+
+        # Pages not yet yielded, in discovery order. Each page gets a future that is
+        # resolved with its documents once it has been fetched and partitioned.
+        pending: Deque[Tuple[str, Future, PageMetrics]] = deque()
+        fetching: Dict[Future, Tuple[str, int, Future]] = {}
+
+        self.stats = CrawlStats()
+        progress = self._get_progress_bar()
+
+        def on_done(metrics: PageMetrics) -> None:
+            # Only journal the page once the consumer has taken all of its documents.
+            # Failed pages stay in the frontier of the checkpoint, to be retried on resume.
+            if checkpoint and metrics.error in (None, _ROBOTS_DISALLOWED):
+                checkpoint.mark_emitted(metrics.url, metrics.documents)
+            self.stats.record(metrics)
+            if self.on_page:
+                self.on_page(metrics)
+            if progress is not None:
+                progress.update(1)
+                progress.set_postfix(queued=len(frontier), fetching=len(fetching), refresh=False)
+        # Bound the number of pages waiting to be partitioned so a fast crawl does
+        # not pile up page bodies in memory.
+        max_pending = self.max_concurrency + max(1, 2 * self.partition_workers)
+
+        fetch_executor = self._get_fetch_executor()
+        executor = self._get_partition_executor()
+        try:
+            while frontier or fetching or pending:
+                while frontier and len(fetching) < self.max_concurrency and len(pending) < max_pending:
+                    url, depth = frontier.popleft()
+                    if depth >= self.max_depth:
+                        continue
+                    page: Future = Future()
+                    metrics = PageMetrics(url, depth=depth, queue_depth=len(frontier))
+                    pending.append((url, page, metrics))
+                    if not self._can_fetch(url):
+                        logger.info(f"Skipping {url}, disallowed by robots.txt")
+                        metrics.error = _ROBOTS_DISALLOWED
+                        page.set_result(([], 0, None))
+                        continue
+                    fetching[fetch_executor.submit(self._fetch, url, metrics)] = (url, depth, page)
+
+                waitables = list(fetching)
+                if pending and self.ordering == "discovery":
+                    waitables.append(pending[0][1])
+                else:
+                    waitables.extend(page for _, page, _ in pending)
+                wait(waitables, return_when=FIRST_COMPLETED)
+
+                for fetch_future in [f for f in fetching if f.done()]:
+                    url, depth, page = fetching.pop(fetch_future)
+                    text = fetch_future.result()
+                    if text is None:
+                        page.set_result(([], 0, None))
+                        continue
+
+                    # Feed the frontier before partitioning so discovery never waits
+                    # on the CPU-bound stage.
+                    if depth + 1 < self.max_depth:
+                        discovered = []
+                        for link in self._extract_links(text, url):
+                            if link not in visited:
+                                visited.add(link)
+                                discovered.append((link, depth + 1))
+                        frontier.extend(discovered)
+                        if checkpoint and discovered:
+                            checkpoint.enqueue(discovered)
+
+                    _chain(
+                        executor.submit(
+                            _partition_page,
+                            text,
+                            url,
+                            self.headers,
+                            self.mode,
+                            self.unstructured_kwargs,
+                        ),
+                        page,
+                    )
+
+                yield from self._drain(pending, on_done)
+        finally:
+            fetch_executor.shutdown(wait=True, cancel_futures=True)
+            executor.shutdown(wait=True, cancel_futures=True)
+            if checkpoint:
+                checkpoint.close()
+            if progress is not None:
+                progress.close()
+            self.stats.finish()
+            logger.info(self.stats.report())
 
     def load(self) -> List[Document]:
         """Load web pages recursively."""
         return list(self.lazy_load())
 
-    def _get_child_links_recursive(
-        self, url: str, visited: Set[str], *, depth: int = 0
-    ) -> Iterator[Document]:
-        """Recursively get all child links starting with the path of the input URL."""
-        if depth >= self.max_depth:
-            return
+    def _get_progress_bar(self) -> Any:
+        if not self.show_progress_bar:
+            return None
+        try:
+            from tqdm.auto import tqdm
+        except ImportError as e:
+            raise ImportError(
+                "Package tqdm must be installed if show_progress_bar=True. "
+                "Please install with 'pip install tqdm' or set show_progress_bar=False."
+            ) from e
+        return tqdm(desc=self.url, unit="page")
+
+    def _get_fetch_executor(self) -> Executor:
+        if self.max_concurrency > 1:
+            return ThreadPoolExecutor(max_workers=self.max_concurrency)
+        return _InlineExecutor()
+
+    def _get_partition_executor(self) -> Executor:
+        if self.partition_workers > 0:
+            return ProcessPoolExecutor(max_workers=self.partition_workers)
+        return _InlineExecutor()
+
+    def _get(self, url: str, stream: bool = False) -> requests.Response:
+        self.rate_limiter.acquire(url)
+        kwargs = {"stream": True} if stream else {}
+        return requests.get(
+            url,
+            timeout=self.timeout,
+            headers=self.headers,
+            proxies=self.proxies,
+            verify=self.ssl,
+            **kwargs,
+        )
+
+    def _get_robots(self, url: str) -> Optional[RobotFileParser]:
+        """Return the parsed ``robots.txt`` of the host of ``url``, fetched once per host.
+
+        A missing or unreachable ``robots.txt`` allows everything, while one whose
+        access is denied (401 or 403) disallows everything, as in RFC 9309.
+        """
+        parsed_url = urlparse(url)
+        host = parsed_url.netloc
+        if host not in self._robots:
+            robots = RobotFileParser()
+            robots_url = f"{parsed_url.scheme}://{host}/robots.txt"
+            lines: List[str] = []
+            try:
+                response = self._get(robots_url)
+                if response.status_code in (401, 403):
+                    robots.disallow_all = True
+                elif response.status_code >= 400:
+                    robots.allow_all = True
+                else:
+                    lines = response.text.splitlines()
+                    robots.parse(lines)
+            except Exception as e:
+                logger.warning(f"Unable to load {robots_url}: {e}")
+                robots.allow_all = True
 
-        visited.add(url)
+            delay = _parse_crawl_delay(lines, self._user_agent())
+            if delay:
+                self.rate_limiter.set_rate(host, 1 / float(delay))
+            self._robots[host] = robots
+        return self._robots[host]
 
+    def _user_agent(self) -> str:
+        return self.headers.get("User-Agent", "*")
+
+    def _can_fetch(self, url: str) -> bool:
+        if not self.respect_robots_txt:
+            return True
+        return self._get_robots(url).can_fetch(self._user_agent(), url)
+
+    def _get_sitemap_entries(self) -> List[SitemapEntry]:
+        """Collect the pages listed in the sitemap(s) of the site, following
+        sitemap indexes. Pages outside the crawl scope are dropped."""
+        if self.sitemap_url is not None:
+            sitemap_urls = [self.sitemap_url]
+        elif self.respect_robots_txt and self._get_robots(self.url).site_maps():
+            sitemap_urls = list(self._get_robots(self.url).site_maps())
+        else:
+            sitemap_urls = [urljoin(self.url, "/sitemap.xml")]
+
+        entries: List[SitemapEntry] = []
+        seen: Set[str] = set()
+        while sitemap_urls:
+            sitemap_url = sitemap_urls.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            try:
+                response = self._get(sitemap_url)
+                response.raise_for_status()
+                page_entries, child_sitemaps = parse_sitemap(response.content)
+            except Exception as e:
+                logger.warning(f"Unable to load sitemap {sitemap_url}: {e}")
+                continue
+            entries.extend(page_entries)
+            sitemap_urls.extend(child_sitemaps)
+
+        return [
+            entry
+            for entry in entries
+            if not (self.prevent_outside and not entry.loc.startswith(self.base_url))
+            and not (self.link_filter and not self.link_filter(entry.loc))
+        ]
+
+    def _fetch(self, url: str, metrics: PageMetrics) -> Optional[str]:
+        """Fetch a page and return its decoded body, or ``None`` if it was skipped.
+
+        Fetch latency, status and size are written to ``metrics``.
+        """
+        start = time.perf_counter()
         try:
-            response = requests.get(
-                url,
-                timeout=self.timeout,
-                headers=self.headers,
-                proxies=self.proxies,
-                verify=self.ssl,
-            )
+            response = self._get(url, stream=self.max_body_size is not None)
+            # Closing a streamed response releases its connection, even if it was not read
+            with response:
+                metrics.status = response.status_code
 
-            if self.encoding is not None:
-                response.encoding = self.encoding
-            elif self.autoset_encoding:
-                response.encoding = response.apparent_encoding
+                if self.check_response_status and 400 <= response.status_code <= 599:
+                    raise ValueError(f"Received HTTP status {response.status_code}")
 
-            if self.check_response_status and 400 <= response.status_code <= 599:
-                 raise ValueError(f"Received HTTP status {response.status_code}")
+                if self.max_body_size is not None:
+                    return self._read_stream(response, metrics)
+                text = self._decode(response)
+                metrics.bytes = len(response.content)
+                return text
         except Exception as e:
+            metrics.error = str(e)
             if self.continue_on_failure:
                 logger.warning(
                     f"Unable to load from {url}. Received error {e} of type "
                     f"{e.__class__.__name__}"
                 )
-                return
+                return None
             else:
                 raise e
+        finally:
+            metrics.fetch_seconds = time.perf_counter() - start
 
-        # Process content with Unstructured
-        try:
-            from unstructured.partition.html import partition_html
-
-            # partition_html supports text argument
-            elements = partition_html(
-                text=response.text,
-                source_url=url,
-                headers=self.headers,
-                **self.unstructured_kwargs
+    def _decode(self, response: requests.Response) -> str:
+        """Decode a fully read response, avoiding charset detection when possible."""
+        if self.encoding is not None:
+            response.encoding = self.encoding
+        elif self.autoset_encoding:
+            encoding = _encoding_from_headers(response.headers)
+            if encoding is None:
+                # Latin-1 maps every byte to a code point, which is enough to look for
+                # a <meta> charset without running detection over the whole body.
+                head = response.content[:_SNIFF_SIZE].decode("latin-1")
+                encoding = _encoding_from_meta(head) or response.apparent_encoding
+            response.encoding = encoding
+        return response.text
+
+    def _read_stream(self, response: requests.Response, metrics: PageMetrics) -> str:
+        """Read a streamed response up to ``max_body_size`` bytes and decode it."""
+        content_length = response.headers.get("Content-Length")
+        if content_length and int(content_length) > self.max_body_size:
+            raise ValueError(
+                f"Response body of {content_length} bytes exceeds max_body_size"
             )
 
-            if self.mode == "single":
-                text = "\n\n".join([str(el) for el in elements])
-                metadata = {"source": url}
-                yield Document(page_content=text, metadata=metadata)
-            elif self.mode == "elements":
-                for element in elements:
-                    metadata = element.metadata.to_dict()
-                    metadata["category"] = element.category
-                    yield Document(page_content=str(element), metadata=metadata)
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(_STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            metrics.bytes = size
+            if size > self.max_body_size:
+                raise ValueError(
+                    f"Response body exceeds max_body_size of {self.max_body_size} bytes"
+                )
+            chunks.append(chunk)
+        body = b"".join(chunks)
 
-        except Exception as e:
-             if self.continue_on_failure:
-                logger.error(f"Error partitioning {url}: {e}")
-             else:
-                raise e
+        encoding = self.encoding
+        if encoding is None and self.autoset_encoding:
+            encoding = (
+                _encoding_from_headers(response.headers)
+                or _encoding_from_meta(body[:_SNIFF_SIZE].decode("latin-1"))
+                or chardet.detect(body)["encoding"]
+            )
+        return body.decode(encoding or response.encoding or "utf-8", errors="replace")
 
-        # Extract links
+    def _extract_links(self, text: str, url: str) -> List[str]:
         # We use extract_sub_links which takes care of finding links and converting to absolute paths
-        # and checking prevent_outside.
+        # and checking prevent_outside. Links are sorted so that the crawl order
+        # (and therefore discovery ordering and checkpoints) is deterministic.
         sub_links = extract_sub_links(
-            response.text,
+            text,
             url,
             base_url=self.base_url,
             prevent_outside=self.prevent_outside,
             continue_on_failure=self.continue_on_failure,
         )
+        sub_links = sorted(sub_links)
 
-        for link in sub_links:
-            # Apply user filter
-            if self.link_filter and not self.link_filter(link):
-                continue
+        # Apply user filter
+        if self.link_filter:
+            sub_links = [link for link in sub_links if self.link_filter(link)]
+        return sub_links
 
-            if link not in visited:
-                yield from self._get_child_links_recursive(
-                    link, visited, depth=depth + 1
-                )
+    def _drain(
+        self,
+        pending: Deque[Tuple[str, Future, PageMetrics]],
+        on_done: Callable[[PageMetrics], None],
+    ) -> Iterator[Document]:
+        """Yield the documents of the pages that are ready, following ``self.ordering``."""
+        if self.ordering == "discovery":
+            while pending and pending[0][1].done():
+                yield from self._collect(*pending.popleft(), on_done)
+            return
+
+        for entry in [entry for entry in pending if entry[1].done()]:
+            pending.remove(entry)
+            yield from self._collect(*entry, on_done)
+
+    def _collect(
+        self,
+        url: str,
+        future: Future,
+        metrics: PageMetrics,
+        on_done: Callable[[PageMetrics], None],
+    ) -> Iterator[Document]:
+        try:
+            documents, metrics.elements, metrics.partition_seconds = future.result()
+        except Exception as e:
+            metrics.error = str(e)
+            if self.continue_on_failure:
+                logger.error(f"Error partitioning {url}: {e}")
+                documents = []
+            else:
+                raise e
+
+        yield from documents
+        metrics.documents = len(documents)
+        on_done(metrics)
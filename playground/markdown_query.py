@@ -33,7 +33,9 @@ def build_heading_tree(root_node, source_code):
     headings = []
     for i, heading_node in enumerate(flat_headings):
         level = heading_node.children[0].text.count(b'#')
-        content_node = heading_node.child_by_field_name('content')
+        # The field was renamed in recent versions of the grammar
+        content_node = (heading_node.child_by_field_name('heading_content')
+                        or heading_node.child_by_field_name('content'))
         text = content_node.text.decode('utf8').strip() if content_node else ""
         
         start_byte = heading_node.start_byte
@@ -0,0 +1,189 @@
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class QueuedIssue:
+    """
+    An issue waiting in the IssueScheduler.
+    """
+    repo: str
+    number: int
+    issue: object = field(compare=False, repr=False)
+    priority: float = 0
+    enqueued_at: float = 0.0
+    removed: bool = False
+
+    @property
+    def key(self):
+        return self.repo, self.number
+
+
+class IssueScheduler:
+    """
+    Priority queue of issues across repositories feeding a limited number of sessions.
+
+    Waiting issues gain `aging_rate` priority points per hour, so a low priority issue
+    eventually overtakes newer high priority ones and is never starved. As every
+    waiting issue ages at the same rate, the order between two of them never changes
+    and the heap key `aging_rate * enqueued_at - priority` can be computed once.
+
+    Issues are identified by `(repo, number)`: pushing a queued issue updates it in
+    place, and pushing an in-flight issue is a no-op. Both checks are dict or set
+    lookups; replaced heap entries are flagged and skipped when popped.
+    """
+
+    def __init__(self, max_sessions, aging_rate=0.2, max_per_repo=None, clock=time.monotonic):
+        """
+        Args:
+            max_sessions: The maximum number of issues in flight at the same time.
+            aging_rate: The priority points gained per hour of waiting.
+            max_per_repo: An optional cap of in-flight issues per repository, so that
+                one busy repository cannot take every session.
+            clock: The function returning the current time in seconds.
+        """
+        self.max_sessions = max_sessions
+        self.aging_rate = aging_rate
+        self.max_per_repo = max_per_repo
+        self.clock = clock
+        self._heap = []
+        self._queued = {}  # (repo, number) -> QueuedIssue
+        self._in_flight = set()  # (repo, number)
+        self._in_flight_per_repo = {}
+        self._counter = itertools.count()  # Ties are served in arrival order
+
+    def __len__(self):
+        return len(self._queued)
+
+    def __contains__(self, key):
+        return key in self._queued or key in self._in_flight
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    @property
+    def free_slots(self):
+        return max(0, self.max_sessions - len(self._in_flight))
+
+    def is_in_flight(self, repo, number):
+        return (repo, number) in self._in_flight
+
+    def queued_numbers(self, repo):
+        """
+        Returns the numbers of the queued issues of a repository.
+        """
+        return {number for queued_repo, number in self._queued if queued_repo == repo}
+
+    def push(self, repo, number, issue, priority, enqueued_at=None):
+        """
+        Queues an issue, or updates it if it is already queued.
+
+        Args:
+            repo: The full name of the repository.
+            number: The number of the issue.
+            issue: The issue object handed back by `pop_ready`.
+            priority: The base priority of the issue.
+            enqueued_at: The time the issue started waiting, kept from the previous
+                entry when the issue is already queued.
+
+        Returns:
+            False if the issue is in flight, True otherwise.
+        """
+        key = (repo, number)
+        if key in self._in_flight:
+            return False
+        previous = self._queued.get(key)
+        if previous is not None:
+            if enqueued_at is None:
+                enqueued_at = previous.enqueued_at
+            if previous.priority == priority and previous.enqueued_at == enqueued_at:
+                previous.issue = issue
+                return True
+            previous.removed = True
+        if enqueued_at is None:
+            enqueued_at = self.clock()
+        entry = QueuedIssue(repo, number, issue, priority, enqueued_at)
+        self._queued[key] = entry
+        sort_key = self.aging_rate * enqueued_at / 3600 - priority
+        heapq.heappush(self._heap, (sort_key, next(self._counter), entry))
+        if len(self._heap) > 2 * len(self._queued) + 64:
+            # Too many replaced entries: drop them instead of letting the heap grow
+            self._heap = [item for item in self._heap if not item[2].removed]
+            heapq.heapify(self._heap)
+        return True
+
+    def remove(self, repo, number):
+        """
+        Drops a queued issue, e.g. once it is closed or no longer ready.
+        """
+        entry = self._queued.pop((repo, number), None)
+        if entry is not None:
+            entry.removed = True
+
+    def effective_priority(self, entry, now=None):
+        """
+        Returns the priority of a queued issue including its aging.
+        """
+        now = self.clock() if now is None else now
+        return entry.priority + self.aging_rate * (now - entry.enqueued_at) / 3600
+
+    def pop_ready(self, limit=None):
+        """
+        Takes the most urgent issues that fit in the free sessions and marks them in flight.
+
+        Issues of a repository that reached `max_per_repo` stay queued.
+
+        Args:
+            limit: An optional maximum number of issues to take.
+
+        Returns:
+            A list of QueuedIssue, most urgent first.
+        """
+        count = self.free_slots if limit is None else min(limit, self.free_slots)
+        taken = []
+        skipped = []
+        while self._heap and len(taken) < count:
+            item = heapq.heappop(self._heap)
+            entry = item[2]
+            if entry.removed:
+                continue
+            if self.max_per_repo is not None and self._in_flight_per_repo.get(entry.repo, 0) >= self.max_per_repo:
+                skipped.append(item)
+                continue
+            del self._queued[entry.key]
+            self.mark_in_flight(entry.repo, entry.number)
+            taken.append(entry)
+        for item in skipped:
+            heapq.heappush(self._heap, item)
+        return taken
+
+    def mark_in_flight(self, repo, number):
+        """
+        Counts an issue as in flight, e.g. a session started before a restart.
+        """
+        key = (repo, number)
+        if key in self._in_flight:
+            return
+        self.remove(repo, number)
+        self._in_flight.add(key)
+        self._in_flight_per_repo[repo] = self._in_flight_per_repo.get(repo, 0) + 1
+
+    def release(self, repo, number):
+        """
+        Frees the session of an in-flight issue.
+        """
+        key = (repo, number)
+        if key in self._in_flight:
+            self._in_flight.remove(key)
+            self._in_flight_per_repo[repo] -= 1
+
+    def requeue(self, entry):
+        """
+        Releases an issue whose dispatch failed and queues it again without losing its
+        waiting time.
+        """
+        self.release(entry.repo, entry.number)
+        self.push(entry.repo, entry.number, entry.issue, entry.priority, entry.enqueued_at)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+"""
+Downloads Spring reference documentations as one markdown file per project.
+
+The pages listed in the navigation of each project are fetched concurrently over
+pooled connections, and the projects are downloaded in parallel. Pages are cached
+with their validators: on re-runs, unchanged pages are answered `304 Not Modified`
+(or have the same content hash) and are not parsed or converted again.
+
+Usage:
+    python -m playground.spring_docs spring-boot spring-security --workers 8
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+from markdownify import MarkdownConverter
+
+from playground.http_client import HttpClient
+from playground.langchain.rate_limiter import HostRateLimiter
+
+NAV_SELECTOR = "a.nav-link"
+CONTENT_SELECTOR = "article.doc"
+DEFAULT_OUTPUT_DIR = "data/ephemeral/spring-doc"
+CACHE_FILENAME = ".pages.sqlite"
+
+SPRING_PROJECTS = {
+    "spring-security": "https://docs.spring.io/spring-security/reference/index.html",
+    "spring-authorization-server": "https://docs.spring.io/spring-authorization-server/reference/overview.html",
+    "spring-boot": "https://docs.spring.io/spring-boot/index.html",
+    "spring-graphql": "https://docs.spring.io/spring-graphql/reference/index.html",
+    "spring-framework": "https://docs.spring.io/spring-framework/reference/overview.html",
+    "spring-data-commons": "https://docs.spring.io/spring-data/commons/reference/index.html",
+    "spring-data-jpa": "https://docs.spring.io/spring-data/jpa/reference/",
+    "spring-amqp": "https://docs.spring.io/spring-amqp/reference/",
+    "spring-integration": "https://docs.spring.io/spring-integration/reference/",
+    "spring-modulith": "https://docs.spring.io/spring-modulith/reference/index.html",
+}
+
+# lxml is a C parser, several times faster than the pure-Python html.parser
+HTML_PARSER = "lxml"
+# Content pages are only parsed for their article, not the navigation around it
+CONTENT_STRAINER = SoupStrainer("article")
+
+_converter = MarkdownConverter(heading_style="ATX")
+
+
+def extract_nav_links(base_url: str, soup: BeautifulSoup) -> List[str]:
+    """Extracts all navigation links, without their anchors and duplicates."""
+    links = {}
+    for nav in soup.select(NAV_SELECTOR):
+        href = nav.get("href")
+        if href:
+            links.setdefault(urljoin(base_url, href).split("#")[0], None)
+    return list(links)
+
+
+def extract_content(soup: BeautifulSoup) -> Optional[str]:
+    """Extracts the content of the article.doc element as markdown."""
+    content = soup.select_one(CONTENT_SELECTOR)
+    if content is None:
+        return None
+    # Converted in place, without serializing and parsing it again as markdownify() does,
+    # and stripped of its separation newlines as a whole document would be
+    return _converter.convert_soup(content).strip("\n")
+
+
+class PageCache:
+    """
+    SQLite cache of the downloaded pages: their validators (`ETag` and
+    `Last-Modified`), the hash of their HTML and their markdown.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                markdown TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, markdown FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("etag", "last_modified", "content_hash", "markdown"), row))
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: str,
+            markdown: Optional[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, markdown, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, markdown, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class ProjectResult:
+    """Page counts of a downloaded project."""
+    name: str
+    output_file: str
+    pages: int = 0
+    downloaded: int = 0
+    not_modified: int = 0  # Answered 304 Not Modified
+    unchanged: int = 0  # Downloaded again, with the same content
+    failed: int = 0
+    written: bool = False
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        status = "written" if self.written else "unchanged"
+        return (f"{self.name}: {self.pages} pages, {self.downloaded} downloaded, {self.not_modified} not modified, "
+                f"{self.unchanged} unchanged, {self.failed} failed in {self.elapsed:.1f}s, {self.output_file} "
+                f"{status}")
+
+
+class SpringDocsDownloader:
+    """
+    Downloads documentation sites built like the Spring ones (Antora): the pages
+    are the `a.nav-link` links of the index page, and their content is their
+    `article.doc` element.
+
+    All projects share a pool of `workers` threads fetching pages, and the requests
+    to each host are rate limited.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_OUTPUT_DIR, cache_path: Optional[str] = None, workers: int = 8,
+                 requests_per_second: Optional[float] = 4.0, http: Optional[HttpClient] = None):
+        """
+        Args:
+            output_dir: The directory of the markdown files.
+            cache_path: The path of the page cache, by default a file of `output_dir`.
+            workers: The number of pages fetched concurrently.
+            requests_per_second: The maximum request rate per host, None for no limit.
+            http: The HTTP client, by default one with a connection per worker.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.workers = workers
+        self.cache = PageCache(cache_path or os.path.join(output_dir, CACHE_FILENAME))
+        self.http = http or HttpClient(timeout=(5.0, 30.0), pool_maxsize=workers)
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst=workers)
+
+    def _get(self, url: str, headers: Optional[dict] = None):
+        self.rate_limiter.acquire(url)
+        return self.http.get(url, headers=headers or {}, endpoint="spring-docs")
+
+    def fetch_page(self, url: str) -> Tuple[Optional[str], str]:
+        """
+        Return the markdown of a page (None if it has no content) and how it was
+        obtained: "downloaded", "not_modified" or "unchanged".
+        """
+        cached = self.cache.get(url)
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        response = self._get(url, headers)
+        if response.status_code == 304 and cached is not None:
+            return cached["markdown"], "not_modified"
+        response.raise_for_status()
+
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if cached is not None and cached["content_hash"] == content_hash:
+            self.cache.put(url, etag, last_modified, content_hash, cached["markdown"])
+            return cached["markdown"], "unchanged"
+        markdown = extract_content(BeautifulSoup(response.content, HTML_PARSER, parse_only=CONTENT_STRAINER))
+        self.cache.put(url, etag, last_modified, content_hash, markdown)
+        return markdown, "downloaded"
+
+    def _fetch(self, url: str) -> Tuple[Optional[str], str]:
+        try:
+            return self.fetch_page(url)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}", file=sys.stderr)
+            return None, "failed"
+
+    def download_project(self, name: str, base_url: str, pages: ThreadPoolExecutor) -> ProjectResult:
+        """Download the pages of a project with the `pages` executor and write its markdown file."""
+        started = time.monotonic()
+        result = ProjectResult(name, os.path.join(self.output_dir, f"{name}.md"))
+        response = self._get(base_url)
+        response.raise_for_status()
+        links = extract_nav_links(base_url, BeautifulSoup(response.content, HTML_PARSER))
+        result.pages = len(links)
+        print(f"{name}: found {len(links)} pages to process.")
+
+        parts = [f"# Spring Boot Documentation\n\nSource: {base_url}\n\n---\n\n"]
+        for link, (markdown, status) in zip(links, pages.map(self._fetch, links)):
+            setattr(result, status, getattr(result, status) + 1)
+            if markdown:
+                parts.append(markdown)
+                parts.append("\n\n---\n\n")  # Separator between pages
+            elif status != "failed":
+                print(f"Warning: No content found for selector '{CONTENT_SELECTOR}' on {link}", file=sys.stderr)
+
+        content = "".join(parts)
+        result.written = self._write(result.output_file, content)
+        result.elapsed = time.monotonic() - started
+        return result
+
+    @staticmethod
+    def _write(path: str, content: str) -> bool:
+        """Write `content` to `path` unless it already holds it, returning whether it was written."""
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                if f.read() == content:
+                    return False
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temporary, path)
+        return True
+
+    def run(self, projects: Dict[str, str]) -> List[ProjectResult]:
+        """
+        Download projects in parallel, `projects` mapping the names of the output
+        files (without the .md extension) to the URLs of the index pages.
+
+        Raises:
+            The error of the first project whose index page could not be fetched,
+            after the other projects were downloaded.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="spring-docs-page") as pages, \
+                ThreadPoolExecutor(max_workers=max(1, len(projects)),
+                                   thread_name_prefix="spring-docs-project") as executor:
+            futures = [executor.submit(self.download_project, name, base_url, pages)
+                       for name, base_url in projects.items()]
+            errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            raise errors[0]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self.cache.close()
+        self.http.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download Spring reference documentations as markdown files.")
+    parser.add_argument("projects", nargs="*", metavar="project",
+                        help=f"Projects to download, all by default: {', '.join(SPRING_PROJECTS)}.")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Directory of the markdown files.")
+    parser.add_argument("--workers", type=int, default=8, help="Number of pages fetched concurrently.")
+    parser.add_argument("--requests-per-second", type=float, default=4.0,
+                        help="Maximum request rate to the documentation host.")
+    args = parser.parse_args()
+    unknown = [name for name in args.projects if name not in SPRING_PROJECTS]
+    if unknown:
+        parser.error(f"unknown projects: {', '.join(unknown)}")
+
+    projects = {name: SPRING_PROJECTS[name] for name in args.projects or SPRING_PROJECTS}
+    downloader = SpringDocsDownloader(args.output_dir, workers=args.workers,
+                                      requests_per_second=args.requests_per_second)
+    try:
+        for result in downloader.run(projects):
+            print(result.summary())
+    finally:
+        downloader.close()
+
+
+if __name__ == "__main__":
+    main()
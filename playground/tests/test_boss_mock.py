@@ -1,8 +1,14 @@
 import sys
 import os
+import json
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 
+import requests
+
 # Ensure we can import playground.boss
 sys.path.append(os.getcwd())
 from playground import boss
@@ -15,9 +21,10 @@ class MockIssue(dict):
 
 class TestBoss(unittest.TestCase):
     @patch('playground.boss.GhApi')
-    @patch('playground.boss.requests')
+    @patch('playground.boss.get_client')
     @patch.dict(os.environ, {"GITHUB_PERSONAL_ACCESS_TOKEN": "fake_token", "JULES_API_KEY": "fake_jules_key"})
-    def test_boss_creates_comment(self, mock_requests, mock_ghapi_cls):
+    def test_boss_creates_comment(self, mock_get_client, mock_ghapi_cls):
+        mock_requests = mock_get_client.return_value
         # Setup GhApi mock
         mock_ghapi_instance = MagicMock()
         mock_ghapi_cls.return_value = mock_ghapi_instance
@@ -90,5 +97,288 @@ class TestBoss(unittest.TestCase):
 
         self.assertTrue(found_url, f"Comment body did not contain expected URL: {expected_url}. Call args: {call_args}")
 
+    @patch('playground.boss.GhApi')
+    @patch('playground.boss.get_client')
+    @patch.dict(os.environ, {"GITHUB_PERSONAL_ACCESS_TOKEN": "fake_token", "JULES_API_KEY": "fake_jules_key"})
+    def test_boss_concurrent_dispatch(self, mock_get_client, mock_ghapi_cls):
+        mock_requests = mock_get_client.return_value
+        mock_ghapi_instance = MagicMock()
+        mock_ghapi_cls.return_value = mock_ghapi_instance
+
+        def make_issue(number, priority):
+            ready = MagicMock()
+            ready.name = 'status: ready'
+            label = MagicMock()
+            label.name = priority
+            return MockIssue({'number': number, 'labels': [ready, label], 'title': f'Issue {number}', 'body': ''})
+
+        mock_ghapi_instance.issues.list_for_repo.return_value = [
+            make_issue(1, 'priority: low'),
+            make_issue(2, 'priority: critical'),
+            make_issue(3, 'priority: medium'),
+            make_issue(4, 'priority: high'),
+            make_issue(5, 'priority: low'),
+        ]
+
+        mock_response_sessions = MagicMock()
+        mock_response_sessions.json.return_value = {"sessions": []}
+        mock_requests.get.return_value = mock_response_sessions
+
+        lock = threading.Lock()
+        in_flight = [0]
+        max_in_flight = [0]
+
+        def post_side_effect(url, headers, json, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            time.sleep(0.1)
+            with lock:
+                in_flight[0] -= 1
+            response = MagicMock()
+            response.json.return_value = {"id": json['title'].split('#')[1]}
+            return response
+
+        mock_requests.post.side_effect = post_side_effect
+
+        with patch.object(sys, 'argv', ['boss.py', 'owner/repo', '--count', '3', '--parallel', '3']):
+            boss.main()
+
+        titles = sorted(call.kwargs['json']['title'] for call in mock_requests.post.call_args_list)
+        self.assertEqual(titles, ["owner/repo#2", "owner/repo#3", "owner/repo#4"])
+        self.assertEqual(max_in_flight[0], 3)
+        # A single GitHub client is used for listing issues and all comments.
+        mock_ghapi_cls.assert_called_once()
+        commented = sorted(call.kwargs['issue_number'] for call in mock_ghapi_instance.issues.create_comment.call_args_list)
+        self.assertEqual(commented, [2, 3, 4])
+
+    def test_dispatch_issues_keeps_priority_and_count(self):
+        dispatched = []
+
+        def dispatch(issue):
+            dispatched.append(issue)
+            return issue not in (1, 2)  # The two highest priority issues fail
+
+        processed = boss.dispatch_issues([1, 2, 3, 4, 5, 6], count=2, parallelism=4, dispatch=dispatch)
+
+        self.assertEqual(processed, 2)
+        # First round dispatches 2 issues, the second round the next 2.
+        self.assertEqual(sorted(dispatched), [1, 2, 3, 4])
+
+class FakeNotModified(Exception):
+    code = 304
+
+
+class FakeIssuesApi:
+    """Serves issues in pages and answers 304 when the ETag of a page matches."""
+
+    def __init__(self, issues):
+        self.issues = self
+        self.issue_list = issues
+        self.recv_hdrs = {}
+        self.calls = []
+
+    def list_for_repo(self, state, labels, per_page, page, headers=None):
+        self.calls.append((page, headers))
+        items = self.issue_list[(page - 1) * per_page:page * per_page]
+        etag = f'"{page}-{hash(json.dumps(items, sort_keys=True))}"'
+        if headers and headers.get("If-None-Match") == etag:
+            raise FakeNotModified()
+        self.recv_hdrs = {"ETag": etag}
+        return [MockIssue(item) for item in items]
+
+
+def make_issue_dict(number, priority='priority: low'):
+    return {'number': number, 'title': f'Issue {number}', 'body': '',
+            'labels': [{'name': 'status: ready'}, {'name': priority}]}
+
+
+class TestBossListings(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = tmp_dir.name
+
+    def test_issues_pagination(self):
+        api = FakeIssuesApi([make_issue_dict(n) for n in range(1, 6)])
+        issues = list(boss.iter_open_issues(api, per_page=2))
+        self.assertEqual([issue['number'] for issue in issues], [1, 2, 3, 4, 5])
+        self.assertEqual([page for page, _ in api.calls], [1, 2, 3])
+
+    def test_issues_conditional_requests(self):
+        api = FakeIssuesApi([make_issue_dict(n) for n in range(1, 4)])
+        cache = boss.ListingCache(self.cache_dir, ttl=0)
+
+        first = list(boss.iter_open_issues(api, per_page=2, cache=cache))
+        self.assertTrue(all(headers is None for _, headers in api.calls))
+
+        # Unchanged pages are revalidated and served from the cache.
+        api.calls.clear()
+        second = list(boss.iter_open_issues(api, per_page=2, cache=cache))
+        self.assertEqual([issue.number for issue in second], [1, 2, 3])
+        self.assertEqual(second[0].labels[1].name, 'priority: low')
+        self.assertTrue(all(headers for _, headers in api.calls))
+        self.assertEqual([issue['number'] for issue in first], [1, 2, 3])
+
+        # A changed page is refetched.
+        api.issue_list[2] = make_issue_dict(3, 'priority: high')
+        third = list(boss.iter_open_issues(api, per_page=2, cache=cache))
+        self.assertEqual(third[2].labels[1].name, 'priority: high')
+
+    def test_fresh_cache_makes_no_request(self):
+        api = FakeIssuesApi([make_issue_dict(1)])
+        cache = boss.ListingCache(self.cache_dir, ttl=60)
+        list(boss.iter_open_issues(api, cache=cache))
+        api.calls.clear()
+        issues = list(boss.iter_open_issues(api, cache=cache))
+        self.assertEqual([issue.number for issue in issues], [1])
+        self.assertEqual(api.calls, [])
+
+    @patch('playground.boss.get_client')
+    def test_jules_sessions_pagination(self, mock_get_client):
+        mock_requests = mock_get_client.return_value
+        pages = {
+            None: {"sessions": [{"title": "a", "state": "IN_PROGRESS"}], "nextPageToken": "t2"},
+            "t2": {"sessions": [{"title": "b", "state": "COMPLETED"}], "nextPageToken": "t3"},
+            "t3": {"sessions": [{"title": "c", "state": "QUEUED"}]},
+        }
+        requested_tokens = []
+
+        def get_side_effect(url, headers, params, **kwargs):
+            requested_tokens.append(params.get("pageToken"))
+            response = MagicMock()
+            response.status_code = 200
+            response.json.return_value = pages[params.get("pageToken")]
+            return response
+
+        mock_requests.get.side_effect = get_side_effect
+
+        with patch.dict(os.environ, {"JULES_API_KEY": "fake_jules_key"}):
+            sessions = boss.get_active_jules_sessions()
+
+        self.assertEqual([session["title"] for session in sessions], ["a", "c"])
+        self.assertEqual(requested_tokens, [None, "t2", "t3"])
+
+
+class FakeDaemonApi:
+    """Serves the issues of a repository and records the queries and comments."""
+
+    def __init__(self, issues):
+        self.issues = self
+        self.issue_list = issues
+        self.recv_hdrs = {}
+        self.queries = []
+        self.comments = []
+
+    def list_for_repo(self, per_page, page, headers=None, **query):
+        self.queries.append(query)
+        items = self.issue_list if page == 1 else []
+        return [MockIssue(item) for item in items]
+
+    def create_comment(self, owner, repo, issue_number, body):
+        self.comments.append(issue_number)
+
+
+class FakeJulesSession:
+    """Creates sessions and reports the state set by the test for each of them."""
+
+    def __init__(self):
+        self.states = {}
+
+    def post(self, url, headers, json, **kwargs):
+        session_id = f"s{len(self.states) + 1}"
+        self.states[session_id] = "IN_PROGRESS"
+        response = MagicMock()
+        response.json.return_value = {"id": session_id}
+        return response
+
+    def get(self, url, headers, **kwargs):
+        response = MagicMock()
+        state = self.states[url.rsplit("/", 1)[-1]]
+        if state == "UNREACHABLE":
+            raise requests.exceptions.ConnectionError("unreachable")
+        # None: the session was deleted
+        response.status_code = 200 if state is not None else 404
+        response.json.return_value = {"state": state}
+        return response
+
+
+def make_ready_issue(number, priority):
+    labels = [MockIssue(name='status: ready'), MockIssue(name=priority)]
+    return {'number': number, 'title': f'Issue {number}', 'body': '', 'state': 'open', 'labels': labels}
+
+
+class TestBossDaemon(unittest.TestCase):
+    @patch.dict(os.environ, {"JULES_API_KEY": "fake_jules_key"})
+    def test_daemon_fills_freed_capacity(self):
+        api = FakeDaemonApi([
+            make_ready_issue(1, 'priority: low'),
+            make_ready_issue(2, 'priority: critical'),
+            make_ready_issue(3, 'priority: high'),
+        ])
+        http = FakeJulesSession()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state = boss.BossState(os.path.join(tmp_dir, "state.json"))
+            daemon = boss.BossDaemon("owner/repo", api, state, http=http, max_sessions=2)
+
+            daemon.run_once()
+            # The two highest priority issues take the two slots.
+            self.assertEqual(api.comments, [2, 3])
+            self.assertEqual(sorted(state.in_flight), ["owner/repo#2", "owner/repo#3"])
+
+            # Nothing finished: no dispatch, and issues are polled incrementally.
+            api.issue_list = []
+            daemon.run_once()
+            self.assertEqual(api.comments, [2, 3])
+            self.assertEqual(api.queries[-1]["since"], state.since)
+            self.assertEqual(api.queries[-1]["state"], "all")
+
+            # A finished session frees a slot for the remaining issue.
+            http.states["s1"] = "COMPLETED"
+            daemon.run_once(poll_issues=False)
+            self.assertEqual(api.comments, [2, 3, 1])
+            self.assertEqual(daemon.metrics.finished, 1)
+            self.assertEqual(daemon.metrics.dispatched, 3)
+
+            # A restarted daemon resumes from the state file.
+            restored = boss.BossState(state.path)
+            self.assertEqual(sorted(restored.in_flight), ["owner/repo#1", "owner/repo#3"])
+            self.assertEqual(restored.since, state.since)
+
+    @patch.dict(os.environ, {"JULES_API_KEY": "fake_jules_key"})
+    def test_daemon_releases_deleted_sessions(self):
+        api = FakeDaemonApi([make_ready_issue(1, 'priority: high'), make_ready_issue(2, 'priority: low')])
+        http = FakeJulesSession()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state = boss.BossState(os.path.join(tmp_dir, "state.json"))
+            daemon = boss.BossDaemon("owner/repo", api, state, http=http, max_sessions=1)
+            daemon.run_once()
+            self.assertEqual(sorted(state.in_flight), ["owner/repo#1"])
+
+            # A transient error keeps the session, a 404 releases its slot
+            http.states["s1"] = "UNREACHABLE"
+            daemon.run_once(poll_issues=False)
+            self.assertEqual(sorted(state.in_flight), ["owner/repo#1"])
+
+            http.states["s1"] = None
+            daemon.run_once(poll_issues=False)
+            self.assertEqual(api.comments, [1, 2])
+            self.assertEqual(sorted(state.in_flight), ["owner/repo#2"])
+            self.assertEqual(sorted(boss.BossState(state.path).in_flight), ["owner/repo#2"])
+
+    def test_daemon_adopts_issue_sessions_only(self):
+        sessions = [
+            {"id": "s1", "title": "owner/repo#7"},
+            {"id": "s2", "title": "owner/repo#refactor"},
+            {"id": "s3", "title": "owner/repo-fork#8"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.object(boss, "get_active_jules_sessions", return_value=sessions):
+            state = boss.BossState(os.path.join(tmp_dir, "state.json"))
+            daemon = boss.BossDaemon("owner/repo", FakeDaemonApi([]), state, http=FakeJulesSession())
+            daemon.adopt_active_sessions()
+            self.assertEqual(list(state.in_flight), ["owner/repo#7"])
+            self.assertEqual(state.in_flight["owner/repo#7"]["issue"], 7)
+
 if __name__ == '__main__':
     unittest.main()
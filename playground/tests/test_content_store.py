@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from playground.tools import tavily_tools
+from playground.tools.content_store import ContentStore, budget_bytes, compact_results, select_snippets
+
+
+def page(topic, paragraphs=20):
+    return "\n\n".join(
+        f"Paragraph {n} about {'apple pruning in winter' if n == 12 else topic}, " + "filler words " * 20
+        for n in range(paragraphs)
+    )
+
+
+class TestSnippets(unittest.TestCase):
+    def test_relevant_passages_are_kept_in_order(self):
+        text = page("gardening")
+        snippets = select_snippets(text, "how to prune apple trees", 700)
+        self.assertLessEqual(len(snippets), 700)
+        self.assertIn("Paragraph 12 about apple pruning", snippets)
+        self.assertLess(snippets.index("Paragraph 0"), snippets.index("Paragraph 12"))
+
+    def test_short_texts_are_unchanged(self):
+        self.assertEqual(select_snippets("short", "query", 100), "short")
+
+    def test_token_budget(self):
+        self.assertEqual(budget_bytes(max_tokens=100), 400)
+        self.assertEqual(budget_bytes(1000, 100), 400)
+        self.assertIsNone(budget_bytes())
+
+
+class TestCompactResults(unittest.TestCase):
+    def setUp(self):
+        self.store = ContentStore(":memory:")
+        self.addCleanup(self.store.close)
+
+    def test_large_contents_are_moved_to_the_store(self):
+        response = {"results": [
+            {"url": "https://a.com", "raw_content": page("apples")},
+            {"url": "https://b.com", "raw_content": "A short page."},
+        ]}
+        compacted = compact_results(response, self.store, "apple pruning", 4000)
+
+        first, second = compacted["results"]
+        self.assertLessEqual(len(first["raw_content"]), 2000)
+        self.assertEqual(first["content_length"], len(response["results"][0]["raw_content"]))
+        self.assertEqual(self.store.get(first["content_id"]),
+                         {"id": first["content_id"], "url": "https://a.com",
+                          "content": response["results"][0]["raw_content"]})
+        self.assertEqual(second, response["results"][1])
+
+    def test_responses_within_budget_are_unchanged(self):
+        response = {"results": [{"url": "https://a.com", "raw_content": "A short page."}]}
+        self.assertIs(compact_results(response, self.store, None, 4000), response)
+
+
+class TestTavilyOutputs(unittest.TestCase):
+    def test_crawl_output_is_compacted_and_readable(self):
+        pages = [{"url": f"https://a.com/{n}", "raw_content": page(f"topic {n}")} for n in range(10)]
+        client = MagicMock()
+        client.crawl.return_value = {"base_url": "https://a.com", "results": pages}
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.dict(os.environ, {"TAVILY_OUTPUT_MAX_TOKENS": "2000"}), \
+                patch.object(tavily_tools, "client", client), \
+                patch.object(tavily_tools, "cache", None), \
+                patch.object(tavily_tools, "_get_cache", lambda: None), \
+                patch.object(tavily_tools, "content_store", ContentStore(os.path.join(tmp_dir, "content.sqlite"))):
+            response = tavily_tools.tavily_crawl.invoke({"url": "https://a.com", "instructions": "apple pruning",
+                                                         "exclude_paths": None, "exclude_domains": None})
+            self.assertLessEqual(sum(len(result["raw_content"]) for result in response["results"]), 8000)
+            self.assertIn("note", response)
+
+            content_id = response["results"][0]["content_id"]
+            read = tavily_tools.tavily_read_content.invoke({"content_id": content_id})
+            self.assertEqual(read["content"], pages[0]["raw_content"][:8000])
+            self.assertIsNone(read["next_offset"])
+
+            read = tavily_tools.tavily_read_content.invoke({"content_id": content_id, "query": "apple pruning"})
+            self.assertIn("apple pruning in winter", read["content"])
+
+            read = tavily_tools.tavily_read_content.invoke({"content_id": "unknown"})
+            self.assertIn("error", read)
+
+
+if __name__ == '__main__':
+    unittest.main()
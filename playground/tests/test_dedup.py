@@ -0,0 +1,107 @@
+import unittest
+
+import numpy as np
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.indexing import InMemoryRecordManager
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from playground.langchain.dedup import BoilerplateFilter, ChunkDeduplicator, MinHasher, NearDuplicateIndex
+from playground.langchain.ingestion import IngestionPipeline
+
+BANNER = "This version is still in development and is not considered stable yet."
+NOTE = "NOTE: Spring Boot applications can be packaged as executable jars with embedded servers."
+
+
+def text(topic, words=80):
+    return " ".join(f"{topic}{index % 37} word{index}" for index in range(words))
+
+
+def page(index):
+    return f"{BANNER}\n\n# Page {index}\n\n{text(f'topic{index}-')}\n\n{NOTE}"
+
+
+class TestNearDuplicates(unittest.TestCase):
+    def test_similarity_estimate(self):
+        hasher = MinHasher(num_perm=256)
+        first, second = text("a", 100), text("a", 100).replace("word50 ", "changed ")
+        shingles = hasher.shingles(first), hasher.shingles(second)
+        jaccard = len(np.intersect1d(*shingles)) / len(np.union1d(*shingles))
+        estimate = hasher.similarity(hasher.signature(first), hasher.signature(second))
+        self.assertAlmostEqual(estimate, jaccard, delta=0.1)
+
+    def test_index(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        self.assertEqual(index.add(text("a", 200)), 0)
+        self.assertEqual(index.add(text("b", 200)), 1)
+        self.assertEqual(index.add(text("a", 200).replace("word100 ", "changed ")), 0)
+        self.assertEqual(len(index), 2)
+
+
+class TestBoilerplateFilter(unittest.TestCase):
+    def test_blocks_repeated_across_sources_are_stripped(self):
+        boilerplate = BoilerplateFilter(min_sources=3)
+        stripped = [boilerplate.strip(page(index), f"page{index}") for index in range(4)]
+        self.assertEqual([count for _, count in stripped], [0, 0, 2, 2])
+        self.assertEqual(stripped[3][0], f"# Page 3\n\n{text('topic3-')}")
+        # Repeated in the same source only, short or a heading: kept
+        self.assertEqual(boilerplate.strip(f"{NOTE}\n\nSee also.\n\n# Page 1", "page0"), (
+            f"{NOTE}\n\nSee also.\n\n# Page 1", 0))
+
+
+class TestChunkDeduplicator(unittest.TestCase):
+    def test_stats_and_references(self):
+        deduplicator = ChunkDeduplicator(min_sources=2)
+        chunks = [
+            Document(page_content=text("a"), metadata={"source": "one"}, id="1"),
+            Document(page_content=text("a").replace("word10 ", "changed "), metadata={"source": "two"}, id="2"),
+            Document(page_content=NOTE, metadata={"source": "one"}, id="3"),
+            Document(page_content=NOTE, metadata={"source": "two"}, id="4"),
+        ]
+        kept = [chunk.id for chunk in chunks if deduplicator.process(chunk) is not None]
+        self.assertEqual(kept, ["1", "3"])
+        self.assertEqual(deduplicator.references, [{"id": "2", "source": "two", "duplicate_of": "1"}])
+        stats = deduplicator.stats
+        self.assertEqual((stats.chunks, stats.duplicates, stats.emptied, stats.boilerplate_blocks), (4, 1, 1, 1))
+        self.assertEqual(stats.output_characters, len(chunks[0].page_content) + len(NOTE))
+        self.assertGreater(stats.saved_fraction, 0.4)
+
+    def test_pipeline(self):
+        vector_store = InMemoryVectorStore(DeterministicFakeEmbedding(size=8))
+        pipeline = IngestionPipeline(vector_store, embeddings=DeterministicFakeEmbedding(size=8),
+                                     splitter=RecursiveCharacterTextSplitter(chunk_size=4000),
+                                     record_manager=InMemoryRecordManager("test"),
+                                     deduplicator=ChunkDeduplicator())
+        documents = [Document(page_content=page(index), metadata={"source": f"page{index}"}) for index in range(5)]
+        # A copy of a page under another name
+        documents.append(Document(page_content=page(0), metadata={"source": "copy"}))
+
+        result = pipeline.run(documents)
+        self.assertEqual(result.dedup.duplicates, 1)
+        self.assertEqual(result.dedup.boilerplate_blocks, 8)
+        texts = [record["text"] for record in vector_store.store.values()]
+        self.assertEqual(sum(BANNER in chunk for chunk in texts), 2)
+        self.assertIn("dedup: 6 chunks", result.summary())
+
+        # Deduplicated the same way on the next run
+        result = pipeline.run(documents)
+        self.assertEqual((result.upserted, result.deleted), (0, 0))
+
+    def test_exact_duplicates_are_not_counted_as_embedded(self):
+        vector_store = InMemoryVectorStore(DeterministicFakeEmbedding(size=8))
+        pipeline = IngestionPipeline(vector_store, embeddings=DeterministicFakeEmbedding(size=8),
+                                     splitter=RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=0),
+                                     deduplicator=ChunkDeduplicator(threshold=None))
+        # The same paragraph twice in a page: two chunks with the same id
+        paragraph = text("a", 30)
+        result = pipeline.run([Document(page_content=f"{paragraph}\n\n{paragraph}", metadata={"source": "one"})])
+
+        self.assertEqual((result.chunks, result.upserted), (1, 1))
+        self.assertEqual(result.dedup.output_characters, len(paragraph))
+        self.assertEqual(result.dedup.saved_characters, len(paragraph))
+
+
+if __name__ == '__main__':
+    unittest.main()
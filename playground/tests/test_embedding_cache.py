@@ -0,0 +1,130 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+import requests
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from playground.langchain.embedding_cache import CachedEmbeddings, VectorCache, is_batch_too_large
+
+
+class RecordingEmbedding(DeterministicFakeEmbedding):
+    """Fake embedder recording its batches, rejecting those larger than `limit`."""
+    batches: list = []
+    limit: int = 1000
+
+    def embed_documents(self, texts):
+        self.batches.append(len(texts))
+        if len(texts) > self.limit:
+            raise RuntimeError("payload too large")
+        return super().embed_documents(texts)
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = tmp_dir.name
+        self.fake = RecordingEmbedding(size=16, batches=[])
+
+    def embeddings(self, **kwargs):
+        return CachedEmbeddings(self.fake, "fake/model", cache_dir=self.cache_dir, **kwargs)
+
+    def test_vectors_are_cached_across_instances(self):
+        texts = [f"text {n}" for n in range(10)]
+        expected = DeterministicFakeEmbedding(size=16).embed_documents(texts)
+
+        first = self.embeddings()
+        vectors = first.embed_documents(texts + texts[:3])
+        np.testing.assert_allclose(vectors, expected + expected[:3], rtol=1e-6)
+        self.assertEqual(self.fake.batches, [10])
+
+        second = self.embeddings()
+        self.assertEqual(second.embed_documents(texts), vectors[:10])
+        self.assertEqual(self.fake.batches, [10])
+        self.assertEqual((second.hits, second.misses), (10, 0))
+
+    def test_queries_and_documents_are_cached_separately(self):
+        embeddings = self.embeddings()
+        embeddings.embed_query("apple")
+        embeddings.embed_query("apple")
+        embeddings.embed_documents(["apple"])
+        self.assertEqual((embeddings.hits, embeddings.misses), (1, 2))
+
+    def test_misses_are_batched_and_adapt_to_failures(self):
+        self.fake.limit = 8
+        embeddings = self.embeddings(max_batch_size=20, max_concurrency=1)
+        vectors = embeddings.embed_documents([f"text {n}" for n in range(40)])
+
+        self.assertEqual(len(vectors), 40)
+        self.assertEqual(self.fake.batches[:4], [20, 10, 5, 5])
+        self.assertLessEqual(embeddings.batch_size, 8)
+
+    def test_other_errors_are_not_retried(self):
+        class FailingEmbedding(RecordingEmbedding):
+            def embed_documents(self, texts):
+                self.batches.append(len(texts))
+                raise RuntimeError("401 Unauthorized: invalid API key")
+
+        fake = FailingEmbedding(size=16, batches=[])
+        embeddings = CachedEmbeddings(fake, "failing", cache_dir=self.cache_dir, max_batch_size=20,
+                                      max_concurrency=1)
+        with self.assertRaisesRegex(RuntimeError, "invalid API key"):
+            embeddings.embed_documents([f"text {n}" for n in range(40)])
+        self.assertEqual((fake.batches, embeddings.batch_size), ([20], 20))
+
+        self.assertTrue(is_batch_too_large(RuntimeError("Request payload size exceeds the limit")))
+        self.assertFalse(is_batch_too_large(RuntimeError("429 Too many requests: quota exceeded")))
+        error = requests.exceptions.HTTPError(response=MagicMock(status_code=413))
+        self.assertTrue(is_batch_too_large(error))
+
+    def test_concurrent_batches(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+        fake = self.fake
+
+        class SlowEmbedding(RecordingEmbedding):
+            def embed_documents(self, texts):
+                with lock:
+                    running.append(1)
+                    peak.append(len(running))
+                threading.Event().wait(0.05)
+                with lock:
+                    running.pop()
+                return fake.embed_documents(texts)
+
+        embeddings = CachedEmbeddings(SlowEmbedding(size=16, batches=[]), "slow", cache_dir=self.cache_dir,
+                                      max_batch_size=5, max_concurrency=3)
+        embeddings.embed_documents([f"text {n}" for n in range(30)])
+        self.assertEqual(max(peak), 3)
+
+    def test_async_embeddings(self):
+        embeddings = self.embeddings(max_batch_size=4)
+        vectors = asyncio.run(embeddings.aembed_documents([f"text {n}" for n in range(10)]))
+        self.assertEqual(len(vectors), 10)
+        self.assertEqual(sorted(self.fake.batches), [2, 4, 4])
+        asyncio.run(embeddings.aembed_documents(["text 1"]))
+        self.assertEqual(embeddings.hits, 1)
+
+
+class TestVectorCache(unittest.TestCase):
+    def test_dimension_is_checked(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = VectorCache(tmp_dir)
+            cache.put_many({"a": [1.0, 2.0]})
+            with self.assertRaises(ValueError):
+                cache.put_many({"b": [1.0, 2.0, 3.0]})
+            cache.close()
+
+            cache = VectorCache(tmp_dir)
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.get_many(["a", "b"])["a"].tolist(), [1.0, 2.0])
+            cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from playground.guide_index import GuideIndex, guide_paths, load_or_build, parse_sections
+from playground.tools import guide_search
+
+SRS_GUIDE = """# **A Guide to Requirements**
+
+Introduction of the guide.
+
+## **1\\. Scope**
+
+Define what the product does and does not do.
+
+### **1.1 Boundaries**
+
+Out-of-scope features are listed explicitly.
+
+## ---
+
+**2\\. Non-Functional Requirements**
+
+Latency, throughput and availability targets.
+"""
+
+HLD_ROADMAP = """Roadmap of the HLD team.
+
+## Personas
+
+The architect reviews the container diagrams.
+"""
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    documents: int = 0
+
+    def embed_documents(self, texts):
+        self.documents += len(texts)
+        return super().embed_documents(texts)
+
+
+class TestGuideIndex(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = os.path.join(directory.name, "data")
+        self.index_path = os.path.join(directory.name, "index")
+        os.makedirs(self.data_dir)
+        self.write("srs-guide.md", SRS_GUIDE)
+        self.write("hld-roadmap.md", HLD_ROADMAP)
+
+    def write(self, name, text):
+        with open(os.path.join(self.data_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_sections_are_keyed_by_heading_path(self):
+        sections = parse_sections(os.path.join(self.data_dir, "srs-guide.md"))
+        self.assertEqual([section.key for section in sections], [
+            "srs-guide",
+            "srs-guide > 1. Scope",
+            "srs-guide > 1. Scope > 1.1 Boundaries",
+            "srs-guide > 2. Non-Functional Requirements",
+        ])
+        self.assertEqual(sections[1].content, "## **1\\. Scope**\n\nDefine what the product does and does not do.")
+        self.assertEqual([section.subtree_end for section in sections], [4, 3, 3, 4])
+
+        sections = parse_sections(os.path.join(self.data_dir, "hld-roadmap.md"))
+        self.assertEqual([section.key for section in sections], ["hld-roadmap", "hld-roadmap > Personas"])
+
+    def test_duplicate_heading_paths_are_numbered(self):
+        self.write("lld-guide.md", "Introduction.\n\n## Usage\n\nFirst.\n\n### Example\n\nOne.\n\n"
+                                   "### Example\n\nTwo.\n\n#### Output\n\nThree.\n")
+        sections = parse_sections(os.path.join(self.data_dir, "lld-guide.md"))
+        self.assertEqual([section.key for section in sections], [
+            "lld-guide",
+            "lld-guide > Usage",
+            "lld-guide > Usage > Example",
+            "lld-guide > Usage > Example (2)",
+            "lld-guide > Usage > Example (2) > Output",
+        ])
+        index = GuideIndex.build([os.path.join(self.data_dir, "lld-guide.md")])
+        self.assertIn("One.", index.get("lld-guide > Usage > Example").content)
+        self.assertIn("Two.", index.get("lld-guide > Usage > Example (2)").content)
+
+    def test_search(self):
+        index = GuideIndex.build(guide_paths(self.data_dir))
+        [(section, _)] = index.search("latency targets", k=1)
+        self.assertEqual(section.key, "srs-guide > 2. Non-Functional Requirements")
+        self.assertEqual([section.key for section, _ in index.search("architect diagrams", guide="srs-guide")], [])
+        self.assertEqual([section.key for section in index.subsections("srs-guide > 1. Scope")],
+                         ["srs-guide > 1. Scope", "srs-guide > 1. Scope > 1.1 Boundaries"])
+
+    def test_saved_index_is_rebuilt_when_a_guide_changes(self):
+        embeddings = CountingEmbedding(size=8)
+        index = load_or_build(self.data_dir, self.index_path, embeddings)
+        self.assertEqual((len(index), embeddings.documents), (6, 6))
+        # Both rankings agree on a section searched by its own text
+        boundaries = index.get("srs-guide > 1. Scope > 1.1 Boundaries")
+        self.assertEqual(index.search(boundaries.indexed_text(), k=1)[0][0].key, boundaries.key)
+
+        loaded = load_or_build(self.data_dir, self.index_path, embeddings)
+        self.assertEqual(embeddings.documents, 6)
+        self.assertEqual([section.key for section in loaded.sections], [section.key for section in index.sections])
+        self.assertEqual(loaded.vectors.tolist(), index.vectors.tolist())
+
+        # Only the changed section is embedded again
+        self.write("hld-roadmap.md", HLD_ROADMAP.replace("container", "component"))
+        rebuilt = load_or_build(self.data_dir, self.index_path, embeddings)
+        self.assertEqual(embeddings.documents, 7)
+        self.assertIn("component", rebuilt.get("hld-roadmap > Personas").content)
+
+    def test_tools(self):
+        index = GuideIndex.build(guide_paths(self.data_dir))
+        with patch.object(guide_search, "index", index):
+            response = guide_search.search_guides.invoke({"query": "scope of the product", "k": 1})
+            self.assertEqual(response["results"][0]["key"], "srs-guide > 1. Scope")
+            self.assertEqual(response["results"][0]["subsections"], 1)
+            self.assertIn("error", guide_search.search_guides.invoke({"query": "scope", "guide": "unknown"}))
+
+            read = guide_search.read_guide_section.invoke({"key": "srs-guide > 1. Scope"})
+            self.assertIn("Out-of-scope features", read["content"])
+            self.assertIsNone(read["next_offset"])
+            self.assertIn("error", guide_search.read_guide_section.invoke({"key": "unknown"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
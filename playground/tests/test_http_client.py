@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import requests
+
+from playground.http_client import AsyncHttpClient, CircuitOpenError, HttpClient
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Answer with the next scripted status and record the client port of each request."""
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        with server.lock:
+            server.requests.append((self.command, self.path, self.client_address[1]))
+            status = server.statuses.pop(0) if server.statuses else 200
+        payload = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.statuses = []
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = HttpClient(retries=2, backoff=0.01, failure_threshold=3, reset_timeout=60)
+        self.addCleanup(self.client.close)
+
+    def test_connections_are_kept_alive(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(f"{self.base}/ping").json(), {"ok": True})
+        ports = {port for _, _, port in self.server.requests}
+        self.assertEqual(len(ports), 1)
+
+    def test_get_is_retried_on_server_errors(self):
+        self.server.statuses = [503, 502]
+        response = self.client.get(f"{self.base}/flaky", endpoint="flaky")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.requests), 3)
+        metrics = self.client.metrics()["flaky"]
+        self.assertEqual((metrics["requests"], metrics["errors"], metrics["retries"]), (3, 2, 2))
+
+    def test_post_is_only_retried_when_allowed(self):
+        self.server.statuses = [500]
+        self.assertEqual(self.client.post(f"{self.base}/create", json={}).status_code, 500)
+        self.assertEqual(len(self.server.requests), 1)
+
+        # A rejected (429) request was not processed and can be sent again.
+        self.server.statuses = [429]
+        self.assertEqual(self.client.post(f"{self.base}/create", json={}).status_code, 200)
+
+        self.server.statuses = [500]
+        self.assertEqual(self.client.post(f"{self.base}/search", json={}, retry=True).status_code, 200)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self.server.statuses = [500] * 3
+        self.assertEqual(self.client.get(f"{self.base}/down").status_code, 500)
+        with self.assertRaises(CircuitOpenError):
+            self.client.get(f"{self.base}/down")
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_unexpected_error_does_not_hold_the_trial_request(self):
+        client = HttpClient(retries=0, failure_threshold=1, reset_timeout=0, session=MagicMock())
+        client.session.request.side_effect = requests.exceptions.ConnectionError()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get(f"{self.base}/down")
+
+        # The trial request of the half-open circuit fails outside of requests
+        client.session.request.side_effect = ValueError("invalid header")
+        with self.assertRaises(ValueError):
+            client.get(f"{self.base}/down")
+
+        client.session.request.side_effect = None
+        client.session.request.return_value.status_code = 200
+        self.assertEqual(client.get(f"{self.base}/down").status_code, 200)
+        self.assertEqual(client._breaker(f"127.0.0.1:{self.server.server_address[1]}").state, "closed")
+
+    def test_metrics_report(self):
+        self.client.get(f"{self.base}/a")
+        self.client.post(f"{self.base}/b", json={}, endpoint="create b")
+        report = self.client.report()
+        self.assertIn("create b: 1 requests", report)
+        self.assertIn(f"GET 127.0.0.1:{self.server.server_address[1]}/a", report)
+
+    def test_async_client_retries(self):
+        self.server.statuses = [503]
+
+        async def run():
+            client = AsyncHttpClient(retries=2, backoff=0.01)
+            try:
+                responses = await asyncio.gather(*(client.get(f"{self.base}/ping", endpoint="ping") for _ in range(5)))
+                return responses, client.metrics()["ping"]
+            finally:
+                await client.aclose()
+
+        responses, metrics = asyncio.run(run())
+        self.assertEqual([response.status_code for response in responses], [200] * 5)
+        self.assertEqual(responses[0].json(), {"ok": True})
+        self.assertEqual((metrics["requests"], metrics["retries"]), (6, 1))
+
+    def test_async_errors_use_requests_exceptions(self):
+        async def run():
+            client = AsyncHttpClient(retries=0)
+            try:
+                response = await client.post(f"{self.base}/create", json={})
+                response.raise_for_status()
+            finally:
+                await client.aclose()
+
+        self.server.statuses = [500]
+        with self.assertRaises(requests.exceptions.HTTPError) as context:
+            asyncio.run(run())
+        self.assertEqual(context.exception.response.status_code, 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
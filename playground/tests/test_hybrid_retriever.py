@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from playground.langchain.hybrid_retriever import (BM25Index, LocalHybridRetriever, VectorIndex,
+                                                   reciprocal_rank_fusion)
+
+DOCS = [
+    Document(page_content="LangChain provides abstractions to make working with LLMs easy.",
+             metadata={"source": "documentation"}),
+    Document(page_content="Elasticsearch is a distributed, RESTful search and analytics engine.",
+             metadata={"source": "documentation"}),
+    Document(page_content="Hybrid search combines vector and keyword search for better results.",
+             metadata={"source": "concept"}),
+]
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    queries: int = 0
+
+    def embed_query(self, text):
+        self.queries += 1
+        return super().embed_query(text)
+
+
+class TestIndexes(unittest.TestCase):
+    def test_bm25_ranks_rare_terms_higher(self):
+        index = BM25Index()
+        index.add([document.page_content for document in DOCS])
+        self.assertEqual([doc_id for doc_id, _ in index.search("hybrid search", 3)], [2, 1])
+        self.assertEqual(index.search("unknown words", 3), [])
+
+    def test_exact_and_ivf_vector_search(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(20, 32))
+        vectors = np.repeat(centers, 50, axis=0) + rng.normal(scale=0.1, size=(1000, 32))
+        index = VectorIndex(nprobe=3)
+        index.add(vectors)
+
+        exact = index.search(vectors[123], 10)
+        self.assertEqual(exact[0][0], 123)
+        self.assertAlmostEqual(exact[0][1], 1.0, places=5)
+
+        index.train(nlist=20)
+        approximate = index.search(vectors[123], 10)
+        self.assertEqual({doc_id for doc_id, _ in approximate}, {doc_id for doc_id, _ in exact})
+
+        # Vectors added after training are assigned to their closest list
+        index.add([vectors[123] * 2])
+        self.assertIn(1000, [doc_id for doc_id, _ in index.search(vectors[123], 2)])
+
+    def test_ivf_search_skips_empty_lists(self):
+        # The duplicated vector leaves one of the three lists empty, its centroid tied with a full one
+        index = VectorIndex(nprobe=1)
+        index.add([[1, 0], [1, 0], [0, 1]])
+        index.train(nlist=3)
+        self.assertEqual([len(ids) for ids in index._lists].count(0), 1)
+        self.assertEqual({doc_id for doc_id, _ in index.search([1, 0.1], 3)}, {0, 1})
+
+        index.nprobe = 0
+        self.assertEqual(len(index.search([1, 0.1], 3)), 2)
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], rank_constant=60)
+        self.assertEqual([doc_id for doc_id, _ in fused], [1, 3, 2])
+        self.assertAlmostEqual(fused[0][1], 1 / 61 + 1 / 62)
+
+
+class TestLocalHybridRetriever(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = CountingEmbedding(size=16)
+        self.retriever = LocalHybridRetriever.from_documents(DOCS, self.embeddings, k=2)
+
+    def test_exact_matches_come_first(self):
+        # The fake embedding of a text is the one of its document
+        results = self.retriever.invoke(DOCS[1].page_content)
+        self.assertEqual(results[0].page_content, DOCS[1].page_content)
+        self.assertEqual(len(results), 2)
+        self.assertIn("rrf_score", results[0].metadata)
+        self.assertNotIn("rrf_score", DOCS[1].metadata)
+
+    def test_query_embeddings_are_cached(self):
+        self.retriever.invoke("hybrid search")
+        self.retriever.invoke("hybrid search")
+        asyncio.run(self.retriever.ainvoke("hybrid search"))
+        self.assertEqual(self.embeddings.queries, 1)
+
+    def test_async_retrieval(self):
+        results = asyncio.run(self.retriever.ainvoke("hybrid search"))
+        self.assertEqual(results, self.retriever.invoke("hybrid search"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.indexing import InMemoryRecordManager
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_text_splitters import CharacterTextSplitter
+
+from playground.langchain.ingestion import IngestionPipeline, upsert_vectors
+
+
+def corpus(count, version="v1"):
+    for n in range(count):
+        yield Document(page_content=f"Document {n} {version}.\n\nSecond paragraph of document {n}.",
+                       metadata={"source": f"doc-{n}.md"})
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return super().embed_documents(texts)
+
+
+class TestIngestionPipeline(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = CountingEmbedding(size=8)
+        self.store = InMemoryVectorStore(self.embeddings)
+        self.record_manager = InMemoryRecordManager("test")
+        self.record_manager.create_schema()
+
+    def pipeline(self, **kwargs):
+        return IngestionPipeline(
+            self.store, self.embeddings, splitter=CharacterTextSplitter(separator="\n\n", chunk_size=40,
+                                                                        chunk_overlap=0),
+            record_manager=self.record_manager, **kwargs
+        )
+
+    def test_documents_are_split_embedded_and_upserted(self):
+        result = self.pipeline(embed_batch_size=8, embed_workers=2).run(corpus(20))
+
+        self.assertEqual((result.documents, result.chunks, result.upserted), (20, 40, 40))
+        self.assertEqual(len(self.store.store), 40)
+        self.assertEqual(self.embeddings.calls, 5)
+        hits = self.store.similarity_search("Document 3 v1.", k=1)
+        self.assertEqual(hits[0].metadata["source"], "doc-3.md")
+
+    def test_unchanged_chunks_are_skipped_and_stale_ones_deleted(self):
+        self.pipeline().run(corpus(10))
+        calls = self.embeddings.calls
+
+        result = self.pipeline().run(corpus(10))
+        self.assertEqual((result.upserted, result.skipped, result.deleted), (0, 20, 0))
+        self.assertEqual(self.embeddings.calls, calls)
+
+        # The first paragraph of every document changed
+        result = self.pipeline().run(corpus(10, version="v2"))
+        self.assertEqual((result.upserted, result.skipped, result.deleted), (10, 10, 10))
+        self.assertEqual(len(self.store.store), 20)
+
+    def test_backpressure_bounds_the_documents_in_flight(self):
+        release = threading.Event()
+        loaded = []
+
+        class BlockedEmbedding(CountingEmbedding):
+            def embed_documents(self, texts):
+                release.wait(5)
+                return super().embed_documents(texts)
+
+        def documents():
+            for document in corpus(100):
+                loaded.append(document)
+                yield document
+
+        pipeline = IngestionPipeline(InMemoryVectorStore(self.embeddings), BlockedEmbedding(size=8),
+                                     embed_batch_size=1, queue_size=2)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(pipeline.run(documents())))
+        thread.start()
+        time.sleep(0.3)
+
+        # While embedding is blocked, only the documents held by the queues and stages are loaded.
+        self.assertLessEqual(len(loaded), 10)
+        release.set()
+        thread.join(5)
+        self.assertEqual(results[0].upserted, 100)
+        self.assertGreater(results[0].stages["load"].blocked_seconds, 0.2)
+
+    def test_stage_errors_are_raised(self):
+        class FailingEmbedding(DeterministicFakeEmbedding):
+            def embed_documents(self, texts):
+                raise RuntimeError("quota exceeded")
+
+        pipeline = IngestionPipeline(InMemoryVectorStore(self.embeddings), FailingEmbedding(size=8))
+        with self.assertRaisesRegex(RuntimeError, "quota exceeded"):
+            pipeline.run(corpus(1000))
+
+    def test_stores_embedding_themselves(self):
+        result = IngestionPipeline(self.store).run(corpus(5))
+        self.assertEqual(result.upserted, 5)
+        self.assertEqual(len(self.store.store), 5)
+
+
+class TestUpsertVectors(unittest.TestCase):
+    def test_in_memory_store(self):
+        embeddings = CountingEmbedding(size=8)
+        store = InMemoryVectorStore(embeddings)
+        documents = [Document(page_content=f"Chunk {n}", metadata={"source": "doc.md"}) for n in range(3)]
+        vectors = DeterministicFakeEmbedding(size=8).embed_documents([f"vector {n}" for n in range(3)])
+        upsert_vectors(store, documents, vectors, ids=["a", "b", "c"])
+
+        self.assertEqual(embeddings.calls, 0)
+        self.assertIs(store.embedding, embeddings)
+        self.assertEqual([document.page_content for document in store.get_by_ids(["b"])], ["Chunk 1"])
+        [hit] = store.similarity_search_by_vector(vectors[2], k=1)
+        self.assertEqual((hit.id, hit.metadata), ("c", {"source": "doc.md"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from langchain_core.documents import Document
+
+from playground.langchain.markdown_chunker import MarkdownHeadingChunker
+
+GUIDE = """Intro before any heading.
+
+# Guide
+
+Guide overview.
+
+## Install
+
+Install steps.
+
+## Configure
+
+""" + "Configuration details. " * 40 + """
+
+### Properties
+
+Property list.
+
+### Profiles
+
+Profile list.
+
+```bash
+# not a heading
+run --profile dev
+```
+
+# Reference
+
+Reference text.
+"""
+
+
+class TestMarkdownHeadingChunker(unittest.TestCase):
+    def test_small_documents_are_a_single_chunk(self):
+        chunker = MarkdownHeadingChunker(chunk_size=len(GUIDE))
+        self.assertEqual(chunker.split_text(GUIDE), [GUIDE.strip()])
+
+    def test_chunks_follow_headings(self):
+        chunker = MarkdownHeadingChunker(chunk_size=400)
+        chunks = chunker.chunks(GUIDE)
+
+        self.assertEqual([path for _, path in chunks], [
+            [],
+            ["Guide"],
+            ["Guide", "Configure"],
+            ["Guide", "Configure"],
+            ["Guide", "Configure"],
+            ["Guide", "Configure"],
+            ["Guide", "Configure"],
+            ["Reference"],
+        ])
+        texts = [text for text, _ in chunks]
+        self.assertEqual(texts[0], "Intro before any heading.")
+        # A section body is packed with its small subsections
+        self.assertEqual(texts[1], "# Guide\n\nGuide overview.\n\n## Install\n\nInstall steps.")
+        # The comment of the code block is not a heading
+        self.assertTrue(texts[6].startswith("### Properties") and texts[6].endswith("```"))
+        self.assertTrue(all(len(text) <= 400 for text in texts))
+        # Nothing is duplicated or lost
+        self.assertEqual("".join("".join(texts).split()), "".join(GUIDE.split()))
+
+    def test_documents_carry_the_heading_path(self):
+        chunker = MarkdownHeadingChunker(chunk_size=400, include_headings=True, add_start_index=True)
+        documents = chunker.split_documents([Document(page_content=GUIDE, metadata={"source": "guide.md"})])
+
+        configure = documents[3]
+        self.assertEqual(configure.metadata["headings"], ["Guide", "Configure"])
+        self.assertEqual(configure.metadata["section"], "Guide > Configure")
+        self.assertEqual(configure.metadata["source"], "guide.md")
+        self.assertTrue(configure.page_content.startswith("Guide > Configure\n\nConfiguration details."))
+        self.assertEqual(configure.metadata["start_index"], GUIDE.index("Configuration details."))
+
+
+if __name__ == '__main__':
+    unittest.main()
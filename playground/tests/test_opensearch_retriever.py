@@ -0,0 +1,161 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.embeddings import Embeddings
+
+from playground.http_client import AsyncHttpClient, HttpClient
+from playground.langchain.opensearch_retriever import OpenSearchRRFRetriever
+
+DOCS = {
+    "1": ("LangChain provides abstractions to make working with LLMs easy.", [1.0, 0.0, 0.0]),
+    "2": ("Elasticsearch is a distributed, RESTful search and analytics engine.", [0.0, 1.0, 0.0]),
+    "3": ("Hybrid search combines vector and keyword search for better results.", [0.0, 0.7, 0.7]),
+}
+
+
+def _hits(body):
+    """Evaluate the match and knn queries of the retriever against DOCS."""
+    query = body["query"]
+    if "match" in query:
+        words = set(query["match"]["text"]["query"].lower().split())
+        scores = {doc_id: len(words & set(text.lower().split())) for doc_id, (text, _) in DOCS.items()}
+    elif "knn" in query:
+        vector = query["knn"]["vector_field"]["vector"]
+        scores = {doc_id: sum(a * b for a, b in zip(vector, doc_vector)) for doc_id, (_, doc_vector) in DOCS.items()}
+    else:  # A hybrid query, as fused by a pipeline
+        scores = {doc_id: 1 / int(doc_id) for doc_id in DOCS}
+    ranked = sorted((doc_id for doc_id in scores if scores[doc_id] > 0), key=lambda doc_id: -scores[doc_id])
+    return {"hits": {"hits": [
+        {"_id": doc_id, "_score": scores[doc_id],
+         "_source": {"text": DOCS[doc_id][0], "metadata": {"source": "test"}}}
+        for doc_id in ranked[:body["size"]]
+    ]}}
+
+
+class _OpenSearchHandler(BaseHTTPRequestHandler):
+    """Answer `_search` and `_msearch` requests and record them with their arrival time."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        content = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        if url.path.endswith("/_msearch"):
+            bodies = [json.loads(line) for line in content.splitlines()[1::2]]
+            payload = {"responses": [_hits(body) for body in bodies]}
+        else:
+            bodies = [json.loads(content)]
+            payload = _hits(bodies[0])
+        with self.server.lock:
+            self.server.requests.append((time.monotonic(), url.path, parse_qs(url.query), bodies))
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowEmbeddings(Embeddings):
+    """Embeds queries of DOCS texts as their vector, after a delay."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.finished = []
+
+    def _vector(self, text):
+        return next((vector for doc_text, vector in DOCS.values() if doc_text == text), [0.0, 0.0, 1.0])
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        time.sleep(self.delay)
+        self.finished.append(time.monotonic())
+        return self._vector(text)
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.delay)
+        self.finished.append(time.monotonic())
+        return self._vector(text)
+
+
+class TestOpenSearchRRFRetriever(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenSearchHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.http = HttpClient(retries=0)
+        self.addCleanup(self.http.close)
+        self.embeddings = SlowEmbeddings()
+
+    def retriever(self, **kwargs):
+        return OpenSearchRRFRetriever(
+            embeddings=self.embeddings, opensearch_url=f"http://127.0.0.1:{self.server.server_address[1]}",
+            index_name="my-index", http=self.http, k=2, **kwargs,
+        )
+
+    def assert_keyword_leg_overlaps_embedding(self):
+        keyword = next(arrived for arrived, _, _, bodies in self.server.requests if "match" in bodies[0]["query"])
+        self.assertLess(keyword, min(self.embeddings.finished))
+
+    def test_legs_are_fused(self):
+        results = self.retriever().invoke(DOCS["3"][0])
+        self.assertEqual([document.id for document in results], ["3", "2"])
+        self.assertAlmostEqual(results[0].metadata["rrf_score"], 2 / 61)
+        self.assertEqual(results[0].metadata["source"], "test")
+        self.assertEqual(len(self.server.requests), 2)
+        self.assert_keyword_leg_overlaps_embedding()
+
+    def test_async_retrieval(self):
+        async def retrieve():
+            http = AsyncHttpClient(retries=0)
+            try:
+                return await self.retriever(async_http=http).ainvoke(DOCS["3"][0])
+            finally:
+                await http.aclose()
+
+        results = asyncio.run(retrieve())
+        self.assertEqual([document.id for document in results], ["3", "2"])
+        self.assert_keyword_leg_overlaps_embedding()
+
+    def test_many_queries_share_requests(self):
+        queries = [DOCS["1"][0], DOCS["2"][0], "hybrid search"]
+        results = self.retriever().retrieve_many(queries)
+        self.assertEqual([[document.id for document in documents] for documents in results],
+                         [["1"], ["2", "3"], ["3", "2"]])
+        self.assertEqual([path for _, path, _, _ in self.server.requests], ["/my-index/_msearch"] * 2)
+        self.assert_keyword_leg_overlaps_embedding()
+
+        async def aretrieve():
+            http = AsyncHttpClient(retries=0)
+            try:
+                return await self.retriever(async_http=http).aretrieve_many(queries)
+            finally:
+                await http.aclose()
+
+        self.assertEqual(asyncio.run(aretrieve()), results)
+
+    def test_pipeline_runs_a_single_hybrid_query(self):
+        results = self.retriever(pipeline_id="my-rrf-pipeline").invoke("What is LangChain?")
+        self.assertEqual([document.id for document in results], ["1", "2"])
+        self.assertEqual(results[0].metadata["rrf_score"], 1.0)
+        [(_, path, params, bodies)] = self.server.requests
+        self.assertEqual(path, "/my-index/_search")
+        self.assertEqual(params, {"search_pipeline": ["my-rrf-pipeline"]})
+        self.assertEqual(len(bodies[0]["query"]["hybrid"]["queries"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from playground.langchain.ingestion import IngestionPipeline
+from playground.langchain.quantized_vector_store import QuantizedVectorIndex, QuantizedVectorStore
+
+TEXTS = ["LangChain provides abstractions for LLMs.", "Elasticsearch is a search engine.",
+         "Hybrid search combines vector and keyword search.", "Qdrant is a vector database."]
+
+
+class TestQuantizedVectorIndex(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+
+    def test_search_matches_exact_search(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(2000, 64)).astype(np.float32)
+        index = QuantizedVectorIndex(self.path)
+        index.add(vectors[:1000])
+        index.add(vectors[1000:])
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        for query in rng.normal(size=(20, 64)):
+            exact = normalized @ (query / np.linalg.norm(query))
+            results = index.search(query, 10)
+            self.assertEqual([position for position, _ in results], list(np.argsort(-exact)[:10]))
+            np.testing.assert_allclose([score for _, score in results], np.sort(exact)[::-1][:10], rtol=1e-5)
+        # A quarter of the size of the vectors, plus a scale per vector
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "codes.int8")), vectors.size)
+
+    def test_remove_compact_and_reopen(self):
+        vectors = np.eye(4, dtype=np.float32)
+        index = QuantizedVectorIndex(self.path)
+        index.add(vectors)
+        index.remove([1, 2])
+        self.assertEqual([position for position, _ in index.search([1, 1, 1, 1], 4)], [0, 3])
+        self.assertEqual(index.compact(), [0, -1, -1, 1])
+        self.assertEqual(index.search([0, 0, 0, 1], 1), [(1, 1.0)])
+
+        reopened = QuantizedVectorIndex(self.path)
+        self.assertEqual((len(reopened), reopened.dim), (2, 4))
+        np.testing.assert_array_equal(reopened.vectors([0, 1]), vectors[[0, 3]])
+
+    def test_interrupted_append_is_truncated(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(10, 768)).astype(np.float32)
+        QuantizedVectorIndex(self.path).add(vectors)
+        # An append interrupted after writing part of the codes of a vector
+        with open(os.path.join(self.path, "codes.int8"), "ab") as f:
+            f.write(b"\x01" * 8)
+
+        index = QuantizedVectorIndex(self.path)
+        self.assertEqual((len(index), index.dim), (10, 768))
+        query = rng.normal(size=768)
+        self.assertEqual(index.add([query]), [10])
+        [(position, score)] = index.search(query, 1)
+        self.assertEqual(position, 10)
+        self.assertGreater(index.approximate_scores(query / np.linalg.norm(query))[10], 0.99)
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "codes.int8")), 11 * 768)
+        with self.assertRaises(ValueError):
+            QuantizedVectorIndex(self.path, dim=64)
+
+
+class TestQuantizedVectorStore(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+
+    def open(self):
+        store = QuantizedVectorStore(self.embeddings, path=self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_search_replace_and_delete(self):
+        store = self.open()
+        ids = store.add_texts(TEXTS, [{"topic": index} for index in range(4)], ids=["a", "b", "c", "d"])
+        self.assertEqual(ids, ["a", "b", "c", "d"])
+        [(document, score)] = store.similarity_search_with_score(TEXTS[2], k=1)
+        self.assertEqual((document.id, document.page_content, document.metadata), ("c", TEXTS[2], {"topic": 2}))
+        self.assertAlmostEqual(score, 1.0, places=5)
+
+        store.add_texts(["Qdrant stores vectors."], ids=["d"])
+        store.delete(["a"])
+        self.assertEqual(len(store), 3)
+        self.assertEqual([document.page_content for document in store.get_by_ids(["d", "a"])],
+                         ["Qdrant stores vectors."])
+        self.assertNotIn("a", [document.id for document in store.similarity_search(TEXTS[0], k=4)])
+
+        # Persisted, and compacted without the deleted and replaced vectors
+        store.close()
+        store = self.open()
+        self.assertEqual((len(store), len(store.index)), (3, 5))
+        store.compact()
+        self.assertEqual(len(store.index), 3)
+        self.assertEqual(store.similarity_search("Qdrant stores vectors.", k=1)[0].id, "d")
+        self.assertEqual(store.similarity_search(TEXTS[1], k=1)[0].id, "b")
+
+    def test_filter_and_mmr(self):
+        store = self.open()
+        store.add_texts(TEXTS + [TEXTS[0]], [{"topic": index} for index in range(5)])
+        results = store.similarity_search(TEXTS[0], k=2, filter=lambda document: document.metadata["topic"] > 2)
+        self.assertEqual([document.metadata["topic"] for document in results], [4, 3])
+        # The copy of the first text is not selected twice
+        results = store.max_marginal_relevance_search(TEXTS[0], k=2, fetch_k=5, lambda_mult=0.2)
+        self.assertEqual([document.page_content for document in results].count(TEXTS[0]), 1)
+
+    def test_ingestion_pipeline(self):
+        store = QuantizedVectorStore(self.embeddings)
+        self.addCleanup(store.close)
+        pipeline = IngestionPipeline(store, embeddings=self.embeddings)
+        result = pipeline.run([Document(page_content=text, metadata={"source": "docs"}) for text in TEXTS])
+        self.assertEqual(result.upserted, 4)
+        self.assertEqual(store.similarity_search(TEXTS[3], k=1)[0].page_content, TEXTS[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
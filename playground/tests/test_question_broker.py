@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from playground.tools.ask_user import ask_user
+from playground.tools.question_broker import FileFrontend, QuestionBroker, QuestionFrontend
+
+
+class ScriptedFrontend(QuestionFrontend):
+    """Answers each question with its upper-cased text once `release` is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def answer(self, questions):
+        self.batches.append([question.text for question in questions])
+        self.release.wait(5)
+        return {question.id: question.text.upper() for question in questions}
+
+
+class TestQuestionBroker(unittest.TestCase):
+    def test_concurrent_questions_are_batched_and_deduplicated(self):
+        frontend = ScriptedFrontend()
+        broker = QuestionBroker(frontend, batch_window=0.2)
+        first = broker.ask("Which soil?", "planting", asker="a")
+        second = broker.ask("which  soil", "watering", asker="b")
+        third = broker.ask("Which variety?", "buying")
+
+        self.assertIs(first, second)
+        self.assertEqual(third.result(5), "WHICH VARIETY?")
+        self.assertEqual(first.result(5), "WHICH SOIL?")
+        self.assertEqual(frontend.batches, [["Which soil?", "Which variety?"]])
+
+    def test_askers_only_wait_for_their_own_answer(self):
+        frontend = ScriptedFrontend()
+        frontend.release.clear()
+        broker = QuestionBroker(frontend, batch_window=0)
+        future = broker.ask("Which soil?", "planting")
+
+        # Another agent keeps working while the question is pending.
+        started = time.monotonic()
+        self.assertFalse(future.done())
+        self.assertLess(time.monotonic() - started, 0.1)
+
+        # Questions asked meanwhile go with the next batch.
+        while not frontend.batches:
+            time.sleep(0.01)
+        later = broker.ask("Which variety?", "buying")
+        frontend.release.set()
+        self.assertEqual(later.result(5), "WHICH VARIETY?")
+        self.assertEqual(frontend.batches, [["Which soil?"], ["Which variety?"]])
+
+    def test_ask_user_tool(self):
+        broker = QuestionBroker(ScriptedFrontend(), batch_window=0)
+        config = {"configurable": {"question_broker": broker}}
+        self.assertEqual(ask_user.invoke({"question": "sync?", "justification": "j"}, config), "SYNC?")
+        self.assertEqual(asyncio.run(ask_user.ainvoke({"question": "async?", "justification": "j"}, config)),
+                         "ASYNC?")
+
+        with self.assertRaises(ValueError):
+            ask_user.invoke({"question": "q", "justification": "j"}, {"configurable": {}})
+
+    def test_frontends_must_implement_answer(self):
+        class IncompleteFrontend(QuestionFrontend):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteFrontend()
+
+
+class TestFileFrontend(unittest.TestCase):
+    def test_answers_are_read_from_a_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            frontend = FileFrontend(tmp_dir, poll_interval=0.01)
+            broker = QuestionBroker(frontend, batch_window=0.2)
+            soil = broker.ask("Which soil?", "planting")
+            variety = broker.ask("Which variety?", "buying")
+
+            def wait_for_questions(count):
+                while True:
+                    try:
+                        with open(frontend.questions_path) as f:
+                            questions = json.load(f)
+                    except (FileNotFoundError, json.JSONDecodeError):
+                        questions = []
+                    if len(questions) == count:
+                        return questions
+                    time.sleep(0.01)
+
+            questions = wait_for_questions(2)
+            ids = {question["question"]: question["id"] for question in questions}
+            with open(frontend.answers_path, "w") as f:
+                json.dump({ids["Which soil?"]: "loam"}, f)
+            self.assertEqual(soil.result(5), "loam")
+            self.assertFalse(variety.done())
+
+            self.assertEqual(wait_for_questions(1)[0]["question"], "Which variety?")
+            with open(frontend.answers_path, "w") as f:
+                json.dump({ids["Which variety?"]: "Gala"}, f)
+            self.assertEqual(variety.result(5), "Gala")
+            while os.path.exists(frontend.questions_path):
+                time.sleep(0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from playground.langchain.ingestion import IngestionPipeline
+from playground.langchain.record_manager import SQLiteRecordManager
+
+
+class TestSQLiteRecordManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "records.sqlite")
+        self.manager = self.open()
+
+    def open(self, namespace="test"):
+        manager = SQLiteRecordManager(namespace, path=self.path)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_records(self):
+        self.manager.update(["a", "b"], group_ids=["doc1", "doc2"])
+        middle = self.manager.get_time()
+        time.sleep(0.01)
+        self.manager.update(["c"], group_ids=["doc1"])
+
+        self.assertEqual(self.manager.exists(["a", "x", "c"]), [True, False, True])
+        self.assertEqual(sorted(self.manager.list_keys(group_ids=["doc1"])), ["a", "c"])
+        self.assertEqual(self.manager.list_keys(group_ids=["doc1"], before=middle), ["a"])
+        self.assertEqual(self.manager.list_keys(after=middle), ["c"])
+        self.assertEqual(len(self.manager.list_keys(limit=2)), 2)
+
+        self.manager.delete_keys(["a", "x"])
+        self.assertEqual(self.manager.exists(["a", "b"]), [False, True])
+        with self.assertRaises(ValueError):
+            self.manager.update(["d"], group_ids=[])
+        with self.assertRaises(ValueError):
+            self.manager.update(["d"], time_at_least=self.manager.get_time() + 60)
+
+    def test_records_persist_per_namespace(self):
+        self.manager.update(["a"], group_ids=["doc1"])
+        self.assertEqual(self.open().exists(["a"]), [True])
+        self.assertEqual(self.open("other").exists(["a"]), [False])
+
+    def test_new_keys_are_not_looked_up(self):
+        self.manager.update(["a"])
+        statements = []
+        self.manager._conn.set_trace_callback(statements.append)
+        self.assertEqual(self.manager.exists(["x", "y"]), [False, False])
+        self.assertEqual(statements, [])
+        self.assertEqual(self.manager.exists(["a", "x"]), [True, False])
+        self.assertEqual(len(statements), 1)
+
+    def test_async_methods(self):
+        async def run():
+            await self.manager.aupdate(["a"], group_ids=["doc1"])
+            return await self.manager.aexists(["a", "b"]), await self.manager.alist_keys(group_ids=["doc1"])
+
+        self.assertEqual(asyncio.run(run()), ([True, False], ["a"]))
+
+    def test_incremental_ingestion(self):
+        vector_store = InMemoryVectorStore(DeterministicFakeEmbedding(size=8))
+        pipeline = IngestionPipeline(vector_store, embeddings=DeterministicFakeEmbedding(size=8),
+                                     record_manager=self.manager)
+        documents = [Document(page_content=f"Document {index}.", metadata={"source": f"doc{index}"})
+                     for index in range(3)]
+        self.assertEqual(pipeline.run(documents).upserted, 3)
+
+        documents[0].page_content = "Document 0, edited."
+        result = pipeline.run(documents)
+        self.assertEqual((result.upserted, result.skipped, result.deleted), (1, 2, 1))
+        self.assertEqual(len(vector_store.store), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
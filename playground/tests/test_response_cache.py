@@ -0,0 +1,184 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from playground.tools import tavily_tools
+from playground.tools.extract_batcher import ExtractBatcher
+from playground.tools.response_cache import ResponseCache, make_key, normalize_url
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "cache", "responses.sqlite")
+
+    def test_persistence_and_ttl(self):
+        cache = ResponseCache(self.path, ttl=60)
+        cache.set("a", {"results": [1, 2]})
+        cache.close()
+
+        cache = ResponseCache(self.path, ttl=60)
+        self.assertEqual(cache.get("a"), {"results": [1, 2]})
+        cache.ttl = 0
+        self.assertIsNone(cache.get("a"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache(self.path, max_bytes=25)
+        cache.set("a", "x" * 8)
+        time.sleep(0.01)
+        cache.set("b", "y" * 8)
+        time.sleep(0.01)
+        cache.get("a")
+        cache.set("c", "z" * 8)
+
+        self.assertEqual(cache.get("a"), "x" * 8)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "z" * 8)
+
+    def test_concurrent_calls_are_coalesced(self):
+        cache = ResponseCache(self.path)
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"answer": 42}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while cache.coalesced + cache.misses < 5:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"answer": 42}] * 5)
+        self.assertEqual(cache.get_or_compute("k", compute), {"answer": 42})
+        self.assertEqual(len(calls), 1)
+
+    def test_errors_are_not_cached(self):
+        cache = ResponseCache(self.path)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("k", fail)
+        self.assertEqual(cache.get_or_compute("k", lambda: "ok"), "ok")
+
+    def test_key_normalization(self):
+        self.assertEqual(normalize_url("HTTPS://Example.com#top"), "https://example.com/")
+        self.assertEqual(normalize_url("https://example.com:443/a?utm_source=x&id=1&fbclid=y"),
+                         "https://example.com/a?id=1")
+        self.assertEqual(make_key("search", {"query": "q", "topic": None}), make_key("search", {"query": "q"}))
+        self.assertNotEqual(make_key("search", {"query": "q"}), make_key("extract", {"query": "q"}))
+
+
+class TestTavilyCache(unittest.TestCase):
+    def test_identical_searches_share_a_request(self):
+        client = MagicMock()
+        client.search.return_value = {"results": [{"url": "https://example.com"}]}
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.object(tavily_tools, "client", client), \
+                patch.object(tavily_tools, "cache", ResponseCache(os.path.join(tmp_dir, "tavily.sqlite"))):
+            first = tavily_tools.tavily_search.invoke({"query": "Apple  trees"})
+            second = tavily_tools.tavily_search.invoke({"query": "apple trees "})
+            tavily_tools.tavily_search.invoke({"query": "apple trees", "topic": "news"})
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.search.call_count, 2)
+
+    def test_concurrent_async_searches_share_a_request(self):
+        async def search(query, **kwargs):
+            await asyncio.sleep(0.05)
+            return {"results": [{"url": "https://example.com"}]}
+
+        client = MagicMock()
+        client.asearch = AsyncMock(side_effect=search)
+
+        async def run():
+            return await asyncio.gather(*(tavily_tools.tavily_search.ainvoke({"query": "apple trees"})
+                                          for _ in range(5)))
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.object(tavily_tools, "client", client), \
+                patch.object(tavily_tools, "cache", ResponseCache(os.path.join(tmp_dir, "tavily.sqlite"))):
+            results = asyncio.run(run())
+
+        self.assertEqual(len(results), 5)
+        client.asearch.assert_awaited_once()
+        client.search.assert_not_called()
+
+
+class TestExtractBatcher(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache = ResponseCache(os.path.join(tmp_dir.name, "tavily.sqlite"))
+
+    def extract(self, urls, extract_depth="basic"):
+        with self.lock:
+            self.calls.append(list(urls))
+        return {
+            "results": [{"url": url, "raw_content": f"content of {url}"} for url in urls if "broken" not in url],
+            "failed_results": [{"url": url, "error": "Failed"} for url in urls if "broken" in url],
+        }
+
+    def test_dedup_cache_and_caller_order(self):
+        batcher = ExtractBatcher(self.extract, self.cache)
+        response = batcher.extract(["https://a.com/1", "https://A.com/1#intro", "https://a.com/broken"])
+        self.assertEqual([result["url"] for result in response["results"]], ["https://a.com/1"])
+        self.assertEqual(response["failed_results"], [{"url": "https://a.com/broken", "error": "Failed"}])
+
+        response = batcher.extract(["https://a.com/2", "https://a.com/1", "https://a.com/broken"])
+        self.assertEqual([result["url"] for result in response["results"]], ["https://a.com/2", "https://a.com/1"])
+        # The cached page is not requested again, the failed one is.
+        self.assertEqual(self.calls, [["https://a.com/1", "https://a.com/broken"],
+                                      ["https://a.com/2", "https://a.com/broken"]])
+
+    def test_misses_are_sent_in_full_batches(self):
+        batcher = ExtractBatcher(self.extract, self.cache, batch_size=20)
+        urls = [f"https://a.com/{n}" for n in range(45)]
+        response = batcher.extract(urls)
+
+        self.assertEqual(sorted(len(batch) for batch in self.calls), [5, 20, 20])
+        self.assertEqual([result["url"] for result in response["results"]], urls)
+
+    def test_async_extract(self):
+        async def aextract(urls, **kwargs):
+            await asyncio.sleep(0.01)
+            return self.extract(urls, **kwargs)
+
+        batcher = ExtractBatcher(self.extract, self.cache, batch_size=2, aextract=aextract)
+        urls = ["https://a.com/1", "https://a.com/2", "https://a.com/3"]
+        response = asyncio.run(batcher.aextract(urls))
+
+        self.assertEqual([result["url"] for result in response["results"]], urls)
+        self.assertEqual(sorted(len(batch) for batch in self.calls), [1, 2])
+        # Served from the cache by the sync path.
+        self.assertEqual(batcher.extract(urls), response)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_batch_errors_are_reported_per_url(self):
+        def fail(urls, **kwargs):
+            raise RuntimeError("quota exceeded")
+
+        response = ExtractBatcher(fail, self.cache).extract(["https://a.com/1"])
+        self.assertEqual(response, {"results": [], "failed_results": [{"url": "https://a.com/1",
+                                                                       "error": "quota exceeded"}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
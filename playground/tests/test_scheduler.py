@@ -0,0 +1,89 @@
+import unittest
+
+from playground.scheduler import IssueScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIssueScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_priority_order_and_capacity(self):
+        scheduler = IssueScheduler(2, aging_rate=0, clock=self.clock)
+        scheduler.push("a/x", 1, "low", 1)
+        scheduler.push("a/x", 2, "critical", 4)
+        scheduler.push("b/y", 1, "high", 3)
+
+        self.assertEqual([entry.issue for entry in scheduler.pop_ready()], ["critical", "high"])
+        self.assertEqual(scheduler.free_slots, 0)
+        self.assertEqual(scheduler.pop_ready(), [])
+
+        scheduler.release("a/x", 2)
+        self.assertEqual([entry.issue for entry in scheduler.pop_ready()], ["low"])
+        self.assertEqual(len(scheduler), 0)
+
+    def test_dedup_of_queued_and_in_flight_issues(self):
+        scheduler = IssueScheduler(1, aging_rate=0, clock=self.clock)
+        self.assertTrue(scheduler.push("a/x", 1, "v1", 1))
+        self.assertTrue(scheduler.push("a/x", 1, "v2", 2))
+        self.assertEqual(len(scheduler), 1)
+
+        entry, = scheduler.pop_ready()
+        self.assertEqual((entry.issue, entry.priority), ("v2", 2))
+        # An in-flight issue is not queued again.
+        self.assertFalse(scheduler.push("a/x", 1, "v3", 2))
+        self.assertEqual(len(scheduler), 0)
+        self.assertIn(("a/x", 1), scheduler)
+
+    def test_aging_prevents_starvation(self):
+        scheduler = IssueScheduler(1, aging_rate=1.0, clock=self.clock)
+        scheduler.push("a/x", 1, "old low", 1)
+        self.clock.now = 2 * 3600
+        scheduler.push("a/x", 2, "new high", 3)
+        self.clock.now = 4 * 3600
+        scheduler.push("a/x", 3, "newer high", 3)
+
+        # After 2 hours the low priority issue is worth 3 points and came first.
+        self.assertEqual(scheduler.pop_ready()[0].issue, "old low")
+
+    def test_max_per_repo(self):
+        scheduler = IssueScheduler(3, aging_rate=0, max_per_repo=1, clock=self.clock)
+        scheduler.push("a/x", 1, "x1", 4)
+        scheduler.push("a/x", 2, "x2", 4)
+        scheduler.push("b/y", 1, "y1", 1)
+
+        self.assertEqual([entry.issue for entry in scheduler.pop_ready()], ["x1", "y1"])
+        self.assertEqual(len(scheduler), 1)
+        scheduler.release("a/x", 1)
+        self.assertEqual([entry.issue for entry in scheduler.pop_ready()], ["x2"])
+
+    def test_requeue_keeps_waiting_time(self):
+        scheduler = IssueScheduler(1, aging_rate=1.0, clock=self.clock)
+        scheduler.push("a/x", 1, "first", 1)
+        entry, = scheduler.pop_ready()
+        self.clock.now = 3600
+        scheduler.push("a/x", 2, "second", 1)
+        scheduler.requeue(entry)
+
+        self.assertEqual(scheduler.free_slots, 1)
+        self.assertEqual(scheduler.pop_ready()[0].issue, "first")
+
+    def test_removed_issues_are_skipped(self):
+        scheduler = IssueScheduler(2, aging_rate=0, clock=self.clock)
+        for number in range(200):
+            scheduler.push("a/x", number, number, number % 5)
+        for number in range(199):
+            scheduler.remove("a/x", number)
+
+        self.assertEqual([entry.issue for entry in scheduler.pop_ready()], [199])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from playground.http_client import HttpClient
+from playground.spring_docs import SpringDocsDownloader
+
+INDEX = """<html><body>
+<nav>
+  <a class="nav-link" href="intro.html">Intro</a>
+  <a class="nav-link" href="guide.html#setup">Guide</a>
+  <a class="nav-link" href="guide.html">Guide again</a>
+  <a class="nav-link" href="empty.html">Empty</a>
+</nav>
+<article class="doc"><h1>Index</h1></article>
+</body></html>"""
+
+
+def page(title, text):
+    return f"""<html><body><nav><a class="nav-link" href="x.html">X</a></nav>
+<article class="doc"><h1>{title}</h1><p>{text}</p></article></body></html>"""
+
+
+class _DocsHandler(BaseHTTPRequestHandler):
+    """Serve the pages of `server.pages`, answering 304 when the ETag matches (if `server.etags`)."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        body = server.pages.get(self.path)
+        with server.lock:
+            server.requests.append(self.path)
+        etag = f'"{hash(body)}"'
+        if body is None:
+            self.send_response(404)
+            body = ""
+        elif server.etags and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        else:
+            self.send_response(200)
+        data = body.encode()
+        if server.etags:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSpringDocsDownloader(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _DocsHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.etags = True
+        self.server.pages = {
+            "/docs/index.html": INDEX,
+            "/docs/intro.html": page("Intro", "Hello <b>world</b>."),
+            "/docs/guide.html": page("Guide", "Step one."),
+            "/docs/empty.html": "<html><body><p>No article</p></body></html>",
+        }
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/docs/index.html"
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output_dir = directory.name
+
+    def download(self):
+        downloader = SpringDocsDownloader(self.output_dir, workers=4, requests_per_second=None,
+                                          http=HttpClient(retries=0))
+        try:
+            [result] = downloader.run({"docs": self.base_url})
+        finally:
+            downloader.close()
+        with open(os.path.join(self.output_dir, "docs.md"), encoding="utf-8") as f:
+            return result, f.read()
+
+    def test_project_file(self):
+        result, content = self.download()
+        self.assertEqual(content, (
+            f"# Spring Boot Documentation\n\nSource: {self.base_url}\n\n---\n\n"
+            "# Intro\n\nHello **world**.\n\n---\n\n"
+            "# Guide\n\nStep one.\n\n---\n\n"
+        ))
+        self.assertEqual((result.pages, result.downloaded, result.written), (3, 3, True))
+
+    def test_unchanged_pages_are_not_converted_again(self):
+        self.download()
+        result, _ = self.download()
+        self.assertEqual((result.not_modified, result.downloaded, result.written), (3, 0, False))
+
+        self.server.pages["/docs/guide.html"] = page("Guide", "Step two.")
+        result, content = self.download()
+        self.assertEqual((result.not_modified, result.downloaded, result.written), (2, 1, True))
+        self.assertIn("Step two.", content)
+
+    def test_content_hash_without_validators(self):
+        self.server.etags = False
+        self.download()
+        result, _ = self.download()
+        self.assertEqual((result.unchanged, result.downloaded, result.written), (3, 0, False))
+
+    def test_failed_pages_are_skipped(self):
+        del self.server.pages["/docs/guide.html"]
+        result, content = self.download()
+        self.assertEqual((result.failed, result.downloaded), (1, 2))
+        self.assertNotIn("Guide", content)
+
+
+if __name__ == '__main__':
+    unittest.main()
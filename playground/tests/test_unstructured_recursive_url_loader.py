@@ -1,11 +1,30 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock, patch, ANY
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, PropertyMock, patch, ANY
 import pytest
+import requests
 from langchain_core.documents import Document
 
 # Adjust import based on where UnstructuredRecursiveUrlLoader is located
 # Assuming it's in playground/langchain/unstructured_recursive_url_loader.py
+from playground.langchain import unstructured_recursive_url_loader
 from playground.langchain.unstructured_recursive_url_loader import UnstructuredRecursiveUrlLoader
+from playground.langchain.crawl_stats import CrawlStats, PageMetrics, percentile
+from playground.langchain.rate_limiter import HostRateLimiter, TokenBucket
+
+
+class MockResponse(MagicMock):
+    """Mocked response whose content is its text, encoded in UTF-8."""
+
+    @property
+    def content(self):
+        return self.text.encode("utf-8") if isinstance(self.text, str) else b""
+
 
 class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
     def setUp(self):
@@ -25,7 +44,7 @@ class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
     def test_lazy_load_single_page(self, mock_partition, mock_requests):
         """Test loading a single page without recursion."""
         # Mock Response
-        mock_response = MagicMock()
+        mock_response = MockResponse()
         mock_response.text = "<html><body><p>Hello World</p></body></html>"
         mock_response.status_code = 200
         mock_requests.return_value = mock_response
@@ -50,7 +69,7 @@ class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
 
         # Responses for different URLs
         def side_effect(url, **kwargs):
-            response = MagicMock()
+            response = MockResponse()
             response.status_code = 200
             if url == "https://example.com":
                 response.text = '<html><body><a href="https://example.com/page1">Link</a></body></html>'
@@ -85,7 +104,7 @@ class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
         """Test that the loader respects max_depth."""
          # Responses for different URLs
         def side_effect(url, **kwargs):
-            response = MagicMock()
+            response = MockResponse()
             response.status_code = 200
             if url == "https://example.com":
                 response.text = '<a href="https://example.com/1">1</a>'
@@ -118,7 +137,7 @@ class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
     @patch("unstructured.partition.html.partition_html")
     def test_prevent_outside(self, mock_partition, mock_requests):
         """Test that the loader does not follow outside links."""
-        mock_requests.return_value.status_code = 200
+        mock_requests.return_value = MockResponse(status_code=200)
         mock_requests.return_value.text = '<a href="https://other.com/page">Outside</a><a href="https://example.com/page">Inside</a>'
 
         mock_partition.return_value = [MagicMock(__str__=MagicMock(return_value="content"))]
@@ -146,7 +165,7 @@ class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
     @patch("unstructured.partition.html.partition_html")
     def test_check_response_status(self, mock_partition, mock_requests):
         """Test that the loader handles error status codes."""
-        mock_response = MagicMock()
+        mock_response = MockResponse()
         mock_response.status_code = 404
         mock_requests.return_value = mock_response
 
@@ -162,12 +181,24 @@ class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
         with self.assertRaises(ValueError):
             list(loader.lazy_load())
 
+    @patch("requests.get")
+    def test_streamed_error_response_is_closed(self, mock_requests):
+        """Test that a streamed response skipped for its status releases its connection."""
+        mock_requests.return_value = MockResponse(status_code=503)
+
+        loader = UnstructuredRecursiveUrlLoader(
+            url="https://example.com", check_response_status=True, max_body_size=100_000
+        )
+        self.assertEqual(list(loader.lazy_load()), [])
+        self.assertTrue(mock_requests.call_args.kwargs["stream"])
+        mock_requests.return_value.__exit__.assert_called_once()
+
     def test_filter_links(self):
         """Test link filtering."""
         with patch("requests.get") as mock_requests, \
              patch("unstructured.partition.html.partition_html") as mock_partition:
 
-            mock_requests.return_value.status_code = 200
+            mock_requests.return_value = MockResponse(status_code=200)
             mock_requests.return_value.text = '<a href="https://example.com/skip">Skip</a><a href="https://example.com/keep">Keep</a>'
             mock_partition.return_value = [MagicMock(__str__=MagicMock(return_value="content"))]
 
@@ -187,5 +218,433 @@ class TestUnstructuredRecursiveUrlLoader(unittest.TestCase):
             self.assertIn("https://example.com/keep", called_urls)
             self.assertNotIn("https://example.com/skip", called_urls)
 
+    def test_invalid_ordering(self):
+        """Test that an unknown ordering mode is rejected."""
+        with self.assertRaises(ValueError):
+            UnstructuredRecursiveUrlLoader(url="https://example.com", ordering="random")
+
+    @patch("requests.get")
+    @patch("unstructured.partition.html.partition_html")
+    def test_links_extracted_when_partition_fails(self, mock_partition, mock_requests):
+        """Test that a partition failure does not stop the crawl from following links."""
+        def side_effect(url, **kwargs):
+            response = MockResponse()
+            response.status_code = 200
+            if url == "https://example.com":
+                response.text = '<a href="https://example.com/page1">Link</a>'
+            else:
+                response.text = '<p>Page 1 Content</p>'
+            return response
+
+        def partition_side_effect(text, source_url, **kwargs):
+            if source_url == "https://example.com":
+                raise RuntimeError("boom")
+            return [MagicMock(__str__=MagicMock(return_value="Page 1 Content"))]
+
+        mock_requests.side_effect = side_effect
+        mock_partition.side_effect = partition_side_effect
+
+        loader = UnstructuredRecursiveUrlLoader(url="https://example.com", max_depth=2)
+        documents = list(loader.lazy_load())
+
+        self.assertEqual([doc.metadata["source"] for doc in documents], ["https://example.com/page1"])
+
+    def _run_with_thread_pool(self, ordering):
+        """Crawl three pages, with the root being the last one to finish partitioning."""
+        pages = {
+            "https://example.com": '<a href="https://example.com/a">A</a><a href="https://example.com/b">B</a>',
+            "https://example.com/a": '<p>Page A</p>',
+            "https://example.com/b": '<p>Page B</p>',
+        }
+        children_partitioned = threading.Semaphore(0)
+
+        def side_effect(url, **kwargs):
+            response = MockResponse()
+            response.status_code = 200
+            response.text = pages[url]
+            return response
+
+        def partition_side_effect(text, source_url, **kwargs):
+            if source_url == "https://example.com":
+                # Children are fetched and partitioned while the root is still busy.
+                for _ in range(2):
+                    self.assertTrue(children_partitioned.acquire(timeout=5))
+                time.sleep(0.2)
+            else:
+                children_partitioned.release()
+            return [MagicMock(__str__=MagicMock(return_value=source_url))]
+
+        loader = UnstructuredRecursiveUrlLoader(
+            url="https://example.com", max_depth=2, partition_workers=2, ordering=ordering
+        )
+        with patch("requests.get", side_effect=side_effect), \
+             patch("unstructured.partition.html.partition_html", side_effect=partition_side_effect), \
+             patch.object(loader, "_get_partition_executor", return_value=ThreadPoolExecutor(max_workers=3)):
+            documents = list(loader.lazy_load())
+
+        return [doc.metadata["source"] for doc in documents]
+
+    def test_discovery_ordering(self):
+        """Test that discovery ordering yields the root first even if it finishes last."""
+        sources = self._run_with_thread_pool("discovery")
+        self.assertEqual(sources[0], "https://example.com")
+        self.assertEqual(sorted(sources[1:]), ["https://example.com/a", "https://example.com/b"])
+
+    def test_completion_ordering(self):
+        """Test that completion ordering yields pages as soon as they are partitioned."""
+        sources = self._run_with_thread_pool("completion")
+        self.assertEqual(sources[-1], "https://example.com")
+        self.assertEqual(len(sources), 3)
+
+    def test_resume_from_checkpoint(self):
+        """Test that an interrupted crawl resumes without refetching emitted pages."""
+        pages = {
+            "https://example.com": '<a href="https://example.com/a">A</a><a href="https://example.com/b">B</a>',
+            "https://example.com/a": '<p>Page A</p>',
+            "https://example.com/b": '<p>Page B</p>',
+        }
+        failing = {"https://example.com/b"}
+
+        def side_effect(url, **kwargs):
+            if url in failing:
+                raise ConnectionError("network blip")
+            response = MockResponse()
+            response.status_code = 200
+            response.text = pages[url]
+            return response
+
+        def partition_side_effect(text, source_url, **kwargs):
+            return [MagicMock(__str__=MagicMock(return_value=source_url))]
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch("requests.get", side_effect=side_effect) as mock_requests, \
+             patch("unstructured.partition.html.partition_html", side_effect=partition_side_effect):
+            checkpoint_path = os.path.join(tmp_dir, "crawl.sqlite")
+            loader = UnstructuredRecursiveUrlLoader(
+                url="https://example.com",
+                continue_on_failure=False,
+                checkpoint_path=checkpoint_path,
+            )
+            documents = []
+            with self.assertRaises(ConnectionError):
+                for document in loader.lazy_load():
+                    documents.append(document)
+
+            failing.clear()
+            mock_requests.reset_mock()
+            documents.extend(loader.lazy_load())
+
+            called_urls = [call.args[0] for call in mock_requests.call_args_list]
+            self.assertEqual(called_urls, ["https://example.com/b"])
+            self.assertEqual(
+                sorted(doc.metadata["source"] for doc in documents),
+                ["https://example.com", "https://example.com/a", "https://example.com/b"],
+            )
+
+            # A finished crawl has nothing left to do.
+            self.assertEqual(list(loader.lazy_load()), [])
+
+    def test_resume_retries_failed_pages(self):
+        """Test that pages skipped on transient failures are fetched again on resume."""
+        pages = {
+            "https://example.com": '<a href="https://example.com/a">A</a><a href="https://example.com/b">B</a>',
+            "https://example.com/a": '<p>Page A</p>',
+            "https://example.com/b": '<p>Page B</p>',
+        }
+        failing = {"https://example.com/a": 503, "https://example.com/b": None}
+
+        def side_effect(url, **kwargs):
+            if url in failing and failing[url] is None:
+                raise requests.exceptions.ConnectionError("network blip")
+            response = MockResponse()
+            response.status_code = failing.get(url, 200)
+            response.text = pages[url]
+            return response
+
+        def partition_side_effect(text, source_url, **kwargs):
+            return [MagicMock(__str__=MagicMock(return_value=source_url))]
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch("requests.get", side_effect=side_effect) as mock_requests, \
+             patch("unstructured.partition.html.partition_html", side_effect=partition_side_effect):
+            loader = UnstructuredRecursiveUrlLoader(
+                url="https://example.com",
+                check_response_status=True,
+                checkpoint_path=os.path.join(tmp_dir, "crawl.sqlite"),
+            )
+            documents = list(loader.lazy_load())
+            self.assertEqual([doc.metadata["source"] for doc in documents], ["https://example.com"])
+            self.assertEqual(len(loader.stats.failed), 2)
+
+            failing.clear()
+            mock_requests.reset_mock()
+            documents = list(loader.lazy_load())
+
+            called_urls = [call.args[0] for call in mock_requests.call_args_list]
+            self.assertEqual(called_urls, ["https://example.com/a", "https://example.com/b"])
+            self.assertEqual([doc.metadata["source"] for doc in documents],
+                             ["https://example.com/a", "https://example.com/b"])
+            self.assertEqual(list(loader.lazy_load()), [])
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serve the pages of the fixture site and record the requested paths."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, time.monotonic()))
+        body = server.pages.get(self.path)
+        if body is None or self.path in server.statuses:
+            self.send_response(server.statuses.get(self.path, 404))
+            self.end_headers()
+            return
+        content_type = "application/xml" if self.path.endswith(".xml") else "text/html"
+        if self.path == "/robots.txt":
+            content_type = "text/plain"
+        content_type = server.content_types.get(self.path, content_type)
+        payload = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServerTestCase(unittest.TestCase):
+    """Crawl a local HTTP server; partitioning returns the page text as is."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.content_types = {}
+        self.server.statuses = {}
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.server.pages = {
+            "/": '<a href="/a">A</a>',
+            "/a": '<a href="/deep">Deep</a>',
+            "/deep": '<p>Deep page</p>',
+            "/private": '<p>Private</p>',
+            "/sitemap.xml": f"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{self.base}/pages.xml</loc></sitemap>
+</sitemapindex>""",
+            "/pages.xml": f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>{self.base}/deep</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc>{self.base}/private</loc></url>
+  <url><loc>https://other.example/page</loc></url>
+</urlset>""",
+        }
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        partition_patcher = patch(
+            "unstructured.partition.html.partition_html",
+            side_effect=lambda text, source_url, **kwargs: [MagicMock(__str__=MagicMock(return_value=text))],
+        )
+        partition_patcher.start()
+        self.addCleanup(partition_patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def requested_paths(self):
+        return [path for path, _ in self.server.requests]
+
+
+class TestCrawlPoliteness(FixtureServerTestCase):
+    """Sitemap seeding, robots.txt and rate limiting."""
+
+    def test_sitemap_seeds_pages_beyond_max_depth(self):
+        """Test that sitemap pages are crawled even if they are too deep to be reached."""
+        loader = UnstructuredRecursiveUrlLoader(url=f"{self.base}/", max_depth=1, use_sitemap=True)
+        sources = [doc.metadata["source"] for doc in loader.lazy_load()]
+
+        self.assertEqual(sources, [f"{self.base}/", f"{self.base}/deep", f"{self.base}/private"])
+        self.assertNotIn("/a", self.requested_paths())
+
+    def test_sitemap_lastmod_change_detection(self):
+        """Test that a checkpointed crawl only refetches sitemap pages whose lastmod changed."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, "crawl.sqlite")
+
+            def crawl():
+                loader = UnstructuredRecursiveUrlLoader(
+                    url=f"{self.base}/", max_depth=1, use_sitemap=True, checkpoint_path=checkpoint_path
+                )
+                return [doc.metadata["source"] for doc in loader.lazy_load()]
+
+            self.assertEqual(len(crawl()), 3)
+            self.assertEqual(crawl(), [])
+
+            self.server.pages["/pages.xml"] = self.server.pages["/pages.xml"].replace("2024-01-01", "2024-02-01")
+            self.assertEqual(crawl(), [f"{self.base}/deep"])
+
+    def test_robots_disallow_and_crawl_delay(self):
+        """Test that robots.txt rules are honored and its crawl-delay spaces requests."""
+        self.server.pages["/robots.txt"] = (
+            "User-agent: *\n"
+            "Disallow: /private\n"
+            "Crawl-delay: 0.2\n"
+            f"Sitemap: {self.base}/pages.xml\n"
+        )
+        loader = UnstructuredRecursiveUrlLoader(
+            url=f"{self.base}/", max_depth=2, use_sitemap=True, respect_robots_txt=True, max_concurrency=4
+        )
+        sources = [doc.metadata["source"] for doc in loader.lazy_load()]
+
+        self.assertEqual(sources, [f"{self.base}/", f"{self.base}/deep", f"{self.base}/a"])
+        self.assertNotIn("/private", self.requested_paths())
+        self.assertNotIn("/sitemap.xml", self.requested_paths())
+        times = [requested_at for _, requested_at in self.server.requests]
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        self.assertTrue(all(gap >= 0.15 for gap in gaps), gaps)
+
+    def test_robots_txt_error_statuses(self):
+        """Test that a denied robots.txt disallows everything and a missing one allows everything."""
+        for status, sources in ((403, []), (401, []), (404, [f"{self.base}/", f"{self.base}/a"])):
+            with self.subTest(status=status):
+                self.server.statuses["/robots.txt"] = status
+                self.server.requests.clear()
+                loader = UnstructuredRecursiveUrlLoader(url=f"{self.base}/", respect_robots_txt=True)
+                self.assertEqual([doc.metadata["source"] for doc in loader.lazy_load()], sources)
+                self.assertEqual(self.requested_paths()[0], "/robots.txt")
+
+    def test_concurrent_fetches_keep_discovery_order(self):
+        """Test that concurrent fetching still yields pages in discovery order."""
+        loader = UnstructuredRecursiveUrlLoader(url=f"{self.base}/", max_depth=3, max_concurrency=4)
+        sources = [doc.metadata["source"] for doc in loader.lazy_load()]
+
+        self.assertEqual(sources, [f"{self.base}/", f"{self.base}/a", f"{self.base}/deep"])
+
+
+class TestResponseReading(FixtureServerTestCase):
+    """Streaming reads and encoding resolution."""
+
+    def test_max_body_size(self):
+        """Test that pages larger than max_body_size are skipped without stopping the crawl."""
+        self.server.pages["/"] = '<a href="/big">Big</a><a href="/a">A</a>'
+        self.server.pages["/big"] = "<p>" + "x" * 200_000 + "</p>"
+        self.server.pages["/a"] = "<p>Small page</p>"
+
+        loader = UnstructuredRecursiveUrlLoader(url=f"{self.base}/", max_body_size=100_000)
+        sources = [doc.metadata["source"] for doc in loader.lazy_load()]
+
+        self.assertEqual(sources, [f"{self.base}/", f"{self.base}/a"])
+
+        loader = UnstructuredRecursiveUrlLoader(
+            url=f"{self.base}/big", max_body_size=100_000, continue_on_failure=False
+        )
+        with self.assertRaisesRegex(ValueError, "max_body_size"):
+            list(loader.lazy_load())
+
+    def test_encoding_from_meta_without_detection(self):
+        """Test that a <meta> charset is used and charset detection is skipped."""
+        page = '<html><head><meta charset="windows-1252"></head><body><p>Caf\u00e9 cr\u00e8me</p></body></html>'
+        self.server.pages["/"] = page.encode("windows-1252")
+
+        for max_body_size in (None, 100_000):
+            with self.subTest(max_body_size=max_body_size), \
+                 patch.object(requests.Response, "apparent_encoding", new_callable=PropertyMock) as apparent, \
+                 patch.object(unstructured_recursive_url_loader.chardet, "detect") as detect:
+                loader = UnstructuredRecursiveUrlLoader(url=f"{self.base}/", max_body_size=max_body_size)
+                documents = list(loader.lazy_load())
+
+                self.assertIn("Caf\u00e9 cr\u00e8me", documents[0].page_content)
+                apparent.assert_not_called()
+                detect.assert_not_called()
+
+    def test_encoding_from_headers(self):
+        """Test that the Content-Type charset takes precedence over <meta>."""
+        page = '<meta charset="windows-1252"><p>\u00c9t\u00e9</p>'
+        self.server.pages["/"] = page.encode("utf-8")
+        self.server.content_types["/"] = "text/html; charset=utf-8"
+
+        for max_body_size in (None, 100_000):
+            with self.subTest(max_body_size=max_body_size):
+                loader = UnstructuredRecursiveUrlLoader(url=f"{self.base}/", max_body_size=max_body_size)
+                documents = list(loader.lazy_load())
+                self.assertIn("\u00c9t\u00e9", documents[0].page_content)
+
+
+class TestCrawlMetrics(FixtureServerTestCase):
+    """Per-page metrics, callbacks and the end-of-crawl report."""
+
+    def test_page_metrics(self):
+        """Test that every page reports its fetch and partition metrics."""
+        recorded = []
+        loader = UnstructuredRecursiveUrlLoader(
+            url=f"{self.base}/", max_depth=3, on_page=recorded.append, show_progress_bar=True
+        )
+        list(loader.lazy_load())
+
+        self.assertEqual([metrics.url for metrics in recorded], [f"{self.base}/", f"{self.base}/a", f"{self.base}/deep"])
+        for metrics in recorded:
+            self.assertEqual(metrics.status, 200)
+            self.assertGreater(metrics.bytes, 0)
+            self.assertGreater(metrics.fetch_seconds, 0)
+            self.assertIsNotNone(metrics.partition_seconds)
+            self.assertEqual(metrics.elements, 1)
+            self.assertEqual(metrics.documents, 1)
+            self.assertIsNone(metrics.error)
+        self.assertEqual([metrics.depth for metrics in recorded], [0, 1, 2])
+        self.assertEqual(loader.stats.pages, recorded)
+
+    def test_failed_pages_in_report(self):
+        """Test that failed pages are counted and the report lists the slowest pages."""
+        self.server.pages["/"] = '<a href="/missing">Missing</a><a href="/a">A</a>'
+        loader = UnstructuredRecursiveUrlLoader(url=f"{self.base}/", check_response_status=True)
+        list(loader.lazy_load())
+
+        self.assertEqual([metrics.url for metrics in loader.stats.failed], [f"{self.base}/missing"])
+        self.assertEqual(loader.stats.failed[0].status, 404)
+        report = loader.stats.report(slowest=2)
+        self.assertIn("Crawled 3 pages (1 failed)", report)
+        self.assertIn("Slowest pages:", report)
+        self.assertEqual(len(report.splitlines()), 6)
+
+
+class TestCrawlStats(unittest.TestCase):
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_slowest(self):
+        """Test that the slowest pages account for both fetch and partition time."""
+        stats = CrawlStats()
+        stats.record(PageMetrics("a", fetch_seconds=1.0, partition_seconds=0.1))
+        stats.record(PageMetrics("b", fetch_seconds=0.2, partition_seconds=2.0))
+        stats.record(PageMetrics("c", fetch_seconds=0.5))
+        self.assertEqual([page.url for page in stats.slowest(2)], ["b", "a"])
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_rate_limit(self):
+        """Test that the bucket allows a burst and then spaces out requests."""
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # Two tokens are available right away, the two others take 1/20s each.
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_host_rate_limiter_without_rate(self):
+        """Test that hosts are not limited unless a rate is configured."""
+        limiter = HostRateLimiter()
+        self.assertEqual(limiter.acquire("https://example.com/a"), 0.0)
+        limiter.set_rate("example.com", 10)
+        limiter.acquire("https://example.com/a")
+        self.assertGreater(limiter.acquire("https://example.com/b"), 0.0)
+        self.assertEqual(limiter.acquire("https://other.com/"), 0.0)
+
+
 if __name__ == "__main__":
     unittest.main()
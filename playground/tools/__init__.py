@@ -1,5 +1,6 @@
-from .tavily_tools import tavily_crawl, tavily_extract, tavily_search
+from .tavily_tools import tavily_crawl, tavily_extract, tavily_read_content, tavily_search
 from .ask_user import ask_user
 from .think import think
+from .guide_search import read_guide_section, search_guides
 from .jules import create_jules_session
 
@@ -1,3 +1,5 @@
+import asyncio
+
 from langchain.tools import tool
 from pydantic import BaseModel, Field
 from langchain_core.runnables import RunnableConfig
@@ -17,11 +19,28 @@ def ask_user(question: str, justification: str, config: RunnableConfig):
     # 1. Access the configuration dictionary
     configuration = config.get("configurable", {})
 
-    # 2. Retrieve the lock (handle case where it's missing)
+    # 2. Prefer the question broker: only this agent waits for the answer
+    broker = configuration.get("question_broker")
+    if broker is not None:
+        return broker.ask(question, justification, asker=configuration.get("thread_id")).result()
+
+    # 3. Otherwise retrieve the lock (handle case where it's missing)
     lock = configuration.get("thread_lock")
     if not lock:
-        raise ValueError("Thread lock was not passed in config!")
+        raise ValueError("Neither a question broker nor a thread lock was passed in config!")
 
     with lock:
         print(f"question: {question} ({justification})")
         return input("> ")
+
+
+async def _aask_user(question: str, justification: str, config: RunnableConfig):
+    configuration = config.get("configurable", {})
+    broker = configuration.get("question_broker")
+    if broker is None:
+        # The legacy path blocks on input(), keep it off the event loop
+        return await asyncio.to_thread(ask_user.func, question, justification, config)
+    return await asyncio.wrap_future(broker.ask(question, justification, asker=configuration.get("thread_id")))
+
+
+ask_user.coroutine = _aask_user
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from playground.langchain.hybrid_retriever import BM25Index
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "playground", "content.sqlite")
+
+# Rough number of bytes per token of English text, for token budgets
+BYTES_PER_TOKEN = 4
+
+
+class ContentStore:
+    """
+    Persistent store of page contents, stored in SQLite and addressed by the hash
+    of their text, so that tool outputs can carry a short content id instead of the
+    full text.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, ttl: float = 7 * 24 * 3600):
+        """
+        Args:
+            path: Path of the SQLite file, or ":memory:".
+            ttl: The number of seconds a content is kept.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS contents (
+                id TEXT PRIMARY KEY,
+                url TEXT,
+                content TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def put(self, content: str, url: Optional[str] = None) -> str:
+        """Store `content` and return its id."""
+        content_id = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO contents (id, url, content, stored_at) VALUES (?, ?, ?, ?)",
+                (content_id, url, content, now),
+            )
+            self._conn.execute("DELETE FROM contents WHERE stored_at <= ?", (now - self.ttl,))
+            self._conn.commit()
+        return content_id
+
+    def get(self, content_id: str) -> Optional[dict]:
+        """Return the {"id", "url", "content"} entry of `content_id`, or None if it is unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT url, content FROM contents WHERE id = ?", (content_id,)).fetchone()
+        if row is None:
+            return None
+        return {"id": content_id, "url": row[0], "content": row[1]}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def budget_bytes(max_bytes: Optional[int] = None, max_tokens: Optional[int] = None) -> Optional[int]:
+    """Return a byte budget from a byte or a token budget (the smallest if both are set)."""
+    budgets = [budget for budget in (max_bytes, max_tokens and max_tokens * BYTES_PER_TOKEN) if budget]
+    return min(budgets) if budgets else None
+
+
+def split_passages(text: str, max_passage_bytes: int = 800) -> List[str]:
+    """
+    Split a text in passages: its paragraphs, with the long ones cut at line or
+    sentence boundaries to at most `max_passage_bytes`.
+    """
+    passages = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        pieces = re.split(r"(?<=[.!?])\s+|\n", paragraph) if len(paragraph) > max_passage_bytes else [paragraph]
+        current = ""
+        for piece in pieces:
+            if current and len(current) + len(piece) + 1 > max_passage_bytes:
+                passages.append(current)
+                current = ""
+            current = f"{current} {piece}" if current else piece
+            while len(current) > max_passage_bytes:
+                passages.append(current[:max_passage_bytes])
+                current = current[max_passage_bytes:]
+        if current:
+            passages.append(current)
+    return passages
+
+
+def select_snippets(text: str, query: Optional[str], max_bytes: int, separator: str = "\n[...]\n") -> str:
+    """
+    Return the passages of `text` most relevant to `query` fitting in `max_bytes`,
+    in document order.
+
+    Passages are scored with BM25 over the passages of the text, with a small bonus
+    for the first ones (which usually hold the summary of a page). Without query
+    terms, the text is cut to its first passages.
+    """
+    if len(text) <= max_bytes:
+        return text
+    passages = split_passages(text, max_passage_bytes=max(200, max_bytes // 4))
+
+    bm25 = BM25Index()
+    bm25.add(passages)
+    scores = [0.1 / (position + 1) for position in range(len(passages))]
+    for position, score in bm25.search(query or "", k=len(passages)):
+        scores[position] += score
+
+    selected = []
+    used = 0
+    for index in sorted(range(len(passages)), key=lambda i: (-scores[i], i)):
+        size = len(passages[index]) + len(separator)
+        if used + size > max_bytes:
+            continue
+        selected.append(index)
+        used += size
+    return separator.join(passages[index] for index in sorted(selected))
+
+
+def compact_results(response: dict, store: ContentStore, query: Optional[str], max_bytes: int,
+                    field: str = "raw_content") -> dict:
+    """
+    Return a copy of a Tavily response whose `field` contents are cut to the
+    snippets most relevant to `query`, so that they fit in `max_bytes` together.
+
+    The budget is shared evenly between the results. The full text of each cut
+    content is moved to `store`, its result getting a `content_id` and the
+    `content_length` of the full text. Responses fitting in the budget are returned
+    unchanged.
+    """
+    results = response.get("results") or []
+    sizes = [len(result.get(field) or "") for result in results]
+    if sum(sizes) <= max_bytes:
+        return response
+
+    per_result = max(max_bytes // sum(1 for size in sizes if size), 200)
+    compacted = []
+    for result, size in zip(results, sizes):
+        if size <= per_result:
+            compacted.append(result)
+            continue
+        content = result[field]
+        compacted.append(dict(
+            result,
+            **{field: select_snippets(content, query, per_result)},
+            content_id=store.put(content, url=result.get("url")),
+            content_length=size,
+        ))
+    return dict(response, results=compacted)
@@ -0,0 +1,177 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from playground.tools.response_cache import ResponseCache, make_key, normalize_url
+
+# Maximum number of URLs accepted by a single Tavily extract request
+TAVILY_EXTRACT_MAX_URLS = 20
+
+
+class ExtractBatcher:
+    """
+    Extracts pages URL by URL on top of a batch extract API.
+
+    URLs are canonicalized and deduplicated, then served from the cache when they
+    were already extracted. The remaining URLs are sent in batches of up to
+    `batch_size` URLs, run concurrently. A URL being extracted for another call is
+    awaited instead of being requested again. Results are returned in the order of
+    the requested URLs. Failures are reported per URL and not cached.
+    """
+
+    def __init__(self, extract: Callable[..., dict], cache: Optional[ResponseCache] = None,
+                 batch_size: int = TAVILY_EXTRACT_MAX_URLS, max_workers: int = 4,
+                 aextract: Optional[Callable[..., Awaitable[dict]]] = None):
+        """
+        Args:
+            extract: The batch API, called with a list of URLs and keyword arguments,
+                returning a dict with "results" and "failed_results" lists of
+                entries holding a "url".
+            cache: An optional cache of the extracted pages.
+            batch_size: The maximum number of URLs per call of `extract`.
+            max_workers: The maximum number of concurrent calls of `extract`.
+            aextract: The async version of `extract`, used by `aextract`.
+        """
+        self.extract_batch = extract
+        self.aextract_batch = aextract
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, url: str, kwargs: dict) -> str:
+        return make_key("tavily.extract.url", dict(kwargs, url=url))
+
+    def _outcomes(self, urls: List[str], response: dict) -> Dict[str, dict]:
+        """Return the result or the failure of each canonical URL of a batch."""
+        outcomes = {}
+        for result in response.get("results", []):
+            outcomes[normalize_url(result["url"])] = result
+        for failure in response.get("failed_results", []):
+            outcomes[normalize_url(failure["url"])] = dict(failure, failed=True)
+        for url in urls:
+            outcomes.setdefault(normalize_url(url), {"url": url, "error": "No content extracted", "failed": True})
+        return outcomes
+
+    def _run_batch(self, urls: List[str], kwargs: dict) -> Dict[str, dict]:
+        try:
+            response = self.extract_batch(urls, **kwargs)
+        except Exception as e:
+            return {normalize_url(url): {"url": url, "error": str(e), "failed": True} for url in urls}
+        return self._outcomes(urls, response)
+
+    async def _arun_batch(self, urls: List[str], kwargs: dict) -> Dict[str, dict]:
+        try:
+            response = await self.aextract_batch(urls, **kwargs)
+        except Exception as e:
+            return {normalize_url(url): {"url": url, "error": str(e), "failed": True} for url in urls}
+        return self._outcomes(urls, response)
+
+    def _plan(self, urls: List[str], kwargs: dict):
+        """
+        Splits the canonical URLs between the cached ones, the ones to extract (owned)
+        and the ones being extracted by another call (awaited).
+        """
+        originals = {}
+        for url in urls:
+            originals.setdefault(normalize_url(url), url)
+
+        outcomes = {}
+        misses = []
+        for url in originals:
+            cached = self.cache.get(self._key(url, kwargs)) if self.cache is not None else None
+            if cached is not None:
+                outcomes[url] = cached
+            else:
+                misses.append(url)
+
+        owned = {}
+        awaited = {}
+        with self._lock:
+            for url in misses:
+                key = self._key(url, kwargs)
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = Future()
+                    self._in_flight[key] = future
+                    owned[url] = future
+                else:
+                    awaited[url] = future
+
+        pending = list(owned)
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        return originals, outcomes, owned, awaited, batches
+
+    def _store(self, batch: List[str], results: Dict[str, dict], outcomes: dict, owned: dict, kwargs: dict) -> None:
+        for url in batch:
+            outcome = results[url]
+            if self.cache is not None and not outcome.get("failed"):
+                self.cache.set(self._key(url, kwargs), outcome)
+            outcomes[url] = outcome
+            owned[url].set_result(outcome)
+
+    def _release(self, originals: dict, owned: dict, kwargs: dict) -> None:
+        with self._lock:
+            for url, future in owned.items():
+                del self._in_flight[self._key(url, kwargs)]
+                if not future.done():
+                    future.set_result({"url": originals[url], "error": "Extraction aborted", "failed": True})
+
+    def _assemble(self, originals: dict, outcomes: dict) -> dict:
+        response = {"results": [], "failed_results": []}
+        for url in originals:
+            outcome = outcomes[url]
+            if outcome.get("failed"):
+                response["failed_results"].append({"url": originals[url], "error": outcome.get("error")})
+            else:
+                response["results"].append(outcome)
+        return response
+
+    def extract(self, urls: List[str], **kwargs) -> dict:
+        """
+        Extracts `urls`, returning a dict shaped like a Tavily extract response.
+
+        Args:
+            urls: The URLs to extract.
+            **kwargs: The arguments of the extract API (e.g. extract_depth).
+        """
+        originals, outcomes, owned, awaited, batches = self._plan(urls, kwargs)
+        if batches:
+            try:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                    batch_outcomes = executor.map(
+                        lambda batch: self._run_batch([originals[url] for url in batch], kwargs), batches
+                    )
+                    for batch, results in zip(batches, batch_outcomes):
+                        self._store(batch, results, outcomes, owned, kwargs)
+            finally:
+                self._release(originals, owned, kwargs)
+
+        for url, future in awaited.items():
+            outcomes[url] = future.result()
+        return self._assemble(originals, outcomes)
+
+    async def aextract(self, urls: List[str], **kwargs) -> dict:
+        """
+        Async version of `extract`, running the batches concurrently on the event loop.
+        """
+        originals, outcomes, owned, awaited, batches = self._plan(urls, kwargs)
+        if batches:
+            semaphore = asyncio.Semaphore(self.max_workers)
+
+            async def run(batch):
+                async with semaphore:
+                    return await self._arun_batch([originals[url] for url in batch], kwargs)
+
+            try:
+                batch_outcomes = await asyncio.gather(*(run(batch) for batch in batches))
+                for batch, results in zip(batches, batch_outcomes):
+                    self._store(batch, results, outcomes, owned, kwargs)
+            finally:
+                self._release(originals, owned, kwargs)
+
+        for url, future in awaited.items():
+            outcomes[url] = await asyncio.wrap_future(future)
+        return self._assemble(originals, outcomes)
@@ -0,0 +1,89 @@
+import os
+from typing import Optional
+
+from langchain.tools import tool
+from pydantic import BaseModel, Field
+
+from playground.guide_index import DEFAULT_DATA_DIR, DEFAULT_INDEX_PATH, GuideIndex, load_or_build
+
+# Size of the section contents returned by a tool call, about 4k tokens
+DEFAULT_OUTPUT_MAX_CHARS = 16_000
+
+index: GuideIndex | None = None
+
+def _get_index():
+    """
+    Returns the section index of the guides, loaded (or built, if missing or out of
+    date) once per process. The GUIDE_DATA_DIR and GUIDE_INDEX_PATH environment
+    variables configure the directory of the guides and the one of the index.
+    """
+    global index
+
+    if index is None:
+        index = load_or_build(os.environ.get("GUIDE_DATA_DIR", DEFAULT_DATA_DIR),
+                              os.environ.get("GUIDE_INDEX_PATH", DEFAULT_INDEX_PATH))
+
+    return index
+
+
+class SearchGuidesInput(BaseModel):
+    """Input for search_guides"""
+    query: str = Field(description="What to look for in the guides, e.g. 'how to write non-functional requirements'")
+    guide: Optional[str] = Field(
+        description="Only search this guide: srs-guide, hld-guide, lld-guide, srs-roadmap, hld-roadmap or "
+                    "lld-roadmap.",
+        default=None)
+    k: Optional[int] = Field(description="The number of sections to return.", default=3)
+
+
+@tool(args_schema=SearchGuidesInput)
+def search_guides(query: str, guide: Optional[str] = None, k: int = 3):
+    """
+    Search the SRS, HLD and LLD writing guides and roadmaps for the sections relevant to a question.
+
+    Use this instead of reading whole guides: it returns the few most relevant sections,
+    keyed by their heading path. Read a section with its subsections with read_guide_section.
+    """
+    guide_index = _get_index()
+    if guide is not None and guide not in guide_index.guides:
+        return {"error": f"Unknown guide: {guide}. Known guides: {', '.join(guide_index.guides)}"}
+
+    results = guide_index.search(query, k=k, guide=guide)
+    budget = DEFAULT_OUTPUT_MAX_CHARS // max(1, len(results))
+    return {
+        "results": [
+            {
+                "key": section.key,
+                "score": round(score, 4),
+                "content": section.content[:budget],
+                "truncated": len(section.content) > budget,
+                "subsections": len(guide_index.subsections(section.key)) - 1,
+            }
+            for section, score in results
+        ]
+    }
+
+
+class ReadGuideSectionInput(BaseModel):
+    """Input for read_guide_section"""
+    key: str = Field(description="The key of a section returned by search_guides.")
+    offset: Optional[int] = Field(description="Position in the section text to read from.", default=0)
+
+
+@tool(args_schema=ReadGuideSectionInput)
+def read_guide_section(key: str, offset: int = 0):
+    """
+    Read a section of a guide with all its subsections, page by page using the returned next_offset.
+    """
+    sections = _get_index().subsections(key)
+    if not sections:
+        return {"error": f"Unknown section key: {key}"}
+
+    content = "\n\n".join(section.content for section in sections)
+    end = offset + DEFAULT_OUTPUT_MAX_CHARS
+    return {
+        "key": key,
+        "content": content[offset:end],
+        "content_length": len(content),
+        "next_offset": end if end < len(content) else None,
+    }
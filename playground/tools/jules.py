@@ -4,6 +4,8 @@ from typing import Optional
 from langchain.tools import tool
 from pydantic import BaseModel, Field
 
+from playground.http_client import get_async_client, get_client
+
 class CreateJulesSessionInput(BaseModel):
     """Input for create_jules_session"""
     prompt: str = Field(description="The task description for Jules to execute.")
@@ -27,17 +29,9 @@ class CreateJulesSessionInput(BaseModel):
         description="Automation mode (default: 'AUTO_CREATE_PR')."
     )
 
-@tool(args_schema=CreateJulesSessionInput)
-def create_jules_session(
-    prompt: str,
-    fullRepositoryName: str,
-    repositoryBranch: str = "master",
-    title: Optional[str] = None,
-    requirePlanApproval: bool = False,
-    automationMode: str = "AUTO_CREATE_PR"
-) -> str:
+def _session_request(prompt, fullRepositoryName, repositoryBranch, title, requirePlanApproval, automationMode):
     """
-    Start a new session with Jules to execute a coding task.
+    Returns the URL, headers and payload of the request creating a Jules session.
     """
     api_key = os.environ.get("JULES_API_KEY")
     if not api_key:
@@ -75,8 +69,25 @@ def create_jules_session(
     if title:
         payload["title"] = title
 
+    return url, headers, payload
+
+@tool(args_schema=CreateJulesSessionInput)
+def create_jules_session(
+    prompt: str,
+    fullRepositoryName: str,
+    repositoryBranch: str = "master",
+    title: Optional[str] = None,
+    requirePlanApproval: bool = False,
+    automationMode: str = "AUTO_CREATE_PR"
+) -> str:
+    """
+    Start a new session with Jules to execute a coding task.
+    """
+    url, headers, payload = _session_request(prompt, fullRepositoryName, repositoryBranch, title,
+                                             requirePlanApproval, automationMode)
+
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_client().post(url, headers=headers, json=payload, endpoint="jules.sessions.create")
         response.raise_for_status()
         data = response.json()
         return data["url"]
@@ -90,3 +101,32 @@ def create_jules_session(
             except ValueError:
                 pass
         raise RuntimeError(f"Failed to create Jules session: {error_msg}")
+
+async def _acreate_jules_session(
+    prompt: str,
+    fullRepositoryName: str,
+    repositoryBranch: str = "master",
+    title: Optional[str] = None,
+    requirePlanApproval: bool = False,
+    automationMode: str = "AUTO_CREATE_PR"
+) -> str:
+    url, headers, payload = _session_request(prompt, fullRepositoryName, repositoryBranch, title,
+                                             requirePlanApproval, automationMode)
+
+    try:
+        response = await get_async_client().post(url, headers=headers, json=payload, endpoint="jules.sessions.create")
+        response.raise_for_status()
+        data = response.json()
+        return data["url"]
+    except requests.exceptions.RequestException as e:
+        error_msg = str(e)
+        if e.response is not None:
+            try:
+                error_details = e.response.json()
+                error_msg += f" Details: {error_details}"
+            except ValueError:
+                pass
+        raise RuntimeError(f"Failed to create Jules session: {error_msg}")
+
+# Async tool calls (`ainvoke`) run on the event loop instead of blocking a worker thread
+create_jules_session.coroutine = _acreate_jules_session
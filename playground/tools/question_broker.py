@@ -0,0 +1,211 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class Question:
+    """A question asked by one or more agents."""
+    id: str
+    text: str
+    justifications: List[str] = field(default_factory=list)
+    askers: List[str] = field(default_factory=list)
+    asked_at: float = field(default_factory=time.time)
+
+
+class QuestionFrontend(ABC):
+    """
+    Presents batches of questions to the user and collects the answers.
+
+    `answer` is called from the broker thread, never concurrently. It returns the
+    answers of the questions it could get, keyed by question id; the questions left
+    unanswered are presented again with the next batch.
+    """
+
+    @abstractmethod
+    def answer(self, questions: List[Question]) -> Dict[str, str]:
+        ...
+
+
+class ConsoleFrontend(QuestionFrontend):
+    """Asks the questions one after the other on the terminal."""
+
+    def __init__(self, input_fn: Callable[[str], str] = input, print_fn: Callable[[str], None] = print):
+        self.input_fn = input_fn
+        self.print_fn = print_fn
+
+    def answer(self, questions: List[Question]) -> Dict[str, str]:
+        if len(questions) > 1:
+            self.print_fn(f"{len(questions)} questions from the agents:")
+        answers = {}
+        for question in questions:
+            self.print_fn(f"question: {question.text} ({' / '.join(question.justifications)})")
+            answers[question.id] = self.input_fn("> ")
+        return answers
+
+
+class FileFrontend(QuestionFrontend):
+    """
+    Exchanges questions and answers through JSON files, for runs without a terminal
+    (background jobs, remote notebooks...).
+
+    Pending questions are written to `questions.json` in `directory`, as a list of
+    {"id", "question", "justifications"} objects. The user (or another program)
+    answers by writing `answers.json` next to it, a {question id: answer} object,
+    which is consumed once read.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.questions_path = os.path.join(directory, "questions.json")
+        self.answers_path = os.path.join(directory, "answers.json")
+        self.poll_interval = poll_interval
+
+    def _write_questions(self, questions: List[Question]) -> None:
+        tmp_path = self.questions_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([
+                {"id": question.id, "question": question.text, "justifications": question.justifications}
+                for question in questions
+            ], f, indent=2)
+        os.replace(tmp_path, self.questions_path)
+
+    def answer(self, questions: List[Question]) -> Dict[str, str]:
+        self._write_questions(questions)
+        answers = None
+        while answers is None:
+            time.sleep(self.poll_interval)
+            try:
+                with open(self.answers_path) as f:
+                    answers = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                # Not written yet, or still being written
+                continue
+        os.remove(self.answers_path)
+        ids = {question.id for question in questions}
+        remaining = [question for question in questions if question.id not in answers]
+        if remaining:
+            self._write_questions(remaining)
+        else:
+            os.remove(self.questions_path)
+        return {question_id: str(answer) for question_id, answer in answers.items() if question_id in ids}
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip("?")
+
+
+class QuestionBroker:
+    """
+    Collects the questions of concurrent agents and forwards them to the user in batches.
+
+    `ask` returns immediately with a future: the asking agent waits for its own
+    answer only, while the other agents keep working. A background thread gathers
+    the questions asked within `batch_window` seconds of each other and hands them
+    to the frontend together. The same question asked by several agents (ignoring
+    case and whitespace) is presented once and its answer is shared.
+    """
+
+    def __init__(self, frontend: QuestionFrontend, batch_window: float = 0.5):
+        """
+        Args:
+            frontend: The frontend presenting the questions to the user.
+            batch_window: The number of seconds to wait for more questions before
+                presenting a batch.
+        """
+        self.frontend = frontend
+        self.batch_window = batch_window
+        self._queue: "queue.Queue[Question]" = queue.Queue()
+        self._pending: Dict[str, Question] = {}  # Normalized text -> question
+        self._futures: Dict[str, Future] = {}  # Question id -> future
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="question-broker", daemon=True)
+        self._thread.start()
+
+    def ask(self, text: str, justification: str = "", asker: Optional[str] = None) -> Future:
+        """
+        Queues a question and returns the future of its answer.
+
+        Args:
+            text: The question.
+            justification: Why the question is asked.
+            asker: An optional name of the asking agent.
+        """
+        key = _normalize(text)
+        with self._lock:
+            question = self._pending.get(key)
+            if question is not None:
+                if justification and justification not in question.justifications:
+                    question.justifications.append(justification)
+                if asker:
+                    question.askers.append(asker)
+                return self._futures[question.id]
+
+            question = Question(uuid.uuid4().hex[:8], text, [justification] if justification else [],
+                                [asker] if asker else [])
+            future = Future()
+            self._pending[key] = question
+            self._futures[question.id] = future
+        self._queue.put(question)
+        return future
+
+    @property
+    def pending(self) -> List[Question]:
+        with self._lock:
+            return list(self._pending.values())
+
+    def _collect(self, wait: bool) -> List[Question]:
+        """
+        Returns the newly asked questions, waiting for the first one when `wait` is
+        set, then for `batch_window` seconds for more.
+        """
+        try:
+            batch = [self._queue.get(timeout=None if wait else self.batch_window)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        unanswered: List[Question] = []
+        while True:
+            batch = unanswered + self._collect(wait=not unanswered)
+            try:
+                answers = self.frontend.answer(batch)
+            except Exception as e:
+                for question in batch:
+                    self._resolve(question, exception=e)
+                unanswered = []
+                continue
+            unanswered = []
+            for question in batch:
+                if question.id in answers:
+                    self._resolve(question, answers[question.id])
+                else:
+                    unanswered.append(question)
+
+    def _resolve(self, question: Question, answer: Optional[str] = None, exception: Optional[Exception] = None):
+        with self._lock:
+            self._pending.pop(_normalize(question.text), None)
+            future = self._futures.pop(question.id, None)
+        if future is None:
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(answer)
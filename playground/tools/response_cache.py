@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "playground", "responses.sqlite")
+
+
+TRACKING_PARAMETERS = {"fbclid", "gclid", "mc_cid", "mc_eid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonicalize a URL.
+
+    The scheme and host are lowercased, the default port, the fragment and the
+    tracking parameters (``utm_*``, ``fbclid``...) are dropped.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    query = "&".join(
+        param for param in parts.query.split("&")
+        if param and not param.startswith("utm_") and param.split("=", 1)[0] not in TRACKING_PARAMETERS
+    )
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a search query and collapse its whitespace."""
+    return " ".join(query.lower().split())
+
+
+def make_key(namespace: str, arguments: Dict[str, Any]) -> str:
+    """Return the cache key of a call: a hash of its namespace and JSON-encoded arguments.
+
+    Arguments set to None are dropped, so that explicit defaults share the entry of
+    omitted ones.
+    """
+    arguments = {name: value for name, value in arguments.items() if value is not None}
+    payload = json.dumps([namespace, arguments], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent cache of JSON-serializable responses, stored in SQLite.
+
+    Entries expire `ttl` seconds after being written. When the stored responses
+    exceed `max_bytes`, the least recently used entries are evicted.
+
+    Concurrent `get_or_compute` calls for the same key are coalesced: the first
+    caller computes the response while the others wait for its result, so that a
+    single request is sent. Errors are propagated to every waiter and not cached.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 24 * 3600, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: Path of the SQLite file, or ":memory:".
+            ttl: The number of seconds an entry stays valid.
+            max_bytes: The maximum total size of the stored responses.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response of `key`, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store the response of `key`, evicting the least recently used entries if needed."""
+        encoded = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def _claim(self, key: str):
+        """Return the future of the computation of `key` and whether the caller owns it."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+                return future, True
+            self.coalesced += 1
+            return future, False
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached response of `key`, computing and storing it on a miss.
+
+        If another thread is already computing `key`, wait for its result instead.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        future, owner = self._claim(key)
+        if not owner:
+            return future.result()
+
+        try:
+            value = self.get(key)  # Stored by another caller since the first lookup
+            if value is None:
+                value = compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of `get_or_compute`, awaiting the coroutine returned by `compute`.
+
+        Sync and async callers of the same key share a single computation.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        future, owner = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            value = self.get(key)
+            if value is None:
+                value = await compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -3,7 +3,79 @@ from typing import Literal, List, Optional
 
 from langchain.tools import tool
 from pydantic import BaseModel, Field
-from tavily import TavilyClient
+
+from playground.http_client import AsyncHttpClient, HttpClient, get_async_client, get_client
+from playground.tools.content_store import (DEFAULT_STORE_PATH, ContentStore, budget_bytes, compact_results,
+                                           select_snippets)
+from playground.tools.extract_batcher import ExtractBatcher
+from playground.tools.response_cache import DEFAULT_CACHE_PATH, ResponseCache, make_key, normalize_query, normalize_url
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+# Crawls run server side and can take minutes
+CRAWL_TIMEOUT = (5.0, 180.0)
+
+# Default size of the page contents returned by a tool call, about 6k tokens
+DEFAULT_OUTPUT_MAX_BYTES = 24_000
+
+
+class TavilyClient:
+    """
+    Tavily REST client sending its requests through the shared HttpClient, so that
+    tool calls reuse pooled connections and get timeouts, retries and metrics.
+
+    The `a`-prefixed methods send the same requests through the AsyncHttpClient of
+    the running event loop.
+    """
+
+    def __init__(self, api_key: str, http: Optional[HttpClient] = None, base_url: str = TAVILY_API_URL,
+                 async_http: Optional[AsyncHttpClient] = None):
+        self.api_key = api_key
+        self.http = http or get_client()
+        self.async_http = async_http
+        self.base_url = base_url
+
+    def _request_kwargs(self, endpoint: str, payload: dict, timeout) -> dict:
+        kwargs = dict(
+            json={key: value for key, value in payload.items() if value is not None},
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            endpoint=f"tavily.{endpoint}",
+            retry=True,  # Tavily requests only read data, they can be retried safely
+        )
+        if timeout:
+            kwargs["timeout"] = timeout
+        return kwargs
+
+    def _post(self, endpoint: str, payload: dict, timeout=None) -> dict:
+        response = self.http.post(f"{self.base_url}/{endpoint}", **self._request_kwargs(endpoint, payload, timeout))
+        response.raise_for_status()
+        return response.json()
+
+    async def _apost(self, endpoint: str, payload: dict, timeout=None) -> dict:
+        http = self.async_http or get_async_client()
+        response = await http.post(f"{self.base_url}/{endpoint}", **self._request_kwargs(endpoint, payload, timeout))
+        response.raise_for_status()
+        return response.json()
+
+    def search(self, query: str, **kwargs) -> dict:
+        return self._post("search", {"query": query, **kwargs})
+
+    def extract(self, urls: List[str], **kwargs) -> dict:
+        return self._post("extract", {"urls": urls, **kwargs})
+
+    def crawl(self, url: str, **kwargs) -> dict:
+        return self._post("crawl", {"url": url, **kwargs}, timeout=CRAWL_TIMEOUT)
+
+    async def asearch(self, query: str, **kwargs) -> dict:
+        return await self._apost("search", {"query": query, **kwargs})
+
+    async def aextract(self, urls: List[str], **kwargs) -> dict:
+        return await self._apost("extract", {"urls": urls, **kwargs})
+
+    async def acrawl(self, url: str, **kwargs) -> dict:
+        return await self._apost("crawl", {"url": url, **kwargs}, timeout=CRAWL_TIMEOUT)
+
 
 client: TavilyClient | None = None
 
@@ -14,10 +86,98 @@ def _get_client():
         api_key = os.environ.get("TAVILY_API_KEY")
         if not api_key:
             raise ValueError("TAVILY_API_KEY environment variable is not set.")
-        client = TavilyClient(api_key=api_key)
+        client = TavilyClient(api_key=api_key, base_url=os.environ.get("TAVILY_API_URL", TAVILY_API_URL))
 
     return client
 
+cache: ResponseCache | None = None
+
+def _get_cache():
+    """
+    Returns the cache of the Tavily responses, configured by the TAVILY_CACHE_PATH
+    (empty to disable the cache) and TAVILY_CACHE_TTL (seconds) environment variables.
+    """
+    global cache
+
+    if cache is None:
+        path = os.environ.get("TAVILY_CACHE_PATH", DEFAULT_CACHE_PATH)
+        if not path:
+            return None
+        cache = ResponseCache(path, ttl=float(os.environ.get("TAVILY_CACHE_TTL", 24 * 3600)))
+
+    return cache
+
+extract_batcher: ExtractBatcher | None = None
+
+def _get_extract_batcher():
+    global extract_batcher
+
+    if extract_batcher is None:
+        extract_batcher = ExtractBatcher(
+            lambda urls, **kwargs: _get_client().extract(urls, **kwargs),
+            _get_cache(),
+            aextract=lambda urls, **kwargs: _get_client().aextract(urls, **kwargs),
+        )
+
+    return extract_batcher
+
+content_store: ContentStore | None = None
+
+def _get_content_store():
+    """
+    Returns the store of the page contents cut from the tool outputs, configured by
+    the TAVILY_CONTENT_PATH environment variable.
+    """
+    global content_store
+
+    if content_store is None:
+        content_store = ContentStore(os.environ.get("TAVILY_CONTENT_PATH") or DEFAULT_STORE_PATH)
+
+    return content_store
+
+def _output_budget():
+    """
+    Returns the size in bytes of the page contents returned by a tool call, configured
+    by the TAVILY_OUTPUT_MAX_BYTES or TAVILY_OUTPUT_MAX_TOKENS environment variables.
+    """
+    max_bytes = os.environ.get("TAVILY_OUTPUT_MAX_BYTES")
+    max_tokens = os.environ.get("TAVILY_OUTPUT_MAX_TOKENS")
+    if not max_bytes and not max_tokens:
+        return DEFAULT_OUTPUT_MAX_BYTES
+    return budget_bytes(int(max_bytes) if max_bytes else None, int(max_tokens) if max_tokens else None)
+
+def _compact(response: dict, query: Optional[str]) -> dict:
+    """
+    Cuts the page contents of a response to the snippets most relevant to `query`
+    within the output budget. The full contents can be read with tavily_read_content.
+    """
+    budget = _output_budget()
+    if sum(len(result.get("raw_content") or "") for result in response.get("results") or []) <= budget:
+        return response
+    compacted = compact_results(response, _get_content_store(), query, budget)
+    compacted["note"] = ("Some raw_content were cut to their most relevant snippets. "
+                         "Use tavily_read_content with their content_id to read the full text.")
+    return compacted
+
+def _cached(endpoint: str, arguments: dict, call):
+    """
+    Returns the cached response of a Tavily call, sharing a single request between
+    concurrent identical calls.
+    """
+    response_cache = _get_cache()
+    if response_cache is None:
+        return call()
+    return response_cache.get_or_compute(make_key(f"tavily.{endpoint}", arguments), call)
+
+async def _acached(endpoint: str, arguments: dict, call):
+    """
+    Async version of `_cached`, `call` returning a coroutine.
+    """
+    response_cache = _get_cache()
+    if response_cache is None:
+        return await call()
+    return await response_cache.aget_or_compute(make_key(f"tavily.{endpoint}", arguments), call)
+
 class TavilyCrawlInput(BaseModel):
     """Input for tavily crawl"""
     url: str = Field(description="The root URL to begin the crawl")
@@ -48,7 +208,7 @@ class TavilyCrawlInput(BaseModel):
 @tool(args_schema=TavilyCrawlInput)
 def tavily_crawl(
         url: str,
-        instruction: Optional[str],
+        instructions: Optional[str],
         max_depth=1,
         max_breadth=20,
         limit=50,
@@ -65,10 +225,40 @@ def tavily_crawl(
 
     Use this to discover new content on high-value websites.
     """
-    return _get_client().crawl(url, instruction=instruction, max_depth=max_depth, max_breadth=max_breadth, limit=limit,
-                               select_paths=select_paths, select_domains=select_domains, exclude_paths=exclude_paths,
-                               exclude_domains=exclude_domains, allow_external=allow_external,
-                               include_images=include_images, extract_depth=extract_depth)
+    arguments = dict(instructions=instructions, max_depth=max_depth, max_breadth=max_breadth, limit=limit,
+                     select_paths=select_paths, select_domains=select_domains, exclude_paths=exclude_paths,
+                     exclude_domains=exclude_domains, allow_external=allow_external,
+                     include_images=include_images, extract_depth=extract_depth)
+    response = _cached("crawl", dict(arguments, url=normalize_url(url)),
+                       lambda: _get_client().crawl(url, **arguments))
+    return _compact(response, instructions)
+
+
+async def _atavily_crawl(
+        url: str,
+        instructions: Optional[str],
+        max_depth=1,
+        max_breadth=20,
+        limit=50,
+        select_paths: List[str] = None,
+        select_domains: List[str] = None,
+        exclude_paths: List[str] = None,
+        exclude_domains: List[str] = None,
+        allow_external: bool = True,
+        include_images: bool = False,
+        extract_depth: Literal["basic", "advanced"] = "basic",
+):
+    arguments = dict(instructions=instructions, max_depth=max_depth, max_breadth=max_breadth, limit=limit,
+                     select_paths=select_paths, select_domains=select_domains, exclude_paths=exclude_paths,
+                     exclude_domains=exclude_domains, allow_external=allow_external,
+                     include_images=include_images, extract_depth=extract_depth)
+    response = await _acached("crawl", dict(arguments, url=normalize_url(url)),
+                              lambda: _get_client().acrawl(url, **arguments))
+    return _compact(response, instructions)
+
+
+# Async tool calls (`ainvoke`) run on the event loop instead of blocking a worker thread
+tavily_crawl.coroutine = _atavily_crawl
 
 
 class TavilyExtractInput(BaseModel):
@@ -89,7 +279,17 @@ def tavily_extract(
 
     Use this to get the content of high-value pages.
     """
-    return _get_client().extract(urls, extract_depth=extract_depth)
+    return _get_extract_batcher().extract(urls, extract_depth=extract_depth)
+
+
+async def _atavily_extract(
+        urls: List[str],
+        extract_depth: Literal["basic", "advanced"] = "basic",
+):
+    return await _get_extract_batcher().aextract(urls, extract_depth=extract_depth)
+
+
+tavily_extract.coroutine = _atavily_extract
 
 
 class TavilySearchInput(BaseModel):
@@ -116,9 +316,57 @@ def tavily_search(
 
     Use this to explore a topic, find relevant URLs, or answer specific factual questions.
     """
-    return _get_client().search(
-        query,
-        max_results=max_results,
-        include_raw_content=include_raw_content,
-        topic=topic,
-    )
+    arguments = dict(max_results=max_results, include_raw_content=include_raw_content, topic=topic)
+    response = _cached("search", dict(arguments, query=normalize_query(query)),
+                       lambda: _get_client().search(query, **arguments))
+    return _compact(response, query)
+
+
+async def _atavily_search(
+        query: str,
+        max_results: int = 5,
+        topic: Literal["general", "news", "finance"] = "general",
+        include_raw_content: bool = False,
+):
+    arguments = dict(max_results=max_results, include_raw_content=include_raw_content, topic=topic)
+    response = await _acached("search", dict(arguments, query=normalize_query(query)),
+                              lambda: _get_client().asearch(query, **arguments))
+    return _compact(response, query)
+
+
+tavily_search.coroutine = _atavily_search
+
+
+
+class TavilyReadContentInput(BaseModel):
+    content_id: str = Field(description="The content_id of a result whose raw_content was cut.")
+    query: Optional[str] = Field(
+        description="Only return the passages most relevant to this query.", default=None)
+    offset: Optional[int] = Field(
+        description="Position in the full text to read from, when not using a query.", default=0)
+
+
+@tool(args_schema=TavilyReadContentInput)
+def tavily_read_content(content_id: str, query: Optional[str] = None, offset: int = 0):
+    """
+    Read the full text of a page whose raw_content was cut in a search or crawl result.
+
+    Either give a query to get its most relevant passages, or read it page by page
+    using the returned next_offset.
+    """
+    entry = _get_content_store().get(content_id)
+    if entry is None:
+        return {"error": f"Unknown content_id: {content_id}"}
+
+    content = entry["content"]
+    budget = _output_budget()
+    if query:
+        return {"url": entry["url"], "content": select_snippets(content, query, budget)}
+
+    end = offset + budget
+    return {
+        "url": entry["url"],
+        "content": content[offset:end],
+        "content_length": len(content),
+        "next_offset": end if end < len(content) else None,
+    }